@@ -0,0 +1,140 @@
+# api_cache.py (V1.1 - Tartós, TTL-es API cache SQLite-ban, találati számlálókkal)
+# Közös cache a tipp_generator, a gemini_data_exporter és az eredmeny_ellenorzo számára,
+# hogy az ismételt futások ne kérjék le újra ugyanazokat a payloadokat.
+
+import os
+import json
+import time
+import sqlite3
+import threading
+
+CACHE_PATH = os.environ.get("API_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "api_cache.sqlite3"))
+CACHE_MAX_ENTRIES = int(os.environ.get("API_CACHE_MAX_ENTRIES", "20000"))
+CACHE_DISABLED = os.environ.get("API_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+# Végpontonkénti élettartam (mp). Ami nincs itt, azt nem cache-eljük.
+ENDPOINT_TTL = {
+    "teams/statistics": 12 * 3600,
+    "injuries": 6 * 3600,
+    "standings": 12 * 3600,
+    "fixtures/headtohead": 24 * 3600,
+}
+# Lejátszott meccs eredménye már nem változik
+FINISHED_RESULT_TTL = 30 * 24 * 3600
+
+_local = threading.local()
+_write_lock = threading.Lock()
+_writes_since_evict = 0
+_stats_lock = threading.Lock()
+_stats = {}  # sport -> {"hits": n, "misses": n}
+
+def _count(sport, hit):
+    with _stats_lock:
+        entry = _stats.setdefault(sport, {"hits": 0, "misses": 0})
+        entry["hits" if hit else "misses"] += 1
+
+def get_stats():
+    """ Találat / tévesztés számok sportonként (a folyamat indulása vagy a legutóbbi reset_stats óta). """
+    with _stats_lock:
+        return {sport: dict(entry) for sport, entry in _stats.items()}
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+def _connect():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        conn = sqlite3.connect(CACHE_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS api_cache (
+            key TEXT PRIMARY KEY,
+            endpoint TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            accessed_at REAL NOT NULL)""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_api_cache_accessed ON api_cache(accessed_at)")
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+def make_key(sport, endpoint, params):
+    """ Kanonikus kulcs: sport + végpont + rendezett paraméterek (pl. team, league, season, date). """
+    canonical = "&".join(f"{k}={params[k]}" for k in sorted(params or {}))
+    return f"{sport}:{endpoint}?{canonical}"
+
+def is_cacheable(endpoint):
+    return not CACHE_DISABLED and endpoint in ENDPOINT_TTL
+
+def get(sport, endpoint, params):
+    """ Visszaadja a még érvényes payloadot, vagy None-t. """
+    if CACHE_DISABLED: return None
+    key = make_key(sport, endpoint, params)
+    try:
+        conn = _connect()
+        row = conn.execute("SELECT payload, expires_at FROM api_cache WHERE key = ?", (key,)).fetchone()
+        if not row:
+            _count(sport, False)
+            return None
+        now = time.time()
+        if row[1] < now:
+            with _write_lock:
+                conn.execute("DELETE FROM api_cache WHERE key = ?", (key,))
+                conn.commit()
+            _count(sport, False)
+            return None
+        with _write_lock:
+            conn.execute("UPDATE api_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+        _count(sport, True)
+        return json.loads(row[0])
+    except sqlite3.Error as e:
+        print(f"Cache olvasási hiba ({key}): {e}")
+        return None
+
+def contains(sport, endpoint, params):
+    """ Van-e érvényes bejegyzés (a költségtervezőnek; nem frissíti a hozzáférési időt). """
+    if not is_cacheable(endpoint): return False
+    try:
+        row = _connect().execute("SELECT expires_at FROM api_cache WHERE key = ?", (make_key(sport, endpoint, params),)).fetchone()
+        return bool(row) and row[0] >= time.time()
+    except sqlite3.Error:
+        return False
+
+def put(sport, endpoint, params, payload, ttl=None):
+    """ Elmenti a payloadot; üres választ nem tárolunk, hogy a hibás futás ne ragadjon be. """
+    global _writes_since_evict
+    if CACHE_DISABLED or not payload: return
+    ttl = ttl if ttl is not None else ENDPOINT_TTL.get(endpoint)
+    if not ttl: return
+    key = make_key(sport, endpoint, params)
+    now = time.time()
+    try:
+        conn = _connect()
+        with _write_lock:
+            conn.execute("INSERT OR REPLACE INTO api_cache (key, endpoint, payload, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                         (key, endpoint, json.dumps(payload, ensure_ascii=False, separators=(",", ":")), now + ttl, now))
+            conn.commit()
+            _writes_since_evict += 1
+            if _writes_since_evict >= 200:
+                _writes_since_evict = 0
+                _evict(conn, now)
+    except sqlite3.Error as e:
+        print(f"Cache írási hiba ({key}): {e}")
+
+def _evict(conn, now):
+    """ Lejárt sorok törlése, majd a legrégebben használtak kidobása a méretkorlát felett. """
+    conn.execute("DELETE FROM api_cache WHERE expires_at < ?", (now,))
+    count = conn.execute("SELECT COUNT(*) FROM api_cache").fetchone()[0]
+    if count > CACHE_MAX_ENTRIES:
+        conn.execute("DELETE FROM api_cache WHERE key IN (SELECT key FROM api_cache ORDER BY accessed_at ASC LIMIT ?)", (count - CACHE_MAX_ENTRIES,))
+    conn.commit()
+
+def evict():
+    try:
+        with _write_lock:
+            _evict(_connect(), time.time())
+    except sqlite3.Error as e:
+        print(f"Cache takarítási hiba: {e}")
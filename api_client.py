@@ -0,0 +1,270 @@
+# api_client.py (V1.3 - Streamelt, szűrt 'response' feldolgozás)
+# Hostonként egy keep-alive Session, egységes retry/backoff, a rate-limit fejlécek figyelése
+# és kérés/késleltetés számlálók. A tipp_generator, az eredmeny_ellenorzo és a gemini_data_exporter használja.
+
+import os
+import re
+import json
+import time
+import codecs
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+import api_quota
+
+API_REQUESTS_PER_MINUTE = int(os.environ.get("API_REQUESTS_PER_MINUTE", "280"))
+API_BURST = int(os.environ.get("API_BURST", "10"))
+POOL_SIZE = int(os.environ.get("API_POOL_SIZE", "16"))
+DEFAULT_TIMEOUT = 25
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 2.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Egy futáson belül az azonos (host, végpont, paraméterek) kérés eredménye ennyi ideig újrahasznosítható
+MEMO_TTL = int(os.environ.get("API_MEMO_TTL", "900"))
+STREAM_CHUNK_SIZE = 64 * 1024
+_RESPONSE_ARRAY = re.compile(r'"response"\s*:\s*\[')
+
+class TokenBucket:
+    """ Szálbiztos token-bucket limiter: átlagosan `rate_per_minute` hívás percenként, max `burst` egyszerre. """
+    def __init__(self, rate_per_minute, burst=1):
+        self.rate = max(rate_per_minute, 1) / 60.0
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """ A szerver jelzése alapján (kifogyott percenkénti keret) minden szálat visszatart. """
+        with self.lock:
+            self.tokens = 0.0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+_sessions = {}
+_limiters = {}
+_registry_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {}
+_flight_lock = threading.Lock()
+_inflight = {}  # kulcs -> _Flight (épp futó kérés)
+_memo = {}      # kulcs -> (lejárat, válasz) a futás már lezárt kéréseiből
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+def get_session(host):
+    with _registry_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+        return session
+
+def get_limiter(host):
+    with _registry_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = TokenBucket(API_REQUESTS_PER_MINUTE, API_BURST)
+        return limiter
+
+def _record(host, **deltas):
+    with _stats_lock:
+        entry = _stats.setdefault(host, {"requests": 0, "errors": 0, "retries": 0, "coalesced": 0, "latency": 0.0, "bytes": 0, "ratelimit_remaining": None, "daily_remaining": None})
+        for key, value in deltas.items():
+            if key in ("ratelimit_remaining", "daily_remaining"): entry[key] = value
+            else: entry[key] += value
+
+def _read_int_header(response, name):
+    try: return int(response.headers.get(name))
+    except (TypeError, ValueError): return None
+
+def _respect_rate_limit_headers(host, response):
+    """ x-ratelimit-remaining (percenkénti) és x-ratelimit-requests-remaining (napi) feldolgozása. """
+    minute_left = _read_int_header(response, "x-ratelimit-remaining")
+    daily_left = _read_int_header(response, "x-ratelimit-requests-remaining")
+    _record(host, ratelimit_remaining=minute_left, daily_remaining=daily_left)
+    if minute_left is not None and minute_left <= 1:
+        minute_limit = _read_int_header(response, "x-ratelimit-limit") or API_REQUESTS_PER_MINUTE
+        get_limiter(host).pause(60.0 if minute_left <= 0 else 60.0 / max(minute_limit, 1))
+
+def _flight_key(host, path, params, filter_key=None):
+    return (host, path.strip("/"), tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())), filter_key)
+
+def _stream_filtered(response, item_filter):
+    """
+    A válasz 'response' tömbjét letöltés közben, elemenként dekódolja; csak az item_filter-en átmenő elemek
+    maradnak meg, így a teljes (több MB-os) lista soha nincs egyszerre a memóriában.
+    Visszatér: (boríték a szűrt 'response'-zal, letöltött bájtok)
+    """
+    decoder, text = json.JSONDecoder(), codecs.getincrementaldecoder("utf-8")()
+    buf, head, tail, kept, total_bytes = "", None, None, [], 0
+
+    def consume(buf):
+        nonlocal head, tail
+        if head is None:
+            match = _RESPONSE_ARRAY.search(buf)
+            if not match: return buf
+            head, buf = buf[:match.start()], buf[match.end():]
+        if tail is not None: return buf
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,": pos += 1
+            if pos == len(buf): return ""
+            if buf[pos] == "]":
+                tail = ""
+                return buf[pos + 1:]
+            try: item, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError: return buf[pos:]  # félbevágott elem: a következő darabbal együtt újra
+            if item_filter(item): kept.append(item)
+
+    for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+        total_bytes += len(chunk)
+        buf = consume(buf + text.decode(chunk))
+        if tail is not None: tail, buf = tail + buf, ""
+    buf = consume(buf + text.decode(b"", final=True))
+    if head is None:
+        # Nincs 'response' tömb (pl. hibaválasz): sima feldolgozás
+        return json.loads(buf), total_bytes
+    if tail is None: raise ValueError("Csonka 'response' tömb")
+    envelope = json.loads(head + '"response":[]' + tail + buf)
+    envelope["response"] = kept
+    return envelope, total_bytes
+
+def get_json(host, path, params=None, headers=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, item_filter=None, filter_key=None):
+    """
+    GET https://host/path → feldolgozott JSON, vagy None (403, végleges hiba, API 'errors').
+    Az azonos kulcsú, egyidejű kérések egyetlen hálózati hívást várnak meg, a már lezártak a memóból jönnek.
+    item_filter megadásakor a 'response' tömb streamelve, szűrve érkezik (filter_key: a szűrő azonosítója a memóhoz).
+    A '_payload_bytes' kulcs a letöltött méret. A visszaadott objektum megosztott: a hívó ne módosítsa.
+    """
+    if item_filter is not None and filter_key is None: filter_key = id(item_filter)
+    key = _flight_key(host, path, params, filter_key)
+    with _flight_lock:
+        memo = _memo.get(key)
+        if memo and memo[0] > time.monotonic():
+            _record(host, coalesced=1)
+            return memo[1]
+        flight = _inflight.get(key)
+        is_leader = flight is None
+        if is_leader:
+            flight = _inflight[key] = _Flight()
+    if not is_leader:
+        flight.event.wait()
+        _record(host, coalesced=1)
+        return flight.result
+
+    result = None
+    try:
+        result = _fetch_json(host, path, params, headers, timeout, retries, backoff, item_filter)
+    finally:
+        with _flight_lock:
+            _inflight.pop(key, None)
+            if result is not None: _memo[key] = (time.monotonic() + MEMO_TTL, result)
+        flight.result = result
+        flight.event.set()
+    return result
+
+def _fetch_json(host, path, params, headers, timeout, retries, backoff, item_filter=None):
+    url = f"https://{host}/{path.lstrip('/')}"
+    session, limiter = get_session(host), get_limiter(host)
+    for attempt in range(retries):
+        limiter.acquire()
+        started = time.monotonic()
+        try:
+            response = session.get(url, headers=headers, params=params, timeout=timeout, stream=item_filter is not None)
+        except requests.exceptions.RequestException as e:
+            _record(host, requests=1, errors=1, latency=time.monotonic() - started)
+            api_quota.record(host, path, 0)
+            if attempt < retries - 1:
+                _record(host, retries=1)
+                time.sleep(backoff * (2 ** attempt))
+                continue
+            print(f"API hívás sikertelen ({host}/{path}): {e}")
+            return None
+        _respect_rate_limit_headers(host, response)
+        api_quota.record(host, path, response.status_code, _read_int_header(response, "x-ratelimit-requests-remaining"))
+
+        if response.status_code in RETRY_STATUSES and attempt < retries - 1:
+            _record(host, requests=1, errors=1, retries=1, latency=time.monotonic() - started, bytes=len(response.content))
+            retry_after = _read_int_header(response, "retry-after")
+            time.sleep(retry_after if retry_after is not None else backoff * (2 ** attempt))
+            continue
+        if response.status_code != 200:
+            _record(host, requests=1, errors=1, latency=time.monotonic() - started, bytes=len(response.content))
+            # A 403 / 429 eddig csendben üres listát adott; most látszik a logban, hogy kvóta vagy jogosultság gond van
+            print(f"⚠️ API hiba {response.status_code} ({host}/{path}): {response.text[:200]}")
+            return None
+        try:
+            if item_filter is None:
+                payload_bytes = len(response.content)
+                data = response.json()
+            else:
+                data, payload_bytes = _stream_filtered(response, item_filter)
+        except (ValueError, requests.exceptions.RequestException) as e:
+            # Hibás JSON vagy letöltés közben megszakadt kapcsolat
+            _record(host, requests=1, errors=1, latency=time.monotonic() - started)
+            if isinstance(e, requests.exceptions.RequestException) and attempt < retries - 1:
+                _record(host, retries=1)
+                time.sleep(backoff * (2 ** attempt))
+                continue
+            return None
+        finally:
+            response.close()
+        _record(host, requests=1, latency=time.monotonic() - started, bytes=payload_bytes)
+        if isinstance(data, dict): data["_payload_bytes"] = payload_bytes
+        errors = data.get("errors") if isinstance(data, dict) else None
+        if errors:
+            # Az api-sports a percenkénti limit túllépését 200-as válaszban, 'rateLimit' hibával jelzi
+            if isinstance(errors, dict) and "rateLimit" in errors and attempt < retries - 1:
+                _record(host, errors=1, retries=1)
+                limiter.pause(backoff * (2 ** attempt))
+                continue
+            _record(host, errors=1)
+            print(f"⚠️ API hibaüzenet ({host}/{path}): {errors}")
+            return None
+        return data
+    return None
+
+def get_stats():
+    with _stats_lock:
+        return {host: dict(entry) for host, entry in _stats.items()}
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+def begin_run():
+    """ Új futás: számlálók és a kérés-memó ürítése (a bot folyamatában a modul életben marad). """
+    reset_stats()
+    with _flight_lock:
+        _memo.clear()
+
+def format_stats():
+    """ Rövid, logba írható összesítő hostonként. """
+    lines = []
+    for host, s in sorted(get_stats().items()):
+        avg_ms = (s["latency"] / s["requests"] * 1000) if s["requests"] else 0
+        line = f"{host}: {s['requests']} kérés, {s['coalesced']} megspórolt (összevont), {s['errors']} hiba, {s['retries']} újrapróba, átl. {avg_ms:.0f} ms, {s['bytes'] / 1024:.0f} KB"
+        if s["daily_remaining"] is not None: line += f", napi keret: {s['daily_remaining']}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,105 @@
+# api_quota.py (V1.1 - api-sports kvóta napló és költségtervező, ablakon átívelő tervvel)
+# Minden API hívást naplóz (nap, host, sport, végpont, HTTP státusz), és a futás előtt megbecsüli,
+# belefér-e a munka a napi keretbe. Ha nem, a legkevésbé fontos ligák munkáját vágja le.
+
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+USAGE_PATH = os.environ.get("API_USAGE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "api_usage.sqlite3"))
+# Napi keret hostonként (api-sports Pro csomag: 7500 / nap / sport), plusz tartalék az eredmény ellenőrzőnek
+DAILY_QUOTA = int(os.environ.get("API_DAILY_QUOTA", "7500"))
+QUOTA_RESERVE = int(os.environ.get("API_QUOTA_RESERVE", "200"))
+
+_lock = threading.Lock()
+_conn = None
+# A szerver által utoljára jelzett napi maradék hostonként (x-ratelimit-requests-remaining)
+_server_remaining = {}
+
+def _connect():
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(USAGE_PATH), exist_ok=True)
+        _conn = sqlite3.connect(USAGE_PATH, timeout=30, check_same_thread=False)
+        _conn.execute("""CREATE TABLE IF NOT EXISTS api_usage (
+            day TEXT NOT NULL,
+            host TEXT NOT NULL,
+            sport TEXT NOT NULL,
+            endpoint TEXT NOT NULL,
+            status INTEGER NOT NULL,
+            calls INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, host, endpoint, status))""")
+        _conn.commit()
+    return _conn
+
+def _today():
+    # Az api-sports napi kerete UTC éjfélkor nullázódik
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+def sport_for_host(host):
+    for sport in ("football", "hockey", "basketball"):
+        if sport in host: return sport
+    return "other"
+
+def record(host, endpoint, status, daily_remaining=None):
+    """ Egy hívás naplózása; az api_client minden válasz (és hálózati hiba, status=0) után meghívja. """
+    endpoint = endpoint.strip("/").replace("v3/", "", 1)
+    try:
+        with _lock:
+            if daily_remaining is not None: _server_remaining[host] = daily_remaining
+            conn = _connect()
+            conn.execute("""INSERT INTO api_usage (day, host, sport, endpoint, status, calls) VALUES (?, ?, ?, ?, ?, 1)
+                ON CONFLICT(day, host, endpoint, status) DO UPDATE SET calls = calls + 1""",
+                (_today(), host, sport_for_host(host), endpoint, int(status)))
+            conn.commit()
+    except sqlite3.Error as e:
+        print(f"Kvóta napló hiba: {e}")
+
+def used_today(host=None):
+    try:
+        with _lock:
+            query = "SELECT COALESCE(SUM(calls), 0) FROM api_usage WHERE day = ? AND status != 0"
+            args = [_today()]
+            if host:
+                query += " AND host = ?"; args.append(host)
+            return _connect().execute(query, args).fetchone()[0]
+    except sqlite3.Error:
+        return 0
+
+def usage_report(day=None):
+    """ Végpontonkénti bontás egy napra: [(sport, endpoint, status, calls), ...] """
+    try:
+        with _lock:
+            return _connect().execute("SELECT sport, endpoint, status, SUM(calls) FROM api_usage WHERE day = ? GROUP BY sport, endpoint, status ORDER BY SUM(calls) DESC",
+                                      (day or _today(),)).fetchall()
+    except sqlite3.Error:
+        return []
+
+def remaining_today(host):
+    """ A napló és a szerver fejléce közül a szigorúbb becslés. """
+    remaining = DAILY_QUOTA - used_today(host)
+    server = _server_remaining.get(host)
+    if server is not None: remaining = min(remaining, server)
+    return max(remaining, 0)
+
+def plan_within_budget(items, cost_fn, priority_fn, budget, planned=None):
+    """
+    A munkát fontossági sorrendbe teszi, és csak annyit tart meg, amennyi belefér a keretbe.
+    cost_fn(item, already_planned) -> (becsült hívásszám, hívás kulcsok); a cache-ben lévő és a már
+    betervezett kulcsok nem számítanak bele, így a közös csapatstatisztika csak egyszer kerül pénzbe.
+    planned: korábbi tervek kulcsai (helyben bővül), ha egy ablak napjait egymás után tervezzük.
+    Visszatér: (megtartott elemek, becsült költség, kihagyott elemek)
+    """
+    ordered = sorted(items, key=priority_fn)
+    kept, skipped, total = [], [], 0
+    planned = set() if planned is None else planned
+    for item in ordered:
+        cost, keys = cost_fn(item, planned)
+        if total + cost > budget:
+            skipped.append(item)
+            continue
+        kept.append(item)
+        planned.update(keys)
+        total += cost
+    return kept, total, skipped
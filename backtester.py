@@ -1,201 +1,201 @@
-# backtester.py (V3.0 - Valós Pillanatkép Elemző)
-import json
+# backtester.py (V3.12 - Piaconkénti kiértékelés (Home / BTTS / Over 2.5))
 import os
-import glob
-from collections import defaultdict
-from datetime import datetime
+import sys
+import numpy as np
+import pandas as pd
 from dotenv import load_dotenv
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-# A V17.8-as (vagy V17.7) logikát használjuk az elemzéshez
-from tipp_generator import analyze_fixture_logic, select_best_single_tips
+# Ugyanaz a pontozó motor és modell réteg, mint az éles generátorban
+import scoring_engine
+import snapshot_store
+import results_store
+import threshold_sweep
+import bankroll_sim
+from tipp_generator import select_best_single_tips, DERBY_LIST
 
-# A V1.1-es (már javított) kiértékelőt és az API hívót használjuk
-from eredmeny_ellenorzo import evaluate_tip, get_fixture_result
+# Ugyanaz az eredmény lekérés (lezárt meccs cache-elve), mint az éles statisztikában; a kiértékelés viszont
+# piaconként explicit (threshold_sweep.grade), mert az ellenőrző részszöveges egyeztetése az "Over 2.5"-öt
+# vendég győzelemként is nyertesnek veszi
+from eredmeny_ellenorzo import check_match_result, fixtures_request
 
 load_dotenv()
 
 # --- KONFIGURÁCIÓ ---
-# Az új mappa, ahol a "snapshot" (pillanatkép) fájlok vannak
-SNAPSHOT_DATA_DIR = "backtest_snapshots"
+# Az oszlopos pillanatképek mappája (lásd snapshot_store.py)
+SNAPSHOT_DATA_DIR = snapshot_store.SNAPSHOT_DIR
 MAX_TIPS_PER_DAY = 3
+# --sweep: legalább ennyi tipp kell egy kombinációhoz, hogy a listába kerüljön; ennyi legjobb kombináció piaconként
+SWEEP_MIN_TIPS = int(os.environ.get("BACKTEST_SWEEP_MIN_TIPS", "30"))
+SWEEP_TOP = int(os.environ.get("BACKTEST_SWEEP_TOP", "10"))
+# Egy nap legalább ennyi hiányzó eredményénél egyetlen tömeges napi lekérés megy a meccsenkénti hívások helyett
+BULK_PULL_MIN = int(os.environ.get("BACKTEST_BULK_PULL_MIN", "2"))
+# A napok elemzése ennyi processzen fut (1 = soros, a fő processzben)
+WORKERS = int(os.environ.get("BACKTEST_WORKERS", str(os.cpu_count() or 1)))
 
-def load_snapshot_data(data_dir):
-    """ Beolvassa az összes 'snapshot_data_*.json' fájlt a megadott mappából. """
-    all_match_data = []
-    
-    # Csak az új formátumú fájlokat keressük
-    json_files = glob.glob(os.path.join(data_dir, 'snapshot_data_*.json'))
-
-    if not json_files:
-        print(f"!!! HIBA: Nem található egyetlen 'snapshot_data_*.json' fájl sem a '{data_dir}' mappában!")
-        print("Megjegyzés: Először futtatnod kell a 'gemini_data_exporter.py' (V3.0) szkriptet, hogy adatokat gyűjts.")
-        return None, []
-
-    loaded_json_files = []
-    print(f"Pillanatkép fájlok beolvasása a '{data_dir}' mappából:")
-    for file_path in sorted(json_files): 
-        data = None
-        encoding = 'utf-8'
-        
-        try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                data = json.load(f)
-        except UnicodeDecodeError:
-            encoding = 'latin-1' # Fallback
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    data = json.load(f)
-                print(f"  - Figyelmeztetés: '{os.path.basename(file_path)}' sikeresen beolvasva 'latin-1' kódolással (UTF-8 HIBA volt).")
-            except Exception as e:
-                print(f"  - HIBA: Hiba történt '{os.path.basename(file_path)}' beolvasásakor: {e}")
-                continue
-        except json.JSONDecodeError as e:
-            # Az új V3.0 exporter tiszta JSON-t ír, de biztonságból itt hagyjuk
-            print(f"  - HIBA: '{os.path.basename(file_path)}' hibás JSON formátumú, kihagyva. {e}")
-            continue
-        except Exception as e:
-            print(f"  - HIBA: Hiba történt '{os.path.basename(file_path)}' beolvasásakor: {e}")
-            continue
+def excluded_mask(records):
+    """ A generátorral azonos szűrés: derbi és kupa meccsek kiesnek. """
+    derbies = set(DERBY_LIST)
+    is_derby = np.array([tuple(sorted((int(h), int(a)))) in derbies for h, a in zip(records["home_id"], records["away_id"])], dtype=bool)
+    league = records["liga_nev"]
+    return is_derby | (np.char.find(league, "Cup") >= 0) | (np.char.find(league, "Kupa") >= 0)
 
-        if data:
-            if isinstance(data, list):
-                all_match_data.extend(data)
-                loaded_json_files.append(file_path)
-                print(f"  - Beolvasva: {os.path.basename(file_path)} ({len(data)} meccs)")
-            else:
-                print(f"  - Figyelmeztetés: '{os.path.basename(file_path)}' nem listát tartalmaz, kihagyva.")
+def group_by_date(records):
+    """
+    Rekordok napok szerint; több pillanatképben szereplő meccsből csak az első (fájl sorrendben) marad.
+    (napok {dátum: rekordok}, egyedi meccsek száma)
+    """
+    _, first = np.unique(records["fixture_id"], return_index=True)
+    unique = records[np.sort(first)]
+    dates = unique["kezdes"].astype("U10")
+    keep = playable_mask(unique)
+    return {date_str: unique[keep & (dates == date_str)] for date_str in np.unique(dates[keep])}, len(unique)
 
-    return all_match_data, loaded_json_files
+def playable_mask(records):
+    """ Elemezhető meccsek: van jellemző (statisztika + odds), ismert a kezdés, nem derbi / kupa. """
+    return records["valid"] & (records["kezdes"].astype("U10") != "") & ~excluded_mask(records)
 
-def run_backtest():
-    print("--- Valós Visszatesztelés indítása (V3.0 - Pillanatkép Elemző) ---")
-    
-    all_match_data, loaded_json_files = load_snapshot_data(SNAPSHOT_DATA_DIR)
-    
-    if all_match_data is None or len(loaded_json_files) == 0:
+def iter_playable_days(paths, seen):
+    """ A snapshot_store.iter_days kötegei az elemezhető meccsekre szűrve (az üres napok kimaradnak). """
+    for date_str, records in snapshot_store.iter_days(paths, seen):
+        records = records[playable_mask(records)]
+        if len(records): yield date_str, records
+
+def analyze_day(day):
+    """
+    Egy nap elemzése (worker processzben is futhat, ezért csak tiszta számítás, API hívás nélkül):
+    az oszlopos rekordokból közvetlenül a vektorizált pontozás, majd a legjobb MAX_TIPS_PER_DAY kiválasztása.
+    """
+    date_str, records = day
+    started = time.perf_counter()
+    frame = pd.DataFrame({column: records[column] for column in scoring_engine.ID_COLUMNS + scoring_engine.FEATURE_COLUMNS})
+    potential_tips = scoring_engine.frame_to_tips(scoring_engine.score_frame(frame))
+    selected_tips = select_best_single_tips(potential_tips, max_tips=MAX_TIPS_PER_DAY)
+    return {"date": str(date_str), "matches": len(records), "potential": len(potential_tips), "selected": selected_tips,
+            "seconds": time.perf_counter() - started}
+
+def run_days(days, workers=WORKERS):
+    """
+    Generátor: a napok (bármilyen, akár lusta iterálható) szétosztása a process poolon, legfeljebb 2 * workers nappal
+    a memóriában; az eredmények a bemenet (dátum) sorrendjében jönnek, így determinisztikusak.
+    """
+    if workers <= 1:
+        for day in days: yield analyze_day(day)
         return
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for day in days:
+            pending.append(pool.submit(analyze_day, day))
+            if len(pending) >= 2 * workers: yield pending.popleft().result()
+        while pending: yield pending.popleft().result()
+
+def load_results(ids_by_date, single_fallback=True):
+    """
+    ids_by_date: {nap: [meccs id]}. A végeredmények a results_store-ból; csak a raktárban még nem szereplő meccsekért
+    megy hívás: napi tömeges lekérés, ha egy napon több hiányzik, a maradékra (single_fallback esetén) meccsenként a
+    check_match_result (az is a raktárba ír).
+    """
+    fixture_ids = [int(fixture_id) for ids in ids_by_date.values() for fixture_id in ids]
+    results = results_store.get_many("football", fixture_ids)
+    pulled = 0
+    for date_str, ids in ids_by_date.items():
+        missing = [int(fixture_id) for fixture_id in ids if int(fixture_id) not in results]
+        if len(missing) >= BULK_PULL_MIN:
+            results_store.pull_date(date_str, fixtures_request)
+            pulled += 1
+            results.update(results_store.get_many("football", missing))
+            missing = [fixture_id for fixture_id in missing if fixture_id not in results]
+        if not single_fallback: continue
+        for fixture_id in missing:
+            score = check_match_result({"fixture_id": fixture_id})  # API hívás (a lezárt meccs a raktárba kerül)
+            if score: results[fixture_id] = score
+    print(f"Végeredmények: {len(results)}/{len(set(fixture_ids))} ismert ({pulled} tömeges napi lekérés, raktárban összesen {results_store.count('football')} meccs).")
+    return results
+
+def evaluate_selected(selected_tips, results):
+    """ A kiválasztott tippek kiértékelése a betöltött végeredményekkel: [(tipp, státusz, eredmény szöveg)]. """
+    evaluated = []
+    for tip in selected_tips:
+        score = results.get(tip['fixture_id'])
+        if not score:
+            evaluated.append((tip, "Nincs eredmény", "-"))
+            continue
+        status = threshold_sweep.grade(tip['tipp'], score['h'], score['a']) or "Ismeretlen tipp"
+        evaluated.append((tip, status, f"{score['h']}-{score['a']}"))
+    return evaluated
 
-    print(f"\nÖsszesen {len(all_match_data)} meccs (pillanatkép) betöltve a teszteléshez.")
-    if not all_match_data:
-        print("Nincs feldolgozható meccs adat.")
+def run_backtest():
+    print("--- Valós Visszatesztelés indítása (V3.12 - Lusta Napi Pillanatkép Elemző) ---")
+    
+    paths = snapshot_store.day_files(SNAPSHOT_DATA_DIR)
+    loaded_files = len(paths)
+    if loaded_files == 0:
+        print(f"!!! HIBA: Nem található egyetlen 'snapshot_*.npy' fájl sem a '{SNAPSHOT_DATA_DIR}' mappában!")
+        print("Megjegyzés: a régi snapshot_data_*.json fájlokat a 'python snapshot_store.py --convert' alakítja át, az újakat a 'gemini_data_exporter.py' írja.")
         return
 
-    # 1. Lépés: Csoportosítsuk a meccseket dátum szerint
-    matches_by_date = defaultdict(list)
-    processed_fixture_ids = set() # Annak ellenőrzésére, ha több snapshot is tartalmazná ugyanazt
-
-    for match_package in all_match_data:
-        fixture_data = match_package.get("fixture_data")
-        if not fixture_data: continue
-        
-        fixture_id = fixture_data.get('fixture', {}).get('id')
-        if not fixture_id: continue
-        
-        # A backtest csak egyszer dolgozzon fel egy meccset, még ha több snapshotban is szerepel
-        if fixture_id in processed_fixture_ids: continue
-        processed_fixture_ids.add(fixture_id)
-        
-        date_str = fixture_data.get('fixture', {}).get('date', '')[:10]
-        if not date_str: continue
-        
-        matches_by_date[date_str].append(match_package)
-
-    total_days = len(matches_by_date)
-    print(f"{total_days} napra találtunk feldolgozandó meccseket.")
-    if not matches_by_date: print("Nincsenek feldolgozható napok."); return
+    # 1-2. Lépés: A fájlok napi kötegekben, lustán töltődnek be (a memóriában csak néhány nap van), és a napok
+    # elemzése párhuzamosan, dátum szerint rendezett, determinisztikus összefésüléssel fut
+    seen = snapshot_store.SeenIds()
+    started = time.perf_counter()
+    day_results = list(run_days(iter_playable_days(paths, seen)))
+    analysis_seconds = time.perf_counter() - started
+    unique_fixtures, total_days = seen.count, len(day_results)
+    print(f"\n{unique_fixtures} egyedi meccs {loaded_files} fájlból; betöltés és elemzés: {total_days} nap {analysis_seconds:.2f} mp alatt ({max(1, WORKERS)} processz).")
+    if not day_results: print("Nincsenek feldolgozható napok."); return
+    sorted_dates = sorted({day['date'] for day in day_results})
 
     total_tips_evaluated = 0
     total_tips_selected = 0
     total_wins_selected = 0
     total_losses_selected = 0
     total_profit_selected = 0.0
+    total_model_expected = 0.0  # a gólmodell szerint várt nyertes szám a kiértékelt tippekre
+    played = []  # (odds, nyert-e, modell valószínűség) a bankroll szimulációhoz
     
-    api_call_cache = {} # Cache az API hívásoknak, hogy ne kérjük le többször ugyanazt az eredményt
-
-    # 2. Lépés: Végigmegyünk a napokon (dátum szerint rendezve)
-    sorted_dates = sorted(matches_by_date.keys())
-    for i, date_str in enumerate(sorted_dates, 1):
-        
-        print(f"\n--- {date_str} nap elemzése ({i}/{total_days}) ---")
-        potential_tips_for_day = []
-        match_packages_today = matches_by_date[date_str]
-
-        # 2a. Elemzés minden meccsre (a "pillanatkép" adatai alapján)
-        for match_package in match_packages_today:
-            # Adatok kicsomagolása a pillanatképből
-            fixture_data = match_package.get("fixture_data")
-            standings_data = match_package.get("league_standings", [])
-            home_stats = match_package.get("home_team_stats")
-            away_stats = match_package.get("away_team_stats")
-            h2h_data = match_package.get("h2h_data")
-            injuries = [] # A pillanatkép jelenleg nem tárolja
-            odds_data = match_package.get("odds_data") # A legfontosabb: a rögzített pre-match oddsok!
-            
-            # Futtatjuk a V17.7-es logikát a rögzített adatokon
-            found_tips = analyze_fixture_logic(fixture_data, standings_data, home_stats, away_stats, h2h_data, injuries, odds_data)
-            potential_tips_for_day.extend(found_tips)
-
-        total_tips_evaluated += len(potential_tips_for_day)
-        print(f"{date_str}: Összesen {len(potential_tips_for_day)} potenciális tipp található (a rögzített oddsok alapján).")
-
-        # 2b. Kiválasztjuk a legjobb N tippet (a pillanatkép konfidenciája alapján)
-        selected_tips_for_day = select_best_single_tips(potential_tips_for_day, max_tips=MAX_TIPS_PER_DAY)
-        print(f"{date_str}: Kiválasztva a legjobb {len(selected_tips_for_day)} tipp.")
-
-        # 2c. Kiértékeljük a kiválasztott tippeket a VALÓS EREDMÉNYEK alapján
-        if not selected_tips_for_day:
-            continue
-            
-        print(f"{date_str}: Valós eredmények lekérése az API-ról...")
-        for best_tip in selected_tips_for_day:
-            fixture_id = best_tip['fixture_id']
-            tip_text = best_tip['tipp']
-            tip_odds = best_tip['odds']
-            
-            # --- VALÓS EREDMÉNY LEKÉRÉSE ---
-            final_fixture_data = None
-            if fixture_id in api_call_cache:
-                final_fixture_data = api_call_cache[fixture_id]
-            else:
-                final_fixture_data = get_fixture_result(fixture_id) # API hívás!
-                if final_fixture_data:
-                    api_call_cache[fixture_id] = final_fixture_data
-                else:
-                    print(f"  ⚪️ HIBA: Nem sikerült lekérni a valós eredményt a(z) {fixture_id} meccshez.")
-                    continue
-            
-            # Kiértékelés (a V1.1-es ellenőrzővel)
-            result_status, score_str_result = evaluate_tip(tip_text, final_fixture_data)
-            
-            # Név lekérése a pillanatképből (mert az a biztos)
-            try:
-                home_team_name = best_tip.get('csapat_H', '?')
-            except Exception:
-                home_team_name = "?"
+    results = load_results({day['date']: [tip['fixture_id'] for tip in day['selected']] for day in day_results})
+
+    # 3. Lépés: Kiértékelés a VALÓS EREDMÉNYEK alapján, napról napra
+    for i, day in enumerate(day_results, 1):
+        date_str = day['date']
+        total_tips_evaluated += day['potential']
+        print(f"\n--- {date_str} ({i}/{total_days}): {day['matches']} meccs, {day['potential']} potenciális tipp, "
+              f"{len(day['selected'])} kiválasztva | elemzés {day['seconds'] * 1000:.1f} ms ---")
 
+        for best_tip, result_status, score_str_result in evaluate_selected(day['selected'], results):
+            tip_text, tip_odds = best_tip['tipp'], best_tip['odds']
+            home_team_name = best_tip.get('csapat_H', '?')
             if result_status == "Nyert":
                 total_tips_selected += 1
                 total_wins_selected += 1
                 total_profit_selected += (tip_odds - 1)
+                total_model_expected += best_tip.get('model_prob') or 0.0
+                played.append((tip_odds, True, best_tip.get('model_prob')))
                 print(f"  ✅ NYERT (Kiválasztott): {home_team_name} vs ... - Tipp: {tip_text} @ {tip_odds:.2f} (E: {score_str_result})")
             elif result_status == "Veszített":
                 total_tips_selected += 1
                 total_losses_selected += 1
                 total_profit_selected -= 1.0
+                total_model_expected += best_tip.get('model_prob') or 0.0
+                played.append((tip_odds, False, best_tip.get('model_prob')))
                 print(f"  ❌ VESZTETT (Kiválasztott): {home_team_name} vs ... - Tipp: {tip_text} @ {tip_odds:.2f} (E: {score_str_result})")
             else:
-                 # Pl. "Érvénytelen", "Hiba", vagy ha a meccs még nem ért véget
+                 # Pl. ha a meccs még nem ért véget, vagy nem sikerült lekérni az eredményt
                  print(f"  ⚪️ KIHAGYVA (Kiválasztott): {home_team_name} vs ... - Tipp: {tip_text} (Státusz: {result_status})")
 
-    # 3. Lépés: Végső statisztika számítása
-    print("\n--- Visszatesztelés Eredménye (V3.0 - Pillanatkép Elemzés) ---")
+    # 4. Lépés: Végső statisztika számítása
+    print("\n--- Visszatesztelés Eredménye (V3.5 - Pillanatkép Elemzés) ---")
     start_date_print = sorted_dates[0] if sorted_dates else "N/A"
     end_date_print = sorted_dates[-1] if sorted_dates else "N/A"
     print(f"Időszak: {start_date_print} - {end_date_print} ({total_days} nap)")
-    print(f"Feldolgozott Pillanatkép JSON fájlok száma: {len(loaded_json_files)}")
-    print(f"Egyedi feldolgozott meccsek száma: {len(processed_fixture_ids)}")
+    print(f"Feldolgozott pillanatkép fájlok száma: {loaded_files}")
+    print(f"Egyedi feldolgozott meccsek száma: {unique_fixtures}")
     print(f"Összes talált tipp az időszakban: {total_tips_evaluated}")
+    slowest = max(day_results, key=lambda d: d['seconds'])
+    print(f"Elemzési idő: {analysis_seconds:.2f} mp falióra, napi átlag {sum(d['seconds'] for d in day_results) / total_days * 1000:.1f} ms, "
+          f"leglassabb nap: {slowest['date']} ({slowest['seconds'] * 1000:.1f} ms)")
     print("---------------------------------------------------------")
     print(f"Kiválasztott és 'Megjátszott' Tippek (max {MAX_TIPS_PER_DAY}/nap): {total_tips_selected}")
     print(f"Nyertes (kiválasztott): {total_wins_selected}")
@@ -207,6 +207,61 @@ def run_backtest():
     print(f"Találati arány (kiválasztott): {win_rate:.2f}%")
     print(f"Nettó profit (kiválasztott): {total_profit_selected:.2f} egység")
     print(f"ROI (kiválasztott): {roi:.2f}%")
+    if total_tips_selected > 0:
+        print(f"Gólmodell szerint várt találati arány: {total_model_expected / total_tips_selected * 100:.2f}% (tényleges: {win_rate:.2f}%)")
+
+    # 5. Lépés: Tét stratégiák összevetése újramintavételezett bankroll pályákon
+    if played:
+        odds, won, probs = zip(*played)
+        started = time.perf_counter()
+        sim = bankroll_sim.simulate(odds, won, [np.nan if p is None else p for p in probs])
+        print("---------------------------------------------------------")
+        print(bankroll_sim.format_report(sim))
+        if sim: print(f"Szimuláció ideje: {time.perf_counter() - started:.2f} mp")
+
+def run_sweep(output_path=None):
+    """ Küszöb rács keresés: a pillanatképek összes (szűrt) meccsén, piaconként, a végeredmények alapján. """
+    print("--- Küszöb Rács Keresés indítása (V3.7) ---")
+    records, loaded_files = snapshot_store.load_all(SNAPSHOT_DATA_DIR)
+    matches_by_date, _ = group_by_date(records)
+    if not matches_by_date:
+        print("Nincs feldolgozható pillanatkép (lásd: python snapshot_store.py --convert).")
+        return
+
+    results = load_results({date_str: day["fixture_id"].tolist() for date_str, day in matches_by_date.items()}, single_fallback=False)
+    fixtures = np.concatenate([matches_by_date[date_str] for date_str in sorted(matches_by_date)])
+    fixtures = fixtures[np.argsort(fixtures["kezdes"], kind="stable")]
+    known = np.array([int(fixture_id) in results for fixture_id in fixtures["fixture_id"]], dtype=bool)
+    fixtures = fixtures[known]
+    print(f"{len(fixtures)} meccs végeredménnyel ({loaded_files} pillanatkép fájl).")
+    if not len(fixtures): return
+
+    home_goals = np.array([results[int(i)]["h"] for i in fixtures["fixture_id"]])
+    away_goals = np.array([results[int(i)]["a"] for i in fixtures["fixture_id"]])
+    features = {column: np.ascontiguousarray(fixtures[column], dtype=float) for column in scoring_engine.FEATURE_COLUMNS}
+
+    started = time.perf_counter()
+    swept = threshold_sweep.sweep(features, home_goals, away_goals)
+    print(f"{sum(len(grid) for grid, _ in swept.values())} kombináció kiértékelve {time.perf_counter() - started:.2f} mp alatt.")
+
+    pd.set_option("display.width", 200)
+    for market, (grid, current) in swept.items():
+        print(f"\n=== {market.upper()} | jelenlegi küszöbök ===")
+        print(current.to_string(index=False))
+        ranked = grid[grid["bets"] >= SWEEP_MIN_TIPS].sort_values(["roi", "max_drawdown"], ascending=[False, True])
+        print(f"--- legjobb {SWEEP_TOP} (legalább {SWEEP_MIN_TIPS} tipp, ROI szerint) ---")
+        print(ranked.head(SWEEP_TOP).to_string(index=False) if len(ranked) else "Nincs elég tippet adó kombináció.")
+        if output_path:
+            # Piaconként külön fájl (más-más küszöb oszlopok): eredmeny.csv -> eredmeny_btts.csv
+            root, ext = os.path.splitext(output_path)
+            grid.to_csv(f"{root}_{market}{ext or '.csv'}", index=False)
+            print(f"Az összes {market} kombináció: {root}_{market}{ext or '.csv'}")
 
 if __name__ == "__main__":
-    run_backtest()
+    try:
+        if "--sweep" in sys.argv:
+            run_sweep(next((arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--sweep-out=")), None))
+        else:
+            run_backtest()
+    except snapshot_store.SnapshotFormatError as e:
+        print(f"!!! HIBA: {e}")
@@ -0,0 +1,85 @@
+# bankroll_sim.py (V1.1 - Kelly csak valódi tippenkénti valószínűséggel)
+# Tippenkénti (odds, nyert-e) történetből sok ezer újramintavételezett (bootstrap) bankroll pályát számol egyetlen
+# NumPy lépésben (cumsum / cumprod), és összeveti a fix, a százalékos és a tört-Kelly tétezést:
+# csőd kockázat, visszaesés (drawdown) eloszlás, végső bankroll / ROI konfidencia intervallumok.
+# A backtester minden futás végén, a send_daily_update és a bot statisztikája a havi adatokon hívja.
+
+import os
+import numpy as np
+
+PATHS = int(os.environ.get("BANKROLL_SIM_PATHS", "20000"))
+START_BANKROLL = 100.0
+FLAT_STAKE = float(os.environ.get("BANKROLL_FLAT_STAKE", "2"))          # egység / tipp (a kezdő bankroll %-a)
+PERCENT_STAKE = float(os.environ.get("BANKROLL_PERCENT_STAKE", "0.02"))  # az aktuális bankroll hányada
+KELLY_FRACTION = float(os.environ.get("BANKROLL_KELLY_FRACTION", "0.25"))
+MAX_STAKE = 0.10                 # a Kelly tét felső korlátja (bankroll hányad)
+RUIN_LEVEL = 0.2                 # csőd: a bankroll a kezdő 20%-a alá esik
+MIN_TIPS = 10                    # ennél rövidebb történetre nincs értelme szimulálni
+CHUNK_CELLS = 4_000_000          # (pálya × tipp) cellák egy lépésben
+STRATEGY_LABELS = {"flat": "Fix tét", "percent": "Százalékos", "kelly": "Tört-Kelly"}
+
+def kelly_fractions(odds, probs, fraction=KELLY_FRACTION):
+    """ Tippenkénti tört-Kelly tét (bankroll hányad): fraction * (b*p - q) / b, 0 és MAX_STAKE közé vágva. """
+    b = odds - 1.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        full = np.where(b > 0, (b * probs - (1.0 - probs)) / b, 0.0)
+    return np.clip(np.nan_to_num(full) * fraction, 0.0, MAX_STAKE)
+
+def _path_stats(curves, start):
+    """ Pályánként: végső bankroll, legkisebb érték, legnagyobb visszaesés (a csúcshoz képest, %). """
+    peaks = np.maximum(np.maximum.accumulate(curves, axis=1), start)
+    drawdown = ((peaks - curves) / peaks).max(axis=1) * 100
+    return curves[:, -1], curves.min(axis=1), drawdown
+
+def simulate(odds, won, probs=None, paths=PATHS, start=START_BANKROLL, seed=42):
+    """
+    odds, won: tippenkénti odds és kimenet (a sorrend nem számít, a pályák visszatevéses mintából épülnek).
+    probs: a tipp előtt ismert nyerési valószínűség a Kellyhez (pl. a gólmodell model_prob-ja); ahol NaN, ott nincs Kelly tét.
+    probs nélkül a Kelly sor kimarad: a minta saját találati arányával a tét utólagos tudással méreteződne.
+    Visszatér: {"tips", "paths", "strategies": {stratégia: {"final", "roi", "drawdown", "ruin"}}} vagy None, ha kevés a tipp.
+    """
+    odds, won = np.asarray(odds, dtype=float), np.asarray(won, dtype=bool)
+    n = len(odds)
+    if n < MIN_TIPS: return None
+    gain = np.where(won, odds - 1.0, -1.0)
+    kelly = kelly_fractions(odds, np.asarray(probs, dtype=float)) if probs is not None else None
+    rng = np.random.default_rng(seed)
+
+    names = [name for name in STRATEGY_LABELS if name != "kelly" or kelly is not None]
+    collected = {name: {"final": [], "min": [], "drawdown": []} for name in names}
+    step = max(1, CHUNK_CELLS // n)
+    for done in range(0, paths, step):
+        sample = rng.integers(0, n, size=(min(step, paths - done), n))
+        g = gain[sample]
+        # Fix tét: additív pálya; a nullára esett pálya ott marad (nincs miből tétet tenni)
+        flat = start + np.cumsum(FLAT_STAKE * g, axis=1)
+        curves = {
+            "flat": np.where(np.maximum.accumulate(flat <= 0, axis=1), 0.0, flat),
+            "percent": start * np.cumprod(1.0 + PERCENT_STAKE * g, axis=1),
+        }
+        if kelly is not None: curves["kelly"] = start * np.cumprod(1.0 + kelly[sample] * g, axis=1)
+        for name, curve in curves.items():
+            final, low, drawdown = _path_stats(curve, start)
+            collected[name]["final"].append(final); collected[name]["min"].append(low); collected[name]["drawdown"].append(drawdown)
+
+    result = {}
+    for name, parts in collected.items():
+        final, low, drawdown = (np.concatenate(parts[key]) for key in ("final", "min", "drawdown"))
+        result[name] = {
+            "final": np.percentile(final, [5, 50, 95]).round(2).tolist(),
+            "roi": np.percentile((final - start) / start * 100, [5, 50, 95]).round(2).tolist(),
+            "drawdown": np.percentile(drawdown, [50, 95]).round(2).tolist(),
+            "ruin": round(float((low < start * RUIN_LEVEL).mean() * 100), 2),
+        }
+    return {"tips": n, "paths": paths, "strategies": result}
+
+def format_report(sim, label=None):
+    """ Rövid, üzenetbe / konzolra írható összefoglaló (a bot Markdown üzeneteiben kódblokkba téve). label: pl. a tipp kategória. """
+    title = f"Bankroll szimuláció{f' - {label}' if label else ''}"
+    if not sim: return f"{title}: legalább {MIN_TIPS} lezárt tipp kell."
+    lines = [f"{title} ({sim['tips']} tipp, {sim['paths']} pálya, kezdő: {START_BANKROLL:.0f} egység)"]
+    for name, s in sim["strategies"].items():
+        lines.append(f"{STRATEGY_LABELS[name]}: ROI medián {s['roi'][1]:+.1f}% (90% CI {s['roi'][0]:+.1f}% / {s['roi'][2]:+.1f}%), "
+                     f"DD medián {s['drawdown'][0]:.1f}% (95%: {s['drawdown'][1]:.1f}%), csőd: {s['ruin']:.1f}%")
+    if "kelly" not in sim["strategies"]: lines.append(f"{STRATEGY_LABELS['kelly']}: nincs tippenkénti valószínűség, kihagyva.")
+    return "\n".join(lines)
@@ -1,4 +1,4 @@
-# bot.py (V24.10 - FIX: Auto-Unlink Duplicate Chat IDs)
+# bot.py (V24.15 - run_metrics modul szintű import)
 
 import os
 import telegram
@@ -15,6 +15,8 @@ from supabase import create_client, Client
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 import math
+import bankroll_sim
+import run_metrics
 
 # --- Konfiguráció ---
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
@@ -168,64 +170,58 @@ async def activate_subscription_and_notify_web(user_id: int, duration_days: int,
     except Exception as e: print(f"Hiba a WEBES automatikus aktiválás során (user_id: {user_id}): {e}")
 
 # --- JÓVÁHAGYÁS HANDLER ---
+def approval_dates(callback_data):
+    """ A jóváhagyási gomb napjai: "approve_tips:<első nap>:<utolsó nap>" (több napos generálás), a régi
+    "approve_tips:<nap>" alakban az adott és a következő nap. """
+    parts = callback_data.split(":")[1:]
+    first = datetime.strptime(parts[0], "%Y-%m-%d")
+    last = datetime.strptime(parts[1], "%Y-%m-%d") if len(parts) > 1 else first + timedelta(days=1)
+    return [(first + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((last - first).days + 1)]
+
 # bot.py - JAVÍTOTT JÓVÁHAGYÁSI FÜGGVÉNY
 @admin_only
 async def handle_approve_tips(update: telegram.Update, context: CallbackContext):
     query = update.callback_query
     await query.answer("Jóváhagyás...")
     
-    date_str = query.data.split(":")[-1] 
+    dates = approval_dates(query.data)
+    date_str = dates[0]
     supabase_admin = get_admin_db_client()
-    
-    # --- JAVÍTÁS: Meccsek státuszának átírása ---
-    # Kikérjük a mai és holnapi szelvényeket, hogy megkapjuk a bennük lévő meccs ID-kat
-    slips = supabase_admin.table("napi_tuti").select("tipp_id_k").like("tipp_neve", f"%{date_str}%").execute()
-    
-    all_tip_ids = []
-    if slips.data:
-        for s in slips.data:
-            ids = s.get('tipp_id_k', [])
-            if isinstance(ids, list):
-                all_tip_ids.extend(ids)
-
-    # Ha vannak meccsek, átírjuk őket "Folyamatban" állapotra
-    if all_tip_ids:
-        supabase_admin.table("meccsek")\
-            .update({"eredmeny": "Folyamatban"})\
-            .in_("id", list(set(all_tip_ids)))\
-            .execute()
-    # --- JAVÍTÁS VÉGE ---
-
-    # 1. MAI NAP státusz frissítése
-    supabase_admin.table("daily_status").update({"status": "Kiküldve"}).eq("date", date_str).execute()
-    supabase_admin.table("napi_tuti").update({"is_admin_only": False}).like("tipp_neve", f"%{date_str}%").execute()
-    
-    # 2. HOLNAPI NAP (ha van)
-    today_dt = datetime.strptime(date_str, "%Y-%m-%d")
-    tomorrow_dt = today_dt + timedelta(days=1)
-    tomorrow_str = tomorrow_dt.strftime("%Y-%m-%d")
-    
-    tomorrow_check = supabase_admin.table("daily_status").select("*").eq("date", tomorrow_str).execute()
-    tomorrow_approved = False
-    
-    if tomorrow_check.data:
-        # Holnapi meccsek aktiválása is
-        t_slips = supabase_admin.table("napi_tuti").select("tipp_id_k").like("tipp_neve", f"%{tomorrow_str}%").execute()
-        t_ids = []
-        if t_slips.data:
-            for ts in t_slips.data:
-                t_ids.extend(ts.get('tipp_id_k', []))
-        
-        if t_ids:
-            supabase_admin.table("meccsek").update({"eredmeny": "Folyamatban"}).in_("id", list(set(t_ids))).execute()
 
-        supabase_admin.table("daily_status").update({"status": "Kiküldve"}).eq("date", tomorrow_str).execute()
-        supabase_admin.table("napi_tuti").update({"is_admin_only": False}).like("tipp_neve", f"%{tomorrow_str}%").execute()
-        tomorrow_approved = True
+    def activate_day(target_date):
+        # --- JAVÍTÁS: Meccsek státuszának átírása ---
+        # Kikérjük a nap szelvényeit, hogy megkapjuk a bennük lévő meccs ID-kat
+        slips = supabase_admin.table("napi_tuti").select("tipp_id_k").like("tipp_neve", f"%{target_date}%").execute()
+        all_tip_ids = []
+        if slips.data:
+            for s in slips.data:
+                ids = s.get('tipp_id_k', [])
+                if isinstance(ids, list):
+                    all_tip_ids.extend(ids)
+
+        # Ha vannak meccsek, átírjuk őket "Folyamatban" állapotra
+        if all_tip_ids:
+            supabase_admin.table("meccsek")\
+                .update({"eredmeny": "Folyamatban"})\
+                .in_("id", list(set(all_tip_ids)))\
+                .execute()
+
+        supabase_admin.table("daily_status").update({"status": "Kiküldve"}).eq("date", target_date).execute()
+        supabase_admin.table("napi_tuti").update({"is_admin_only": False}).like("tipp_neve", f"%{target_date}%").execute()
+
+    # 1. MAI NAP (a generálás napja) mindig
+    activate_day(date_str)
+
+    # 2. A TÖBBI NAP (holnap, ill. --days=N módban a teljes horizont), ha készült rájuk tipp
+    extra_approved = []
+    for target_date in dates[1:]:
+        if supabase_admin.table("daily_status").select("*").eq("date", target_date).execute().data:
+            activate_day(target_date)
+            extra_approved.append(target_date)
 
     original_message_text = query.message.text_markdown.split("\n\n*Állapot:")[0]
     status_text = "✅ Jóváhagyva és aktiválva a weboldalon!"
-    if tomorrow_approved: status_text += f"\n➕ A holnapi ({tomorrow_str}) tippek is élesítve!"
+    if extra_approved: status_text += f"\n➕ A további napok ({', '.join(extra_approved)}) tippjei is élesítve!"
 
     confirmation_text = (f"{original_message_text}\n\n*Állapot: {status_text}*\nBiztosan kiküldöd az értesítést a VIP tagoknak?")
     keyboard = [[InlineKeyboardButton("🚀 Igen, értesítés küldése", callback_data=f"confirm_send:{date_str}")], [InlineKeyboardButton("❌ Mégsem", callback_data="admin_close")]]
@@ -253,9 +249,9 @@ async def confirm_and_send_notification(update: telegram.Update, context: Callba
 @admin_only
 async def handle_reject_tips(update: telegram.Update, context: CallbackContext):
     query = update.callback_query; await query.answer("Elutasítás és törlés folyamatban...")
-    date_str = query.data.split(":")[-1]
+    dates = approval_dates(query.data)
     
-    def sync_delete_rejected_tips(date_main):
+    def sync_delete_rejected_tips(date_main, later_dates):
         supabase_admin = get_admin_db_client()
         report = []
         def delete_single_day(target_date):
@@ -272,14 +268,14 @@ async def handle_reject_tips(update: telegram.Update, context: CallbackContext):
         if delete_single_day(date_main): report.append(f"✅ {date_main}: Szelvények és tippek törölve.")
         else: report.append(f"ℹ️ {date_main}: Státusz elutasítva (nem voltak szelvények).")
 
-        today_dt = datetime.strptime(date_main, "%Y-%m-%d")
-        tomorrow_str = (today_dt + timedelta(days=1)).strftime("%Y-%m-%d")
-        if supabase_admin.table("daily_status").select("*").eq("date", tomorrow_str).execute().data:
-            if delete_single_day(tomorrow_str): report.append(f"✅ {tomorrow_str} (Holnap): Szelvények és tippek is törölve.")
-            else: report.append(f"ℹ️ {tomorrow_str}: Holnapi státusz is elutasítva.")
+        # A további napok (holnap, ill. --days=N módban a teljes horizont), ha készült rájuk tipp
+        for target_date in later_dates:
+            if supabase_admin.table("daily_status").select("*").eq("date", target_date).execute().data:
+                if delete_single_day(target_date): report.append(f"✅ {target_date}: Szelvények és tippek is törölve.")
+                else: report.append(f"ℹ️ {target_date}: Státusz is elutasítva.")
         return "\n".join(report)
 
-    delete_summary = await asyncio.to_thread(sync_delete_rejected_tips, date_str)
+    delete_summary = await asyncio.to_thread(sync_delete_rejected_tips, dates[0], dates[1:])
     await query.edit_message_text(text=f"{query.message.text_markdown}\n\n*Állapot: ❌ Elutasítva és Törölve!*\n_{delete_summary}_", parse_mode='Markdown')
 
 # --- ADMIN FUNKCIÓK (TISZTÍTOTT) ---
@@ -288,6 +284,7 @@ async def admin_menu(update: telegram.Update, context: CallbackContext):
     keyboard = [
         [InlineKeyboardButton("📈 Statisztikák", callback_data="admin_show_stat_current_month_0"), InlineKeyboardButton("📝 Tippek Kezelése", callback_data="admin_manage_manual")],
         [InlineKeyboardButton("👥 Felh. Száma", callback_data="admin_show_users"), InlineKeyboardButton("❤️ Rendszer Státusz", callback_data="admin_check_status")],
+        [InlineKeyboardButton("⏱ Generátor Futások", callback_data="admin_generator_runs")],
         [InlineKeyboardButton("📣 Körüzenet (Mindenki)", callback_data="admin_broadcast_start")],
         [InlineKeyboardButton("💎 VIP Körüzenet (Előfizetők)", callback_data="admin_vip_broadcast_start")],
         [InlineKeyboardButton("🎲 Új Tipp Generálása", callback_data="generate_new_tips")],
@@ -295,6 +292,27 @@ async def admin_menu(update: telegram.Update, context: CallbackContext):
     ]
     await update.message.reply_text("🛠️ **Mondom a Tutit Admin Panel**", reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='Markdown')
 
+@admin_only
+async def admin_generator_runs(update: telegram.Update, context: CallbackContext):
+    query = update.callback_query; await query.answer()
+    try:
+        def sync_fetch_runs():
+            db = get_db_client()
+            return db.table("generator_runs").select("*").order("created_at", desc=True).limit(5).execute().data or []
+
+        runs = await asyncio.to_thread(sync_fetch_runs)
+        if not runs:
+            await query.message.reply_text("Még nincs rögzített generátor futás (sql/generator_runs.sql telepítve?).")
+            return
+
+        lines = ["⏱ *Utolsó generátor futások:*"]
+        for run in runs:
+            hit_rate = f"{float(run['cache_hit_rate']):.0f}%" if run.get('cache_hit_rate') is not None else "n/a"
+            lines.append(f"• {run['run_date']} | {run['status']} | {float(run['duration_seconds']):.0f} mp | {run['tips_count']} tipp | {run['api_requests']} hívás | cache {hit_rate}")
+        lines.append(f"\n*Legutóbbi futás szakaszai:*\n```\n{run_metrics.format_summary(runs[0]['summary'])}\n```")
+        await query.message.reply_text("\n".join(lines), parse_mode='Markdown')
+    except Exception as e: await query.message.reply_text(f"❌ Hiba a futások lekérésekor: {e}")
+
 @admin_only
 async def generate_new_tips(update: telegram.Update, context: CallbackContext):
     query = update.callback_query; await query.answer()
@@ -497,6 +515,7 @@ async def stat(update: telegram.Update, context: CallbackContext, period="curren
             "vip": {"c": 0, "w": 0, "p": 0.0},
             "free": {"c": 0, "w": 0, "p": 0.0}
         }
+        played = {cat: [] for cat in s}  # kategóriánként (odds, nyert-e) a bankroll szimulációhoz; a fél / visszajáró szelvények kimaradnak
         
         # Bot tippek feldolgozása (csak lezárt meccsek)
         for m in (res_meccsek.data or []):
@@ -506,9 +525,11 @@ async def stat(update: telegram.Update, context: CallbackContext, period="curren
                     s["bot"]["c"] += 1
                     s["bot"]["w"] += 1
                     s["bot"]["p"] += (float(m.get('odds', 1.0)) - 1)
+                    played["bot"].append((float(m.get('odds', 1.0)), True))
                 elif status == "Veszített":
                     s["bot"]["c"] += 1
                     s["bot"]["p"] -= 1.0
+                    played["bot"].append((float(m.get('odds', 1.0)), False))
 
         # VIP tippek feldolgozása (csak lezárt szelvények)
         def calc_profit(d, cat):
@@ -516,8 +537,10 @@ async def stat(update: telegram.Update, context: CallbackContext, period="curren
             odds = float(d.get('eredo_odds', 1.0))
             if status == "Nyert":
                 s[cat]["c"] += 1; s[cat]["w"] += 1; s[cat]["p"] += odds - 1
+                played[cat].append((odds, True))
             elif status == "Veszített":
                 s[cat]["c"] += 1; s[cat]["p"] -= 1.0
+                played[cat].append((odds, False))
             elif status == "Fél-nyert":
                 s[cat]["c"] += 1; s[cat]["w"] += 0.5; s[cat]["p"] += (odds - 1) / 2
             elif status == "Fél-veszített":
@@ -552,6 +575,17 @@ async def stat(update: telegram.Update, context: CallbackContext, period="curren
         stat_msg += f"📝 *VIP*: {s['vip']['c']} lezárt, {s['vip']['w']} nyert, Profit: {s['vip']['p']:+.2f}\n"
         stat_msg += f"🆓 *Free*: {s['free']['c']} lezárt, {s['free']['w']} nyert, Profit: {s['free']['p']:+.2f}"
 
+        # Kategóriánként külön: egy bot tipp és egy kötéses szelvény tétje nem ugyanabból a kockázatból jön.
+        # A meccsek / szelvények nem tárolnak modell valószínűséget, így Kelly sor nincs.
+        sim_reports = []
+        for cat, label in (("bot", "Bot"), ("vip", "VIP"), ("free", "Free")):
+            if len(played[cat]) >= bankroll_sim.MIN_TIPS:
+                sim = await asyncio.to_thread(bankroll_sim.simulate, [o for o, _ in played[cat]], [w for _, w in played[cat]])
+                sim_reports.append(bankroll_sim.format_report(sim, label))
+        if sim_reports:
+            reports = "\n\n".join(sim_reports)
+            stat_msg += f"\n\n🎲 *Bankroll szimuláció*\n```\n{reports}\n```"
+
         keyboard = []
         if period not in ["all", "yesterday"]:
             keyboard.append([
@@ -591,6 +625,7 @@ async def button_handler(update: telegram.Update, context: CallbackContext):
             
     elif command == "admin_show_users": await admin_show_users(update, context)
     elif command == "admin_check_status": await admin_check_status(update, context)
+    elif command == "admin_generator_runs": await admin_generator_runs(update, context)
     elif command == "admin_broadcast_start": 
         # A ConversationHandler-t az add_handlers kezeli, 
         # ide csak query.answer() kell, ha gombbal indítjuk
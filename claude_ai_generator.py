@@ -1,13 +1,19 @@
-# claude_ai_generator.py v1.4.6
+# claude_ai_generator.py v1.4.8
 # Automatikus tipp generálás Claude API segítségével
 # A meccslistát a 90perc.hu szerverétől kapja (nincs extra Odds-API kredit)
 
 import os
+import re
 import json
+import unicodedata
 import requests
 import httpx
 from datetime import datetime, timedelta
 import pytz
+import http_cassette
+import goal_model
+
+http_cassette.install_from_env()
 
 CLAUDE_API_KEY     = os.environ.get("ANTHROPIC_API_KEY")
 PERC90_URL         = os.environ.get("PERC90_URL", "https://90perc.hu")
@@ -73,6 +79,58 @@ def parse_target_date(commence: str) -> str:
 
 # ── 2. Claude API hívás ───────────────────────────────────────────────────────
 
+def fmt_goal_model(match: dict) -> str:
+    """Opcionális gólmodell sor: ha a meccshez van várható gólszám ("xg": {"home", "away"}), Poisson valószínűségek."""
+    xg = match.get("xg") or {}
+    if xg.get("home") is None or xg.get("away") is None:
+        return ""
+    try:
+        return f"\n  Gólmodell (Poisson): {goal_model.describe(float(xg['home']), float(xg['away']))}"
+    except (TypeError, ValueError):
+        return ""
+
+# A csapatnevek összevetésekor elhagyott, a két forrásban eltérően használt szavak
+_NAME_NOISE = {"fc", "cf", "sc", "afc", "ac", "as", "fk", "sk", "club", "de", "the", "calcio"}
+
+def _team_tokens(name: str) -> frozenset:
+    """'1. FC Köln' → {'1', 'koln'}: ékezet, írásjel és gyakori klub rövidítések nélkül."""
+    plain = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii").lower()
+    return frozenset(t for t in re.split(r"[^a-z0-9]+", plain) if t and t not in _NAME_NOISE)
+
+def _same_team(a: frozenset, b: frozenset) -> bool:
+    return bool(a) and bool(b) and (a <= b or b <= a)
+
+def fetch_match_xg() -> list:
+    """A tipp_generator gólmodelljének xG sorai a közelgő meccsekre (match_xg tábla, sql/match_xg.sql)."""
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        return []
+    try:
+        headers = {"apikey": SUPABASE_KEY, "Authorization": f"Bearer {SUPABASE_KEY}"}
+        since = (datetime.now(pytz.utc) - timedelta(hours=3)).isoformat()
+        r = requests.get(f"{SUPABASE_URL}/rest/v1/match_xg", headers=headers,
+                         params={"select": "csapat_h,csapat_v,xg_home,xg_away", "kezdes": f"gte.{since}"}, timeout=10)
+        return r.json() if r.ok else []
+    except Exception as e:
+        print(f"[claude_gen] xG lekérési hiba: {e}")
+        return []
+
+def attach_goal_model_xg(matches: list, xg_rows: list = None) -> int:
+    """A 90perc.hu meccsekhez ("Hazai vs Vendég") a gólmodell xG-je csapatnév egyezés alapján; a kitöltött meccsek száma."""
+    rows = [(_team_tokens(r.get("csapat_h")), _team_tokens(r.get("csapat_v")), r) for r in (fetch_match_xg() if xg_rows is None else xg_rows)]
+    filled = 0
+    for m in matches:
+        if m.get("xg") or " vs " not in (m.get("match") or ""):
+            continue
+        home, away = (_team_tokens(t) for t in m["match"].split(" vs ", 1))
+        for row_home, row_away, row in rows:
+            if _same_team(home, row_home) and _same_team(away, row_away):
+                m["xg"] = {"home": row["xg_home"], "away": row["xg_away"]}
+                filled += 1
+                break
+    if rows:
+        print(f"[claude_gen] Gólmodell xG: {filled}/{len(matches)} meccshez")
+    return filled
+
 def build_prompt(matches: list, tipped_matches: list) -> str:
     """Prompt összeállítása a match listából."""
     def fmt_odds(odds_list):
@@ -83,7 +141,7 @@ def build_prompt(matches: list, tipped_matches: list) -> str:
         ])
 
     match_text = "\n".join([
-        f"- {m.get('sport','')} | {m.get('match','')} | Kezdés: {m.get('commence','?')}\n  Valós odds: {fmt_odds(m.get('odds', []))}"
+        f"- {m.get('sport','')} | {m.get('match','')} | Kezdés: {m.get('commence','?')}\n  Valós odds: {fmt_odds(m.get('odds', []))}{fmt_goal_model(m)}"
         for m in matches
     ]) or "Nincs elérhető meccs."
 
@@ -555,7 +613,7 @@ def build_raw_prompt(matches: list, tipped_matches: list) -> str:
         ])
 
     match_text = "\n".join([
-        f"- {m.get('sport','')} | {m.get('match','?')} | Kezdés: {m.get('commence','?')}\n  Odds: {fmt_odds(m.get('odds', []))}"
+        f"- {m.get('sport','')} | {m.get('match','?')} | Kezdés: {m.get('commence','?')}\n  Odds: {fmt_odds(m.get('odds', []))}{fmt_goal_model(m)}"
         for m in matches
     ]) or "Nincs elérhető meccs."
 
@@ -594,6 +652,7 @@ def generate_tips_raw() -> dict:
         return {"error": "Nincs meccsadat", "tips": []}
 
     matches = data["matches"]
+    attach_goal_model_xg(matches)
     tipped_picks = fetch_active_supabase_picks()
     print(f"[raw_gen] {len(matches)} meccs, {len(tipped_picks)} kizárt pick")
 
@@ -673,6 +732,7 @@ def generate_tips() -> dict:
 
     if not matches:
         return {"error": "Nincs elérhető meccs a 90perc.hu szerverről"}
+    attach_goal_model_xg(matches)
 
     # 2. Claude hívás
     prompt = build_prompt(matches, tipped_picks)
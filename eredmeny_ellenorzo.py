@@ -1,13 +1,18 @@
-# eredmeny_ellenorzo.py (V23.3 - Teljes verzió: Multi-Sport, Szűrés és Időzóna Fix)
+# eredmeny_ellenorzo.py (V23.6 - Végeredmények a helyi results_store raktárban)
 
 import os
-import requests
 import asyncio
 import json
 from supabase import create_client, Client
 from datetime import datetime
 import pytz
 import telegram
+import api_cache
+import api_client
+import results_store
+import http_cassette
+
+http_cassette.install_from_env()
 
 # --- Konfiguráció ---
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
@@ -58,13 +63,16 @@ def get_approved_match_ids():
 def get_api_data(sport, endpoint, params):
     host = HOSTS.get(sport)
     if not host: return None
-    url = f"https://{host}/{endpoint}"
     headers = {"x-apisports-key": API_KEY, "x-apisports-host": host}
-    try:
-        response = requests.get(url, headers=headers, params=params, timeout=15)
-        return response.json().get('response', [])
-    except:
-        return None
+    data = api_client.get_json(host, endpoint, params, headers=headers, timeout=15)
+    if data is None: return None
+    return data.get('response', [])
+
+def fixtures_request(params, item_filter=None, filter_key=None):
+    """ Teljes foci fixtures válasz (a results_store tömeges, streamelve szűrt napi lekéréséhez). """
+    host = HOSTS["football"]
+    headers = {"x-apisports-key": API_KEY, "x-apisports-host": host}
+    return api_client.get_json(host, "fixtures", params, headers=headers, timeout=30, item_filter=item_filter, filter_key=filter_key)
 
 def determine_sport(match):
     liga = str(match.get('liga_nev', '')).lower()
@@ -78,8 +86,14 @@ def check_match_result(match):
     if not f_id: return None
     
     sport = determine_sport(match)
+    # A már tárolt végeredmény nem változik: se cache, se hálózat
+    stored = results_store.get(sport, f_id)
+    if stored: return stored
     endpoint = "fixtures" if sport == 'football' else "games"
-    data = get_api_data(sport, endpoint, {"id": str(f_id)})
+    params = {"id": str(f_id)}
+    data = api_cache.get(sport, endpoint, params)
+    if data is None:
+        data = get_api_data(sport, endpoint, params)
 
     if not data: return None
     game_data = data[0]
@@ -88,6 +102,8 @@ def check_match_result(match):
     status = f_obj.get('status', {}).get('short')
 
     if status not in ['FT', 'AOT', 'PEN', 'AP']: return None
+    # Csak a lezárt meccset tesszük el, az már nem változik
+    api_cache.put(sport, endpoint, params, data, ttl=api_cache.FINISHED_RESULT_TTL)
 
     try:
         if sport == 'football':
@@ -97,6 +113,8 @@ def check_match_result(match):
         elif sport == 'hockey':
             h, a = game_data['scores']['home'], game_data['scores']['away']
         if h is None or a is None: return None
+        try: results_store.put(sport, f_id, h, a, status=status, kickoff=f_obj.get('date'), league_id=game_data.get('league', {}).get('id'))
+        except Exception as e: print(f"Eredmény raktár írási hiba ({f_id}): {e}")
         return {"h": h, "a": a}
     except:
         return None
@@ -159,7 +177,7 @@ async def send_grouped_reports(matches):
             print(f"Telegram hiba: {e}")
 
 def main():
-    print("=== EREDMÉNY ELLENŐRZŐ (V23.3 - TELJES VERZIÓ) ===")
+    print("=== EREDMÉNY ELLENŐRZŐ (V23.5 - TELJES VERZIÓ) ===")
     
     approved_ids = get_approved_match_ids()
     if not approved_ids:
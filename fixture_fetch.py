@@ -0,0 +1,153 @@
+# fixture_fetch.py (V1.2 - Üres ligaválasz, ahol meccs várható: napi lekérés)
+# A `fixtures?date=` hívás az egész világ napi meccseit hozza (hétvégén több ezret), amiből csak a releváns
+# ligák kellenek. Két stratégia közül választ a korábban mért adatok alapján:
+#   - "date":   1 hívás, a teljes napi lista streamelve, a nem releváns ligák már letöltés közben eldobva;
+#   - "league": ligánként 1 hívás (league + season + date), csak a szükséges meccsek jönnek le.
+# A mérések (napi össz meccsszám hét/hétvége bontásban, bájt/meccs, ligák aktuális szezonja) a
+# napi lekérésekből frissülnek; ligánkénti lekérés csak akkor megy, ha minden liga szezonja ismert (friss mérésből
+# vagy a league_meta indexből).
+
+import os
+import json
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+import league_meta
+
+METRICS_PATH = os.environ.get("FIXTURE_FETCH_METRICS", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "fixture_fetch.json"))
+# "auto" | "date" | "league"
+FORCED_STRATEGY = os.environ.get("FIXTURE_FETCH_STRATEGY", "auto").lower()
+# Egy plusz hívás ára letöltött KB-ban kifejezve (késleltetés + napi kvóta)
+CALL_COST_KB = float(os.environ.get("FIXTURE_CALL_COST_KB", "120"))
+MAX_LEAGUE_CALLS = int(os.environ.get("FIXTURE_MAX_LEAGUE_CALLS", "40"))
+# Ennél régebbi szezon megfigyelésre nem építünk (szezonváltáskor a rossz szezon üres listát adna)
+SEASON_MAX_AGE_DAYS = int(os.environ.get("FIXTURE_SEASON_MAX_AGE_DAYS", "45"))
+# Legalább ilyen gyakran napi lekérés, hogy a mérések és a szezonok frissek maradjanak
+REMEASURE_DAYS = int(os.environ.get("FIXTURE_REMEASURE_DAYS", "3"))
+EWMA_ALPHA = 0.3
+# A liga átlagos napi meccsszáma (az adott naptípuson), amitől meccset várunk; üres ligaválasznál ilyenkor napi lekérés
+EXPECTED_MIN_FIXTURES = float(os.environ.get("FIXTURE_EXPECTED_MIN", "0.5"))
+
+_lock = threading.Lock()
+_metrics = None
+
+def _load():
+    global _metrics
+    if _metrics is None:
+        try:
+            with open(METRICS_PATH, 'r', encoding='utf-8') as f:
+                _metrics = json.load(f)
+        except (OSError, ValueError):
+            _metrics = {}
+    return _metrics
+
+def _save():
+    try:
+        os.makedirs(os.path.dirname(METRICS_PATH), exist_ok=True)
+        tmp_path = METRICS_PATH + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(_metrics, f, ensure_ascii=False)
+        os.replace(tmp_path, METRICS_PATH)
+    except OSError as e:
+        print(f"Meccslista mérések mentési hiba: {e}")
+
+def _today():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+def _days_between(a, b):
+    return abs((datetime.strptime(a, "%Y-%m-%d") - datetime.strptime(b, "%Y-%m-%d")).days)
+
+def _day_type(date_str):
+    return "weekend" if datetime.strptime(date_str, "%Y-%m-%d").weekday() >= 5 else "weekday"
+
+def _ewma(old, new):
+    return new if old is None else old + EWMA_ALPHA * (new - old)
+
+def _record(sport, date_str, league_ids, kept, payload_bytes, total=None):
+    """
+    Mérés frissítése; total (a nap összes meccse) csak napi lekérésből ismert. A releváns meccsszám ligánként
+    tárolódik, így a különböző ligalistájú hívók (generátor, exporter) mérései közösek maradnak.
+    """
+    with _lock:
+        m = _load().setdefault(sport, {"totals": {}, "per_league": {}, "bytes_per_fixture": None, "seasons": {}, "last_date_query": None})
+        day_type = _day_type(date_str)
+        per_league = m["per_league"].setdefault(day_type, {})
+        counts = {str(league_id): 0 for league_id in league_ids}
+        for f in kept: counts[str(f['league']['id'])] = counts.get(str(f['league']['id']), 0) + 1
+        for league_id, count in counts.items(): per_league[league_id] = _ewma(per_league.get(league_id), count)
+        count = total if total is not None else len(kept)
+        if payload_bytes and count: m["bytes_per_fixture"] = _ewma(m["bytes_per_fixture"], payload_bytes / count)
+        if total is not None:
+            m["totals"][day_type] = _ewma(m["totals"].get(day_type), total)
+            m["last_date_query"] = _today()
+        for f in kept:
+            m["seasons"][str(f['league']['id'])] = [str(f['league']['season']), _today()]
+        _save()
+
+def known_season(sport, league_id):
+    """
+    A liga szezonja: a legutóbb megfigyelt (ha elég friss) és a league_meta index közül az újabb, mert
+    szezonváltáskor bármelyik lehet pár napig elavult. None, ha egyik sem ismert.
+    """
+    with _lock:
+        entry = _load().get(sport, {}).get("seasons", {}).get(str(league_id))
+    observed = entry[0] if entry and _days_between(entry[1], _today()) <= SEASON_MAX_AGE_DAYS else None
+    candidates = [season for season in (observed, league_meta.current_season(sport, league_id)) if season]
+    return max(candidates) if candidates else None
+
+def choose_strategy(sport, date_str, league_ids, budget=None):
+    """ ("date" | "league", indoklás) a mért napi meccsszám, bájt/meccs és hívásköltség alapján. """
+    if FORCED_STRATEGY in ("date", "league"): return FORCED_STRATEGY, "kényszerítve"
+    day_type = _day_type(date_str)
+    with _lock:
+        m = _load().get(sport) or {}
+        total, per_league = m.get("totals", {}).get(day_type), m.get("per_league", {}).get(day_type, {})
+        bpf, last_date_query = m.get("bytes_per_fixture"), m.get("last_date_query")
+        relevant = None if any(str(league_id) not in per_league for league_id in league_ids) else sum(per_league[str(league_id)] for league_id in league_ids)
+    if total is None or relevant is None or not bpf: return "date", "még nincs mérés"
+    if not last_date_query or _days_between(last_date_query, _today()) >= REMEASURE_DAYS: return "date", "esedékes újramérés"
+    calls = len(league_ids)
+    if calls > MAX_LEAGUE_CALLS or (budget is not None and calls > budget): return "date", f"{calls} ligahívás túl sok"
+    if any(known_season(sport, league_id) is None for league_id in league_ids): return "date", "ismeretlen szezon"
+    date_cost = CALL_COST_KB + total * bpf / 1024
+    league_cost = calls * CALL_COST_KB + relevant * bpf / 1024
+    strategy = "league" if league_cost < date_cost else "date"
+    return strategy, f"becslés: napi {date_cost:.0f} KB-egyenérték vs. ligánként {league_cost:.0f} KB-egyenérték"
+
+def expected_leagues(sport, date_str, league_ids):
+    """ Azok a ligák, amelyeknek a mérések szerint az adott naptípuson általában van meccse. """
+    with _lock:
+        per_league = _load().get(sport, {}).get("per_league", {}).get(_day_type(date_str), {})
+        return {league_id for league_id in league_ids if (per_league.get(str(league_id)) or 0) >= EXPECTED_MIN_FIXTURES}
+
+def fetch_fixtures(sport, date_str, league_ids, request_fn, budget=None, max_workers=8):
+    """
+    Egy nap releváns meccsei. request_fn(params, item_filter=None, filter_key=None) -> teljes JSON válasz vagy None
+    (az api_client.get_json köré írt hívó-specifikus csomagoló). None, ha a lekérés sikertelen.
+    """
+    league_ids = set(league_ids)
+    strategy, reason = choose_strategy(sport, date_str, league_ids, budget)
+    print(f"📥 Meccslista ({sport}, {date_str}): '{strategy}' stratégia ({reason}).")
+
+    if strategy == "league":
+        def fetch_league(league_id):
+            return request_fn({"league": str(league_id), "season": known_season(sport, league_id), "date": date_str})
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(league_ids)))) as pool:
+            responses = list(pool.map(fetch_league, sorted(league_ids)))
+        if all(r is not None for r in responses):
+            kept = [f for r in responses for f in r.get('response', [])]
+            # Üres válasz ott, ahol meccs várható: rossz szezon vagy hiányos ligaszűrés is lehet, ezt a napi lista dönti el
+            empty = expected_leagues(sport, date_str, league_ids) - {f['league']['id'] for f in kept}
+            if not empty:
+                _record(sport, date_str, league_ids, kept, sum(r.get('_payload_bytes', 0) for r in responses))
+                return kept
+            print(f"⚠️ {len(empty)} liga üres, pedig meccs várható (pl. {min(empty)}), napi lekérésre váltok.")
+        else:
+            print("⚠️ Ligánkénti lekérés részben sikertelen, napi lekérésre váltok.")
+
+    data = request_fn({"date": date_str}, item_filter=lambda f: f['league']['id'] in league_ids,
+                      filter_key=("leagues", frozenset(league_ids)))
+    if data is None: return None
+    kept = data.get('response', [])
+    _record(sport, date_str, league_ids, kept, data.get('_payload_bytes', 0), total=data.get('results', len(kept)))
+    return kept
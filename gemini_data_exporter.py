@@ -1,11 +1,17 @@
-# gemini_data_exporter.py (V3.0 - Valós Backtest Pillanatkép Készítő)
+# gemini_data_exporter.py (V3.6 - Oszlopos pillanatkép (snapshot_store) mentés)
 import os
-import requests
 from datetime import datetime, timedelta
-import time
 import pytz
-import json
 from dotenv import load_dotenv
+import api_cache
+import api_client
+import api_quota
+import fixture_fetch
+import snapshot_store
+import league_meta
+import http_cassette
+
+http_cassette.install_from_env()
 
 load_dotenv()
 
@@ -14,8 +20,8 @@ RAPIDAPI_KEY = os.environ.get("RAPIDAPI_KEY")
 RAPIDAPI_HOST = "api-football-v1.p.rapidapi.com"
 BUDAPEST_TZ = pytz.timezone('Europe/Budapest')
 
-# Az új mappa, ahová a pillanatképeket mentjük
-SNAPSHOT_DATA_DIR = "backtest_snapshots" 
+# A mappa, ahová a pillanatképeket mentjük (oszlopos .npy + tömörített nyers JSON, lásd snapshot_store.py)
+SNAPSHOT_DATA_DIR = snapshot_store.SNAPSHOT_DIR
 
 # --- Releváns ligák listája (ugyanaz, mint a tipp_generator.py-ban) ---
 RELEVANT_LEAGUES = {
@@ -34,27 +40,44 @@ def get_api_data(endpoint, params, retries=3, delay=5):
     if not RAPIDAPI_KEY: 
         print(f"!!! HIBA: RAPIDAPI_KEY hiányzik! ({endpoint} hívás kihagyva)")
         return []
-    url = f"https://{RAPIDAPI_HOST}/v3/{endpoint}"
     headers = {"X-RapidAPI-Key": RAPIDAPI_KEY, "X-RapidAPI-Host": RAPIDAPI_HOST}
-    
-    for i in range(retries):
-        try:
-            response = requests.get(url, headers=headers, params=params, timeout=25)
-            response.raise_for_status() 
-            time.sleep(0.7) # API rate limiting
-            return response.json().get('response', [])
-        except requests.exceptions.RequestException as e:
-            print(f"API hívás hiba ({endpoint}), újrapróbálkozás {delay}s múlva... ({i+1}/{retries}) Hiba: {e}")
-            if i < retries - 1: 
-                time.sleep(delay)
-            else: 
-                print(f"Sikertelen API hívás ennyi próba után: {endpoint}")
-                return []
+
+    # A foci payloadok közösek a tipp_generator-ral (ugyanaz a cache névtér)
+    cacheable = api_cache.is_cacheable(endpoint)
+    if cacheable:
+        cached = api_cache.get("football", endpoint, params)
+        if cached is not None: return cached
+
+    # Retry/backoff és rate limit az api_client-ben (a korábbi fix 0.7 mp-es várakozás helyett)
+    data = api_client.get_json(RAPIDAPI_HOST, f"v3/{endpoint}", params, headers=headers, retries=retries, backoff=delay)
+    if data is None:
+        print(f"Sikertelen API hívás ennyi próba után: {endpoint}")
+        return []
+    payload = data.get('response', [])
+    if cacheable: api_cache.put("football", endpoint, params, payload)
+    return payload
+
+def fixtures_request(params, item_filter=None, filter_key=None):
+    """ Teljes fixtures válasz (a fixture_fetch stratégiáihoz); a nem releváns ligák streamelve kiszűrve. """
+    if not RAPIDAPI_KEY: return None
+    headers = {"X-RapidAPI-Key": RAPIDAPI_KEY, "X-RapidAPI-Host": RAPIDAPI_HOST}
+    return api_client.get_json(RAPIDAPI_HOST, "v3/fixtures", params, headers=headers, retries=3, backoff=5, item_filter=item_filter, filter_key=filter_key)
+
+def leagues_request(params):
+    """ Teljes leagues válasz a league_meta index heti frissítéséhez. """
+    if not RAPIDAPI_KEY: return None
+    headers = {"X-RapidAPI-Key": RAPIDAPI_KEY, "X-RapidAPI-Host": RAPIDAPI_HOST}
+    return api_client.get_json(RAPIDAPI_HOST, "v3/leagues", params, headers=headers, retries=3, backoff=5)
+
+def season_of(fixture):
+    """ A liga aktuális szezonja az indexből; ha nincs benne, a meccs saját szezonja (az év alapú becslés naptári éves ligáknál rossz). """
+    return league_meta.current_season("football", fixture['league']['id']) or str(fixture['league']['season'])
 
 def get_fixtures_for_snapshot(date_str):
     """ Lekéri a megadott napra (holnapra) érvényes, még el nem kezdődött meccseket. """
     print(f"Jövőbeli meccsek lekérése a(z) {date_str} napra...")
-    fixtures_raw = get_api_data("fixtures", {"date": date_str})
+    budget = api_quota.remaining_today(RAPIDAPI_HOST) - api_quota.QUOTA_RESERVE
+    fixtures_raw = fixture_fetch.fetch_fixtures("football", date_str, RELEVANT_LEAGUES, fixtures_request, budget=budget) or []
     
     relevant_fixtures = []
     now_utc = datetime.now(pytz.utc)
@@ -65,8 +88,8 @@ def get_fixtures_for_snapshot(date_str):
             fixture_time_str = f.get('fixture', {}).get('date')
             status_short = f.get('fixture', {}).get('status', {}).get('short', 'NS')
 
-            # Csak releváns liga ÉS még el nem kezdődött meccs
-            if league_id in RELEVANT_LEAGUES and status_short in ["NS", "TBD", "POST"]:
+            # Csak releváns, statisztikával és oddsokkal lefedett liga ÉS még el nem kezdődött meccs
+            if league_id in RELEVANT_LEAGUES and league_meta.supports("football", league_id, "stats", "odds") and status_short in ["NS", "TBD", "POST"]:
                 fixture_time = datetime.fromisoformat(fixture_time_str.replace('Z', '+00:00'))
                 if fixture_time > now_utc:
                     relevant_fixtures.append(f)
@@ -76,6 +99,33 @@ def get_fixtures_for_snapshot(date_str):
     print(f"Összesen {len(relevant_fixtures)} releváns jövőbeli meccs található {date_str} napra.")
     return relevant_fixtures
 
+def plan_snapshot_fixtures(fixtures):
+    """ Becsült hívásszám (tabella, 2 statisztika, H2H, odds meccsenként) a napi kereten belül, ligafontosság szerint. """
+    budget = api_quota.remaining_today(RAPIDAPI_HOST) - api_quota.QUOTA_RESERVE
+    priority = {league_id: i for i, league_id in enumerate(RELEVANT_LEAGUES)}
+
+    def cost(fixture, planned):
+        league_id, season = fixture['league']['id'], season_of(fixture)
+        home_id, away_id = fixture['teams']['home']['id'], fixture['teams']['away']['id']
+        keys = {("odds", fixture['fixture']['id'])}
+        if not api_cache.contains("football", "standings", {"league": str(league_id), "season": season}):
+            keys.add(("standings", league_id))
+        for team_id in (home_id, away_id):
+            if not api_cache.contains("football", "teams/statistics", {"league": str(league_id), "season": season, "team": str(team_id)}):
+                keys.add(("stats", team_id, league_id))
+        if not api_cache.contains("football", "fixtures/headtohead", {"h2h": f"{home_id}-{away_id}", "last": "5"}):
+            keys.add(("h2h", home_id, away_id))
+        new_keys = keys - planned
+        return len(new_keys), new_keys
+
+    kept, estimate, skipped = api_quota.plan_within_budget(fixtures, cost, lambda f: priority.get(f['league']['id'], len(priority)), budget)
+    print(f"Kvóta terv: ~{estimate} hívás, keret: {budget}.")
+    if skipped:
+        print(f"Figyelmeztetés: kvóta miatt {len(skipped)} meccs kimarad ({', '.join(sorted({RELEVANT_LEAGUES.get(f['league']['id'], '?') for f in skipped}))}).")
+    # Az eredeti (időrendi) sorrend megtartása a pillanatképben
+    kept_ids = {f['fixture']['id'] for f in kept}
+    return [f for f in fixtures if f['fixture']['id'] in kept_ids]
+
 def main():
     start_time = datetime.now(BUDAPEST_TZ)
     
@@ -83,8 +133,8 @@ def main():
     tomorrow_date = start_time + timedelta(days=1)
     tomorrow_str = tomorrow_date.strftime("%Y-%m-%d")
     
-    # A kimeneti fájl neve a *holnapi* dátumot viseli
-    output_filename = os.path.join(SNAPSHOT_DATA_DIR, f"snapshot_data_{tomorrow_str}.json")
+    # A kimeneti fájlok neve a *holnapi* dátumot viseli
+    output_filename = snapshot_store.npy_path(tomorrow_str, SNAPSHOT_DATA_DIR)
     
     # Ellenőrizzük, hogy a mappa létezik-e
     if not os.path.exists(SNAPSHOT_DATA_DIR):
@@ -92,12 +142,13 @@ def main():
         print(f"'{SNAPSHOT_DATA_DIR}' mappa létrehozva.")
 
     # Ellenőrizzük, hogy erre a napra készült-e már mentés
-    if os.path.exists(output_filename):
+    if snapshot_store.exists(tomorrow_str, SNAPSHOT_DATA_DIR):
         print(f"A(z) {tomorrow_str} napra már készült pillanatkép. A futtatás leáll.")
         return
 
     print(f"--- Pillanatkép Készítő (V3.0) indítása a(z) {tomorrow_str} napra ---")
     
+    league_meta.refresh("football", leagues_request)
     upcoming_fixtures = get_fixtures_for_snapshot(tomorrow_str)
     if not upcoming_fixtures:
         print("Nem található releváns meccs a holnapi napra. A fájl mentése üresen történik.")
@@ -105,12 +156,13 @@ def main():
     else:
         all_match_data = []
         standings_cache = {}
-        season = str(start_time.year) # A statisztikákhoz az *aktuális* szezont használjuk
+        # A statisztikákhoz ligánként az *aktuális* szezont használjuk (naptári éves ligáknál ez nem az őszi év)
+        upcoming_fixtures = plan_snapshot_fixtures(upcoming_fixtures)
 
         # 1. Tabellák előtöltése (ugyanaz a logika, mint a tipp_generator.py-ban)
         print("Tabellák előtöltése...")
-        league_ids = list(set(f['league']['id'] for f in upcoming_fixtures))
-        for league_id in league_ids:
+        league_seasons = {f['league']['id']: season_of(f) for f in upcoming_fixtures}
+        for league_id, season in league_seasons.items():
             standings_data = get_api_data("standings", {"league": str(league_id), "season": season})
             if standings_data and isinstance(standings_data, list) and standings_data[0].get('league', {}).get('standings'):
                 standings_cache[league_id] = standings_data[0]['league']['standings'][0]
@@ -124,6 +176,7 @@ def main():
             league_id = fixture['league']['id']
             home_id = fixture['teams']['home']['id']
             away_id = fixture['teams']['away']['id']
+            season = league_seasons[league_id]
             
             print(f"({i}/{len(upcoming_fixtures)}) - {fixture['teams']['home']['name']} vs {fixture['teams']['away']['name']} adatainak gyűjtése...")
 
@@ -141,13 +194,14 @@ def main():
             }
             all_match_data.append(match_data_package)
 
-    # 3. Mentés fájlba
+    # 3. Mentés: jellemzők oszloposan, a nyers csomagok tömörítve mellé
     try:
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            json.dump(all_match_data, f, ensure_ascii=False, indent=4)
-        print(f"\nSikeres mentés: {len(all_match_data)} meccs adatai elmentve a(z) '{output_filename}' fájlba.")
+        count = snapshot_store.write_day(tomorrow_str, all_match_data, SNAPSHOT_DATA_DIR)
+        print(f"\nSikeres mentés: {count} meccs adatai elmentve a(z) '{output_filename}' fájlba (nyers adatok: '{snapshot_store.raw_path(tomorrow_str, SNAPSHOT_DATA_DIR)}').")
     except Exception as e:
         print(f"\n!!! HIBA a fájl mentésekor: {e}")
 
+    print(f"\nAPI forgalom:\n{api_client.format_stats()}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,72 @@
+# goal_model.py (V1.0 - Poisson gólmodell, előre számolt valószínűség táblákkal)
+# A teams/statistics hazai/vendég átlagaiból meccsenként várható gólszámot (xG) becsül, majd az összes meccs
+# teljes eredmény-valószínűség mátrixát egyszerre számolja NumPy-jal. A Poisson PMF egy rácson (0.01 lépés)
+# előre számolt tábla, így egy nap pár száz meccse ezredmásodpercek alatt megvan.
+# Kimenet: P(BTTS), P(Over 1.5 / 2.5 / 3.5), 1X2 valószínűségek.
+
+from functools import lru_cache
+import numpy as np
+
+MAX_GOALS = 12          # csapatonként ennyi gólig számolunk (a maradék valószínűség elhanyagolható)
+LAMBDA_STEP = 0.01
+MAX_LAMBDA = 6.0
+OVER_LINES = (1.5, 2.5, 3.5)
+PROBABILITY_COLUMNS = ["xg_home", "xg_away", "p_home", "p_draw", "p_away", "p_btts", "p_over15", "p_over25", "p_over35"]
+
+@lru_cache(maxsize=1)
+def pmf_table():
+    """ (λ rács × gólszám) Poisson valószínűségek; a k! helyett kumulált szorzat a numerikus stabilitásért. """
+    lambdas = np.arange(0, MAX_LAMBDA + LAMBDA_STEP / 2, LAMBDA_STEP)
+    k = np.arange(MAX_GOALS + 1)
+    ratios = np.ones((len(lambdas), MAX_GOALS + 1))
+    ratios[:, 1:] = lambdas[:, None] / k[None, 1:]
+    return np.exp(-lambdas)[:, None] * np.cumprod(ratios, axis=1)
+
+@lru_cache(maxsize=1)
+def _masks():
+    """ Eredmény mátrix maszkok: összgól > vonal, hazai győzelem / döntetlen / vendég győzelem. """
+    h, a = np.indices((MAX_GOALS + 1, MAX_GOALS + 1))
+    return {"total": {line: (h + a) > line for line in OVER_LINES}, "home": h > a, "draw": h == a, "away": h < a}
+
+def lookup_pmf(rates):
+    """ Várható gólszámok -> (meccs × gólszám) PMF sorok a táblából (a rácsra kerekítve, vágva). """
+    rates = np.nan_to_num(np.asarray(rates, dtype=float), nan=0.0)
+    index = np.clip(np.rint(rates / LAMBDA_STEP), 0, len(pmf_table()) - 1).astype(int)
+    return pmf_table()[index]
+
+def expected_goals(h_scored, h_conceded, v_scored, v_conceded):
+    """ Hazai xG = (hazai rúgott otthon + vendég kapott idegenben) / 2, a vendégé fordítva. """
+    h_scored, h_conceded = np.asarray(h_scored, dtype=float), np.asarray(h_conceded, dtype=float)
+    v_scored, v_conceded = np.asarray(v_scored, dtype=float), np.asarray(v_conceded, dtype=float)
+    return (h_scored + v_conceded) / 2, (v_scored + h_conceded) / 2
+
+def score_matrices(xg_home, xg_away):
+    """ (meccs × hazai gól × vendég gól) valószínűségek, független Poisson feltevéssel. """
+    return lookup_pmf(xg_home)[:, :, None] * lookup_pmf(xg_away)[:, None, :]
+
+def probabilities(xg_home, xg_away):
+    """ Meccsenkénti piaci valószínűségek {oszlop: tömb} alakban (PROBABILITY_COLUMNS). """
+    xg_home, xg_away = np.atleast_1d(np.asarray(xg_home, dtype=float)), np.atleast_1d(np.asarray(xg_away, dtype=float))
+    pmf_h, pmf_a = lookup_pmf(xg_home), lookup_pmf(xg_away)
+    matrices = pmf_h[:, :, None] * pmf_a[:, None, :]
+    masks = _masks()
+    result = {
+        "xg_home": xg_home, "xg_away": xg_away,
+        "p_home": matrices[:, masks["home"]].sum(axis=1),
+        "p_draw": matrices[:, masks["draw"]].sum(axis=1),
+        "p_away": matrices[:, masks["away"]].sum(axis=1),
+        "p_btts": (1 - pmf_h[:, 0]) * (1 - pmf_a[:, 0]),
+    }
+    for line in OVER_LINES:
+        result[f"p_over{str(line).replace('.', '')}"] = matrices[:, masks["total"][line]].sum(axis=1)
+    return result
+
+def from_features(h_scored, h_conceded, v_scored, v_conceded):
+    """ A scoring_engine jellemzőiből (meccsenkénti gólátlagok) közvetlenül a valószínűségek. """
+    return probabilities(*expected_goals(h_scored, h_conceded, v_scored, v_conceded))
+
+def describe(xg_home, xg_away):
+    """ Egy meccs rövid, promptba / üzenetbe írható összefoglalója. """
+    p = {k: float(v[0]) for k, v in probabilities(xg_home, xg_away).items()}
+    return (f"xG {p['xg_home']:.2f}-{p['xg_away']:.2f} | 1X2 {p['p_home']:.0%}/{p['p_draw']:.0%}/{p['p_away']:.0%} | "
+            f"BTTS {p['p_btts']:.0%} | O1.5 {p['p_over15']:.0%} | O2.5 {p['p_over25']:.0%} | O3.5 {p['p_over35']:.0%}")
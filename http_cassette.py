@@ -0,0 +1,174 @@
+# http_cassette.py (V1.3 - Streamelt olvasás (iter_content) visszajátszott requests válaszon)
+# Record módban minden kimenő HTTP kérést és választ (api-sports, The-Odds-API, 90perc.hu, Anthropic,
+# Supabase REST) egy tömörített kazettába ír; replay módban hálózat nélkül onnan szolgálja ki őket.
+#
+# Használat:
+#   HTTP_CASSETTE=cassettes/generator.jsonl.gz HTTP_CASSETTE_MODE=record python tipp_generator.py --test
+#   HTTP_CASSETTE=cassettes/generator.jsonl.gz HTTP_CASSETTE_MODE=replay python tipp_generator.py --test
+# HTTP_CASSETTE_LATENCY=1 mellett a visszajátszás a felvett válaszidőt is kivárja (valósághű időméréshez).
+# Méréskor érdemes API_CACHE_DISABLED=1-gyel futtatni, hogy a lemez cache ne takarja el a hívásokat.
+
+import os
+import re
+import gzip
+import json
+import time
+import base64
+import atexit
+import hashlib
+import threading
+from collections import defaultdict, deque
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import requests
+
+CASSETTE_PATH = os.environ.get("HTTP_CASSETTE")
+CASSETTE_MODE = os.environ.get("HTTP_CASSETTE_MODE", "").lower()
+REPLAY_LATENCY = os.environ.get("HTTP_CASSETTE_LATENCY", "").lower() in ("1", "true", "yes")
+
+# A válaszfejlécek közül csak ezeket tartjuk meg (a kérés fejléceit – API kulcsok! – nem írjuk ki)
+KEPT_RESPONSE_HEADERS = {"content-type", "x-ratelimit-remaining", "x-ratelimit-limit", "x-ratelimit-requests-remaining", "x-ratelimit-requests-limit", "retry-after", "content-range"}
+
+# Az URL-ben utazó titkok (Telegram bot token az útvonalban, The-Odds-API apiKey stb. a query-ben) nem kerülnek a
+# kazettára; felvételkor és visszajátszáskor is kitakarva képződik a kulcs, így az egyezés változatlan
+REDACTED = "REDACTED"
+SECRET_QUERY_PARAMS = {"apikey", "api_key", "key", "token", "access_token"}
+SECRET_PATH = re.compile(r"/bot[^/]+")
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """ Replay módban a kérés nem szerepel a kazettán; hálózati hibaként a kliensek szokásos hibakezelésén megy át. """
+
+_lock = threading.Lock()
+_writer = None
+_by_exact = defaultdict(deque)
+_by_url = defaultdict(deque)
+_installed = False
+
+def _normalize_url(url):
+    """ Rendezett query, kitakart titkokkal. """
+    parts = urlsplit(str(url))
+    params = [(k, REDACTED if k.lower() in SECRET_QUERY_PARAMS else v) for k, v in parse_qsl(parts.query, keep_blank_values=True)]
+    path = SECRET_PATH.sub(f"/bot{REDACTED}", parts.path, count=1) if parts.netloc == "api.telegram.org" else parts.path
+    return urlunsplit((parts.scheme, parts.netloc, path, urlencode(sorted(params)), ""))
+
+def _body_hash(body):
+    if not body: return ""
+    if isinstance(body, str): body = body.encode("utf-8")
+    return hashlib.sha1(body).hexdigest()
+
+def _keys(method, url, body):
+    url_key = f"{method.upper()} {_normalize_url(url)}"
+    return f"{url_key} {_body_hash(body)}", url_key
+
+def _write(entry):
+    global _writer
+    with _lock:
+        if _writer is None:
+            os.makedirs(os.path.dirname(os.path.abspath(CASSETTE_PATH)), exist_ok=True)
+            _writer = gzip.open(CASSETTE_PATH, "at", encoding="utf-8")
+            atexit.register(_writer.close)
+        _writer.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+def _record(method, url, body, status, headers, content, elapsed):
+    exact_key, _ = _keys(method, url, body)
+    _write({
+        "key": exact_key,
+        "status": status,
+        "headers": {k.lower(): v for k, v in headers.items() if k.lower() in KEPT_RESPONSE_HEADERS},
+        "content": base64.b64encode(content or b"").decode("ascii"),
+        "elapsed": round(elapsed, 4),
+    })
+
+def _load():
+    with gzip.open(CASSETTE_PATH, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip(): continue
+            entry = json.loads(line)
+            _by_exact[entry["key"]].append(entry)
+            _by_url[entry["key"].rsplit(" ", 1)[0]].append(entry)
+    print(f"📼 Kazetta betöltve: {sum(len(q) for q in _by_exact.values())} válasz ({CASSETTE_PATH})")
+
+def _take(method, url, body):
+    """ Először pontos (URL + törzs) egyezés, utána csak URL egyezés; az utolsó válasz ismételhető. """
+    exact_key, url_key = _keys(method, url, body)
+    with _lock:
+        for table, key in ((_by_exact, exact_key), (_by_url, url_key)):
+            queue = table.get(key)
+            if queue:
+                return queue.popleft() if len(queue) > 1 else queue[0]
+    raise CassetteMiss(f"Nincs a kazettán: {exact_key}")
+
+def _replay_payload(method, url, body):
+    entry = _take(method, url, body)
+    if REPLAY_LATENCY: time.sleep(entry.get("elapsed", 0))
+    return entry["status"], entry["headers"], base64.b64decode(entry["content"])
+
+def _httpx_replay(request):
+    """ httpx válasz a kazettáról; a hiány httpx.ConnectError, ahogy egy elérhetetlen hostnál. """
+    import httpx
+    try:
+        status, headers, content = _replay_payload(request.method, request.url, request.content)
+    except CassetteMiss as e:
+        raise httpx.ConnectError(str(e), request=request) from e
+    return httpx.Response(status, headers=headers, content=content, request=request)
+
+def _requests_replay(request):
+    """ requests válasz a kazettáról; a hiány CassetteMiss (requests ConnectionError). """
+    from requests.structures import CaseInsensitiveDict
+    status, headers, content = _replay_payload(request.method, request.url, request.body)
+    response = requests.Response()
+    response.status_code, response._content, response.url, response.request = status, content, request.url, request
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = "utf-8"
+    # A tartalom már a memóriában van: a streamelt olvasás (stream=True + iter_content) is innen szolgál ki
+    response._content_consumed = True
+    return response
+
+def _patch_requests():
+    original_send = requests.Session.send
+
+    def send(self, request, **kwargs):
+        if CASSETTE_MODE == "replay": return _requests_replay(request)
+        started = time.monotonic()
+        response = original_send(self, request, **kwargs)
+        _record(request.method, request.url, request.body, response.status_code, response.headers, response.content, time.monotonic() - started)
+        return response
+
+    requests.Session.send = send
+
+def _patch_httpx():
+    try:
+        import httpx
+    except ImportError:
+        return
+    original_send = httpx.Client.send
+    original_async_send = httpx.AsyncClient.send
+
+    def send(self, request, **kwargs):
+        if CASSETTE_MODE == "replay": return _httpx_replay(request)
+        started = time.monotonic()
+        response = original_send(self, request, **kwargs)
+        response.read()
+        _record(request.method, request.url, request.content, response.status_code, response.headers, response.content, time.monotonic() - started)
+        return response
+
+    async def async_send(self, request, **kwargs):
+        if CASSETTE_MODE == "replay": return _httpx_replay(request)
+        started = time.monotonic()
+        response = await original_async_send(self, request, **kwargs)
+        await response.aread()
+        _record(request.method, request.url, request.content, response.status_code, response.headers, response.content, time.monotonic() - started)
+        return response
+
+    httpx.Client.send = send
+    httpx.AsyncClient.send = async_send
+
+def install_from_env():
+    """ A szkriptek elején hívandó; HTTP_CASSETTE + HTTP_CASSETTE_MODE nélkül nem csinál semmit. """
+    global _installed
+    if _installed or not CASSETTE_PATH or CASSETTE_MODE not in ("record", "replay"): return False
+    if CASSETTE_MODE == "replay": _load()
+    else: print(f"📼 HTTP felvétel: {CASSETTE_PATH}")
+    _patch_requests()
+    _patch_httpx()
+    _installed = True
+    return True
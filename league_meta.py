@@ -0,0 +1,100 @@
+# league_meta.py (V1.0 - Liga metaadat index: aktuális szezon és lefedettség, hetente frissítve)
+# A `leagues` végpontból ligánként az aktuális szezon és a lefedettségi (coverage) jelzők kerülnek egy kis
+# JSON indexbe (.cache/league_meta.json). Így a statisztika kérések a liga valódi szezonjával mennek (az
+# év/hónap alapú becslés a naptári éves ligáknál - MLS, Brasileirão, Allsvenskan, Eliteserien - rossz), és a
+# statisztika / odds lefedettség nélküli ligák meccsei hívás előtt kiesnek.
+
+import os
+import json
+import threading
+from datetime import datetime, timezone
+
+META_PATH = os.environ.get("LEAGUE_META_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "league_meta.json"))
+REFRESH_DAYS = int(os.environ.get("LEAGUE_META_REFRESH_DAYS", "7"))
+# Foci (v3): csak az aktuális szezonok jönnek (1 hívás az összes ligára); a v1 hostoknak nincs ilyen szűrője
+LEAGUE_QUERY = {"football": {"current": "true"}}
+
+_lock = threading.Lock()
+_index = None
+
+def _load():
+    global _index
+    if _index is None:
+        try:
+            with open(META_PATH, 'r', encoding='utf-8') as f:
+                _index = json.load(f)
+        except (OSError, ValueError):
+            _index = {}
+    return _index
+
+def _save():
+    try:
+        os.makedirs(os.path.dirname(META_PATH), exist_ok=True)
+        tmp_path = META_PATH + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(_index, f, ensure_ascii=False)
+        os.replace(tmp_path, META_PATH)
+    except OSError as e:
+        print(f"Liga metaadat mentési hiba: {e}")
+
+def _today():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+def _pick_season(seasons, today):
+    """ A current jelzésű szezon; ha nincs ilyen (v1 hostok), a mai napot lefedő, végül a legutolsó. """
+    if not seasons: return None
+    current = [s for s in seasons if s.get('current')]
+    if current: return current[-1]
+    running = [s for s in seasons if (s.get('start') or "") <= today <= (s.get('end') or "")]
+    return (running or seasons)[-1]
+
+def _coverage_flags(coverage):
+    """ A tippekhez szükséges lefedettség: csapat statisztika (meccs statisztika vagy tabella), odds, sérültek. """
+    coverage = coverage or {}
+    fixtures = coverage.get('fixtures') or coverage.get('games') or {}
+    statistics = fixtures.get('statistics_fixtures') or fixtures.get('statistics')
+    if isinstance(statistics, dict): statistics = any(statistics.values())
+    return {"stats": bool(statistics or coverage.get('standings')), "odds": bool(coverage.get('odds')), "injuries": bool(coverage.get('injuries'))}
+
+def _compact(items, today):
+    leagues = {}
+    for item in items:
+        league = item.get('league') or item
+        season = _pick_season(item.get('seasons') or [], today)
+        if not league.get('id') or not season: continue
+        leagues[str(league['id'])] = {"season": str(season.get('year') or season.get('season')), "start": season.get('start'),
+                                      "end": season.get('end'), **_coverage_flags(season.get('coverage'))}
+    return leagues
+
+def refresh(sport, request_fn, force=False):
+    """
+    Az index frissítése, ha REFRESH_DAYS-nél régebbi (vagy még nincs). request_fn(params) -> teljes JSON válasz vagy None.
+    Sikertelen lekérésnél a régi index marad érvényben, a következő futás újra próbálja.
+    """
+    with _lock:
+        entry = _load().get(sport)
+        if entry and not force:
+            age = (datetime.strptime(_today(), "%Y-%m-%d") - datetime.strptime(entry["fetched"], "%Y-%m-%d")).days
+            if age < REFRESH_DAYS: return
+        data = request_fn(dict(LEAGUE_QUERY.get(sport, {})))
+        items = (data or {}).get('response') or []
+        if not items:
+            print(f"⚠️ Liga metaadatok ({sport}) nem frissíthetők, {'a régi index marad' if entry else 'becsült szezonnal megy tovább'}.")
+            return
+        _index[sport] = {"fetched": _today(), "leagues": _compact(items, _today())}
+        _save()
+        print(f"📚 Liga metaadatok frissítve ({sport}): {len(_index[sport]['leagues'])} liga.")
+
+def league_info(sport, league_id):
+    with _lock:
+        return (_load().get(sport) or {}).get("leagues", {}).get(str(league_id))
+
+def current_season(sport, league_id):
+    """ A liga aktuális szezonja (pl. "2025"), vagy None, ha a liga nincs az indexben. """
+    info = league_info(sport, league_id)
+    return info["season"] if info else None
+
+def supports(sport, league_id, *needs):
+    """ Megvan-e a liga lefedettségében minden kért jelző ("stats", "odds", "injuries"); ismeretlen ligánál True. """
+    info = league_info(sport, league_id)
+    return info is None or all(info.get(need, True) for need in needs)
@@ -0,0 +1,116 @@
+# models.py (V1.1 - Tömör, típusos meccs / statisztika / odds modellek)
+# Az api-sports nyers, mélyen egymásba ágyazott JSON-jából csak az elemzéshez használt mezők maradnak meg,
+# __slots__-os dataclassokban. Az oddsok piaconként fix indexű tömbben (hiányzó odds = NaN).
+# A tipp_generator elemzői és a backtester is ezeken dolgozik.
+
+import math
+from array import array
+from dataclasses import dataclass, field
+
+# Odds piac indexek
+BTTS_YES, OVER_25, HOME_WIN = 0, 1, 2
+MARKET_COUNT = 3
+MARKET_NAMES = ("btts_odd", "over25_odd", "home_odd")
+EDGE_NAMES = ("btts_edge", "over25_edge", "home_edge")
+
+# (fogadás neve, érték) -> piac index, sportonként (a foci "Home/Away" piaca döntetlen-visszatérítéses, nem 1X2)
+FOOTBALL_MARKETS = {
+    ("Both Teams to Score", "Yes"): BTTS_YES,
+    ("Goals Over/Under", "Over 2.5"): OVER_25,
+    ("Match Winner", "Home"): HOME_WIN,
+}
+GAME_MARKETS = {
+    ("Home/Away", "Home"): HOME_WIN,
+    ("Money Line", "Home"): HOME_WIN,
+    ("Match Winner", "Home"): HOME_WIN,
+}
+
+@dataclass(slots=True)
+class Fixture:
+    id: int
+    date: str
+    status: str
+    league_id: int
+    league_name: str
+    season: str
+    home_id: int
+    home_name: str
+    away_id: int
+    away_name: str
+
+    @classmethod
+    def from_api(cls, raw):
+        """ Foci fixture (fixture / league / teams szerkezet). """
+        fixture, league, teams = raw['fixture'], raw['league'], raw['teams']
+        return cls(fixture['id'], fixture['date'], fixture['status']['short'], league['id'], league['name'], str(league.get('season')),
+                   teams['home']['id'], teams['home']['name'], teams['away']['id'], teams['away']['name'])
+
+    @classmethod
+    def from_game(cls, raw):
+        """ Hoki / kosár game (lapos id / date / status szerkezet). """
+        league, teams = raw['league'], raw['teams']
+        return cls(raw['id'], raw['date'], raw['status']['short'], league['id'], league['name'], str(league.get('season')),
+                   teams['home']['id'], teams['home']['name'], teams['away']['id'], teams['away']['name'])
+
+@dataclass(slots=True)
+class TeamStats:
+    """ A teams/statistics válaszból a hazai / vendég bontású gól- és győzelmi adatok, plusz a forma. """
+    played_home: int
+    played_away: int
+    scored_home: int
+    scored_away: int
+    conceded_home: int
+    conceded_away: int
+    wins_home: int
+    form: str
+
+    @classmethod
+    def from_api(cls, raw):
+        """ None, ha hiányzik a statisztika vagy a gól blokk. """
+        if not raw or not raw.get('goals'): return None
+        played, goals = raw['fixtures']['played'], raw['goals']
+        return cls(played['home'] or 0, played['away'] or 0,
+                   goals['for']['total']['home'] or 0, goals['for']['total']['away'] or 0,
+                   goals['against']['total']['home'] or 0, goals['against']['total']['away'] or 0,
+                   raw['fixtures']['wins']['home'] or 0, raw.get('form') or "")
+
+def _nan_markets():
+    return array('d', [math.nan]) * MARKET_COUNT
+
+@dataclass(slots=True)
+class Odds:
+    """
+    Piaconkénti oddsok; values[BTTS_YES] stb. a referencia (első) iroda ára, hiányzó piac = NaN.
+    best / prob: az összes iroda legjobb ára és marzsmentes konszenzus valószínűsége (odds_engine tölti).
+    """
+    values: array
+    best: array = field(default_factory=_nan_markets)
+    prob: array = field(default_factory=_nan_markets)
+
+    @classmethod
+    def from_bets(cls, bets, markets=FOOTBALL_MARKETS):
+        """ Egy iroda 'bets' listájából; több azonos piacú érték esetén az utolsó érvényes marad. """
+        values = _nan_markets()
+        for bet in bets or []:
+            name = bet.get('name')
+            for v in bet.get('values', []):
+                index = markets.get((name, v.get('value')))
+                if index is None: continue
+                try: values[index] = float(v.get('odd'))
+                except (TypeError, ValueError): pass
+        return cls(values)
+
+    @classmethod
+    def from_bookmakers(cls, bookmakers, markets=FOOTBALL_MARKETS):
+        """ Az első iroda oddsai (ahogy eddig is), vagy None, ha nincs iroda vagy üres a fogadáslistája. """
+        bets = bookmakers[0].get('bets') if bookmakers else None
+        return cls.from_bets(bets, markets) if bets else None
+
+    def get(self, index):
+        """ Az odds, vagy None, ha az adott piac hiányzik. """
+        value = self.values[index]
+        return None if math.isnan(value) else value
+
+    def edge(self, index):
+        """ Várható érték a legjobb áron a konszenzushoz képest (best * prob - 1); NaN, ha nincs konszenzus. """
+        return self.best[index] * self.prob[index] - 1.0
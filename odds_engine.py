@@ -0,0 +1,93 @@
+# odds_engine.py (V1.1 - Konszenzus csak legalább két iroda árából)
+# Az odds payload minden irodáját egy (meccs × kimenet × iroda) NumPy mátrixba tölti, és egyetlen
+# vektorizált lépésben számolja: legjobb ár, marzsmentes konszenzus valószínűség, edge (legjobb ár vs. konszenzus).
+# A marzs levonása piaconként arányos: egy iroda kimenetenkénti 1/odds értékei 1-re normálva.
+
+from array import array
+import numpy as np
+import models
+
+# (piac csoport, fogadás neve, érték); egy csoport kimenetei együtt adják az 1-et
+FOOTBALL_OUTCOMES = [
+    ("btts", "Both Teams to Score", "Yes"), ("btts", "Both Teams to Score", "No"),
+    ("ou25", "Goals Over/Under", "Over 2.5"), ("ou25", "Goals Over/Under", "Under 2.5"),
+    ("1x2", "Match Winner", "Home"), ("1x2", "Match Winner", "Draw"), ("1x2", "Match Winner", "Away"),
+]
+# Hoki / kosár: a kétesélyes (hosszabbítással) piacot részesítjük előnyben, a 3 esélyes rendes játékidős a tartalék
+GAME_OUTCOMES = [
+    ("home_away", "Home/Away", "Home"), ("home_away", "Home/Away", "Away"),
+    ("moneyline", "Money Line", "Home"), ("moneyline", "Money Line", "Away"),
+    ("1x2", "Match Winner", "Home"), ("1x2", "Match Winner", "Draw"), ("1x2", "Match Winner", "Away"),
+]
+# Ennyi, a piac minden kimenetét árazó iroda kell a konszenzushoz
+MIN_BOOKMAKERS = 2
+# models piac index -> kimenet indexek preferencia sorrendben
+FOOTBALL_MARKET_OUTCOMES = {models.BTTS_YES: [0], models.OVER_25: [2], models.HOME_WIN: [4]}
+GAME_MARKET_OUTCOMES = {models.HOME_WIN: [0, 2, 4]}
+
+def build_tensor(bookmaker_lists, outcomes):
+    """ (meccs × kimenet × iroda) odds mátrix; hiányzó vagy érvénytelen (<= 1.0) odds = NaN. """
+    index = {(name, value): i for i, (_, name, value) in enumerate(outcomes)}
+    width = max((len(b or []) for b in bookmaker_lists), default=0)
+    tensor = np.full((len(bookmaker_lists), len(outcomes), max(width, 1)), np.nan)
+    for f, bookmakers in enumerate(bookmaker_lists):
+        for b, bookmaker in enumerate(bookmakers or []):
+            for bet in bookmaker.get('bets', []):
+                name = bet.get('name')
+                for v in bet.get('values', []):
+                    i = index.get((name, v.get('value')))
+                    if i is None: continue
+                    try: odd = float(v.get('odd'))
+                    except (TypeError, ValueError): continue
+                    if odd > 1.0: tensor[f, i, b] = odd
+    return tensor
+
+def price(tensor, outcomes):
+    """ (legjobb ár, konszenzus valószínűség) kimenetenként, (meccs × kimenet) alakban; kevesebb mint MIN_BOOKMAKERS irodánál NaN konszenzus. """
+    implied = 1.0 / tensor
+    fair = np.full_like(implied, np.nan)
+    groups = np.array([group for group, _, _ in outcomes])
+    for group in dict.fromkeys(groups):
+        cols = groups == group
+        # Csoportonként mindkét (összes) kimenet kell az irodától; a NaN összeg kiejti a hiányos irodákat
+        overround = implied[:, cols, :].sum(axis=1, keepdims=True)
+        fair[:, cols, :] = implied[:, cols, :] / overround
+    valid = ~np.isnan(fair)
+    counts = valid.sum(axis=2)
+    # Egyetlen iroda saját marzsmentes ára nem konszenzus (az edge mindig a marzs mínusza lenne): ott NaN marad
+    consensus = np.divide(np.where(valid, fair, 0.0).sum(axis=2), counts, out=np.full(counts.shape, np.nan), where=counts >= MIN_BOOKMAKERS)
+    has_price = ~np.isnan(tensor)
+    best = np.where(has_price.any(axis=2), np.where(has_price, tensor, -np.inf).max(axis=2), np.nan)
+    return best, consensus
+
+def market_view(best, consensus, market_outcomes):
+    """ A models piacaira vetítve: az első olyan kimenet, amelyre van konszenzus. (meccs × MARKET_COUNT) tömbök. """
+    n = best.shape[0]
+    market_best, market_prob = np.full((n, models.MARKET_COUNT), np.nan), np.full((n, models.MARKET_COUNT), np.nan)
+    for market, candidates in market_outcomes.items():
+        for i in reversed(candidates):
+            known = ~np.isnan(consensus[:, i])
+            market_best[:, market] = np.where(known, best[:, i], market_best[:, market])
+            market_prob[:, market] = np.where(known, consensus[:, i], market_prob[:, market])
+    return market_best, market_prob
+
+def price_games(bookmaker_lists, sport):
+    """ Meccsenkénti (legjobb ár, konszenzus valószínűség) a models piac indexeire, egy vektorizált körben. """
+    outcomes, market_outcomes = (FOOTBALL_OUTCOMES, FOOTBALL_MARKET_OUTCOMES) if sport == "football" else (GAME_OUTCOMES, GAME_MARKET_OUTCOMES)
+    if not bookmaker_lists:
+        empty = np.empty((0, models.MARKET_COUNT))
+        return empty, empty
+    best, consensus = price(build_tensor(bookmaker_lists, outcomes), outcomes)
+    return market_view(best, consensus, market_outcomes)
+
+def build_odds(bookmaker_lists, sport):
+    """ bookmakers listák -> models.Odds lista (referencia = első iroda, plusz legjobb ár és konszenzus), vagy None. """
+    markets = models.FOOTBALL_MARKETS if sport == "football" else models.GAME_MARKETS
+    market_best, market_prob = price_games(bookmaker_lists, sport)
+    result = []
+    for i, bookmakers in enumerate(bookmaker_lists):
+        odds = models.Odds.from_bookmakers(bookmakers, markets)
+        if odds is not None:
+            odds.best, odds.prob = array('d', market_best[i]), array('d', market_prob[i])
+        result.append(odds)
+    return result
@@ -0,0 +1,119 @@
+# results_store.py (V1.0 - Helyi végeredmény raktár (SQLite))
+# Lezárt meccsek végeredménye sportonként és meccs id-nként. Egy lejátszott meccs eredménye már nem változik,
+# így a backtester és az eredmény ellenőrző innen olvas, és csak a még sosem látott meccsekért megy a hálózatra.
+# Források: az eredmeny_ellenorzo kiértékelései (check_match_result), és napi tömeges lekérések
+# (pull_date: a nap összes lezárt meccse egyetlen hívásból, streamelve szűrve).
+# Kézi feltöltés: python results_store.py --pull 2025-08-01 2025-08-31
+
+import os
+import sys
+import time
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+STORE_PATH = os.environ.get("RESULTS_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "results.sqlite3"))
+# Foci: FT / AET / PEN, hoki: AOT, kosár: AP
+FINISHED_STATUSES = {"FT", "AET", "PEN", "AOT", "AP"}
+
+_local = threading.local()
+
+def _connect():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(STORE_PATH), exist_ok=True)
+        conn = sqlite3.connect(STORE_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS results (
+            sport TEXT NOT NULL,
+            fixture_id INTEGER NOT NULL,
+            kickoff TEXT,
+            league_id INTEGER,
+            home INTEGER NOT NULL,
+            away INTEGER NOT NULL,
+            status TEXT,
+            source TEXT,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (sport, fixture_id))""")
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+def from_api(sport, item):
+    """ api-sports fixture / game -> tárolható sor, vagy None, ha a meccs még nem zárult le vagy hiányzik az eredmény. """
+    fixture = item.get('fixture', item)
+    status = (fixture.get('status') or {}).get('short')
+    if status not in FINISHED_STATUSES: return None
+    try:
+        if sport == 'football': h, a = item['goals']['home'], item['goals']['away']
+        elif sport == 'basketball': h, a = item['scores']['home']['total'], item['scores']['away']['total']
+        else: h, a = item['scores']['home'], item['scores']['away']
+    except (KeyError, TypeError):
+        return None
+    if h is None or a is None: return None
+    return {"sport": sport, "fixture_id": int(fixture['id']), "kickoff": fixture.get('date'), "league_id": (item.get('league') or {}).get('id'),
+            "home": int(h), "away": int(a), "status": status}
+
+def put_many(rows, source):
+    """ Sorok beszúrása / frissítése (a from_api alakjában); a beírt sorok számát adja vissza. """
+    rows = [r for r in rows if r]
+    if not rows: return 0
+    now = time.time()
+    conn = _connect()
+    conn.executemany("INSERT OR REPLACE INTO results (sport, fixture_id, kickoff, league_id, home, away, status, source, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                     [(r["sport"], r["fixture_id"], r.get("kickoff"), r.get("league_id"), r["home"], r["away"], r.get("status"), source, now) for r in rows])
+    conn.commit()
+    return len(rows)
+
+def put(sport, fixture_id, home, away, status=None, kickoff=None, league_id=None, source="check"):
+    return put_many([{"sport": sport, "fixture_id": int(fixture_id), "kickoff": kickoff, "league_id": league_id, "home": home, "away": away, "status": status}], source)
+
+def get_many(sport, fixture_ids):
+    """ {meccs_id: {"h": hazai, "a": vendég}} a tárolt meccsekre (a hiányzók kimaradnak). """
+    ids = sorted({int(i) for i in fixture_ids})
+    found, conn = {}, _connect()
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        query = f"SELECT fixture_id, home, away FROM results WHERE sport = ? AND fixture_id IN ({','.join('?' * len(chunk))})"
+        for fixture_id, home, away in conn.execute(query, [sport, *chunk]):
+            found[fixture_id] = {"h": home, "a": away}
+    return found
+
+def get(sport, fixture_id):
+    return get_many(sport, [fixture_id]).get(int(fixture_id))
+
+def count(sport=None):
+    conn = _connect()
+    if sport: return conn.execute("SELECT COUNT(*) FROM results WHERE sport = ?", (sport,)).fetchone()[0]
+    return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+def pull_date(date_str, request_fn, sport="football", league_ids=None):
+    """
+    A nap összes lezárt meccsének eredménye egyetlen hívásból. request_fn(params, item_filter=, filter_key=) -> teljes
+    JSON válasz; a nem lezárt (és league_ids megadásakor a nem releváns ligájú) meccsek letöltés közben kiesnek.
+    """
+    leagues = set(league_ids) if league_ids else None
+    def keep(item):
+        fixture = item.get('fixture', item)
+        if (fixture.get('status') or {}).get('short') not in FINISHED_STATUSES: return False
+        return leagues is None or (item.get('league') or {}).get('id') in leagues
+    filter_key = "results:" + (",".join(map(str, sorted(leagues))) if leagues else "all")
+    data = request_fn({"date": date_str}, item_filter=keep, filter_key=filter_key)
+    if not data: return 0
+    return put_many([from_api(sport, item) for item in data.get('response', [])], "bulk")
+
+def pull_range(start_date, end_date, request_fn, sport="football", league_ids=None):
+    """ Történeti feltöltés: napi pull_date a két dátum között (mindkettő beleértve). """
+    day, end, stored = datetime.strptime(start_date, "%Y-%m-%d"), datetime.strptime(end_date, "%Y-%m-%d"), 0
+    while day <= end:
+        stored += pull_date(day.strftime("%Y-%m-%d"), request_fn, sport, league_ids)
+        day += timedelta(days=1)
+    return stored
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--pull":
+        from eredmeny_ellenorzo import fixtures_request
+        stored = pull_range(sys.argv[2], sys.argv[3], fixtures_request)
+        print(f"{stored} eredmény tárolva, összesen {count()} meccs a raktárban.")
+    else:
+        print("Használat: python results_store.py --pull ÉÉÉÉ-HH-NN ÉÉÉÉ-HH-NN")
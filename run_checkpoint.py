@@ -0,0 +1,61 @@
+# run_checkpoint.py (V1.0 - Inkrementális generálás ellenőrzőpontja)
+# Napi fájl a már elemzett meccsekről: odds ujjlenyomat + az elemzés eredménye (tippek).
+# Újrafuttatáskor csak az új, vagy a tűréshatáron túl mozdult oddsú meccseket kell újra elemezni.
+
+import os
+import json
+import math
+
+CHECKPOINT_DIR = os.environ.get("GENERATOR_CHECKPOINT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "checkpoints"))
+# Ennyi odds elmozdulás alatt a korábbi elemzés érvényes marad
+ODDS_TOLERANCE = float(os.environ.get("GENERATOR_ODDS_TOLERANCE", "0.05"))
+
+def _path(date_str):
+    return os.path.join(CHECKPOINT_DIR, f"generator_{date_str}.json")
+
+def load(date_str):
+    """ { sport: { meccs_id(str): {"fingerprint": [...], "tips": [...]} } } vagy üres szótár. """
+    try:
+        with open(_path(date_str), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Ellenőrzőpont olvasási hiba ({date_str}): {e}")
+        return {}
+
+def save(date_str, checkpoint):
+    try:
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+        tmp_path = _path(date_str) + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, ensure_ascii=False)
+        os.replace(tmp_path, _path(date_str))
+    except OSError as e:
+        print(f"Ellenőrzőpont mentési hiba ({date_str}): {e}")
+
+def fingerprint(odds_values):
+    """ Az elemzéshez használt oddsok listája (hiányzó odds -> None), JSON-barát formában. """
+    return [None if v is None or (isinstance(v, float) and math.isnan(v)) else round(float(v), 3) for v in odds_values]
+
+def odds_moved(old, new, tolerance=ODDS_TOLERANCE):
+    if old is None or len(old) != len(new): return True
+    for a, b in zip(old, new):
+        if (a is None) != (b is None): return True
+        if a is not None and abs(a - b) > tolerance: return True
+    return False
+
+def split_fresh(sport_checkpoint, games, id_fn, fingerprint_fn):
+    """
+    A meccseket két részre bontja: (újraelemzendő, [korábbi tippek a változatlanokból]).
+    fingerprint_fn(game) -> ujjlenyomat lista; a változatlan meccsek korábbi eredménye megy tovább.
+    """
+    to_analyze, reused_tips = [], []
+    for game in games:
+        entry = sport_checkpoint.get(str(id_fn(game)))
+        if entry and not odds_moved(entry.get("fingerprint"), fingerprint_fn(game)):
+            reused_tips.extend(entry.get("tips", []))
+        else:
+            to_analyze.append(game)
+    return to_analyze, reused_tips
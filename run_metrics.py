@@ -0,0 +1,127 @@
+# run_metrics.py (V1.1 - Futásonkénti szakasz időmérés és számlálók, kötegenként összesítve)
+# A tipp_generator szakaszait (meccslista, tervezés, odds, előtöltés, elemzés, mentés) méri: falióra idő,
+# API hívások, letöltött bájtok, összevont kérések és cache találatok. Az összesítő a generator_runs táblába
+# kerül (sql/generator_runs.sql), és a jóváhagyási üzenet végére is.
+
+import time
+import threading
+from contextlib import contextmanager
+import api_client
+import api_cache
+
+STAGE_LABELS = {
+    "fixtures": "meccslista", "plan": "tervezés", "odds": "odds", "prefetch": "előtöltés",
+    "analysis": "elemzés", "select": "kiválasztás", "save": "mentés", "pipeline": "teljes lánc",
+}
+SPORT_LABELS = {"football": "foci", "hockey": "hoki", "basketball": "kosár"}
+
+_lock = threading.Lock()
+_stages = []
+_counters = {}
+_started = None
+
+def begin_run():
+    """ Új futás: szakaszok és számlálók ürítése, a cache számlálók nullázása. """
+    global _started
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+        _started = time.monotonic()
+    api_cache.reset_stats()
+
+def _snapshot(host, sport):
+    api = api_client.get_stats()
+    hosts = [host] if host else list(api)
+    cache = api_cache.get_stats()
+    sports = [sport] if sport else list(cache)
+    return {
+        "requests": sum(api.get(h, {}).get("requests", 0) for h in hosts),
+        "bytes": sum(api.get(h, {}).get("bytes", 0) for h in hosts),
+        "coalesced": sum(api.get(h, {}).get("coalesced", 0) for h in hosts),
+        "cache_hits": sum(cache.get(s, {}).get("hits", 0) for s in sports),
+        "cache_misses": sum(cache.get(s, {}).get("misses", 0) for s in sports),
+    }
+
+@contextmanager
+def stage(name, sport=None, host=None):
+    """
+    Egy szakasz mérése. A sportok párhuzamosan futnak, ezért a hívás- és cache számlálók a sport saját
+    hostjára / cache névterére szűkítve számítanak, és csak ha a host meg van adva. A lánc egymást átfedő
+    szakaszainál (stream_pipeline) csak az idő mérhető szakaszonként, a hívások a teljes láncra (host-tal).
+    """
+    before, started = _snapshot(host, sport) if host else None, time.monotonic()
+    try:
+        yield
+    finally:
+        entry = {"stage": name, "sport": sport, "seconds": round(time.monotonic() - started, 3)}
+        if host:
+            after = _snapshot(host, sport)
+            entry.update({key: after[key] - before[key] for key in after})
+        with _lock:
+            _stages.append(entry)
+
+def count(name, value=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def _merge_stages(entries):
+    """ Az azonos (szakasz, sport) kötegenkénti mérései összeadva; batches = a kötegek száma. """
+    merged = {}
+    for entry in entries:
+        key = (entry["stage"], entry["sport"])
+        if key not in merged:
+            merged[key] = dict(entry, batches=0)
+        else:
+            for field, value in entry.items():
+                if field not in ("stage", "sport"): merged[key][field] = merged[key].get(field, 0) + value
+        merged[key]["batches"] += 1
+        merged[key]["seconds"] = round(merged[key]["seconds"], 3)
+    return list(merged.values())
+
+def summary():
+    """ A futás összesítője (JSON-barát szótár). """
+    with _lock:
+        stages, counters, started = _merge_stages(_stages), dict(_counters), _started
+    totals = _snapshot(None, None)
+    lookups = totals["cache_hits"] + totals["cache_misses"]
+    return {
+        "total_seconds": round(time.monotonic() - started, 2) if started else 0.0,
+        "api_requests": totals["requests"],
+        "api_bytes": totals["bytes"],
+        "coalesced": totals["coalesced"],
+        "cache_hit_rate": round(totals["cache_hits"] / lookups * 100, 2) if lookups else None,
+        "stages": stages,
+        "counters": counters,
+    }
+
+def _stage_label(entry):
+    label = STAGE_LABELS.get(entry["stage"], entry["stage"])
+    return f"{SPORT_LABELS.get(entry['sport'], entry['sport'])}/{label}" if entry.get("sport") else label
+
+def format_summary(data=None, max_stages=12):
+    """ Rövid, Telegram üzenetbe írható összesítő (a leglassabb szakaszok elöl). """
+    data = data or summary()
+    hit_rate = f"{data['cache_hit_rate']:.0f}%" if data.get("cache_hit_rate") is not None else "n/a"
+    lines = [f"Futás: {data['total_seconds']:.1f} mp | {data['api_requests']} API hívás ({data['api_bytes'] / 1048576:.1f} MB) | cache: {hit_rate}"]
+    for entry in sorted(data.get("stages", []), key=lambda s: s["seconds"], reverse=True)[:max_stages]:
+        line = f"- {_stage_label(entry)}: {entry['seconds']:.1f} mp"
+        if entry.get("batches", 1) > 1: line += f" ({entry['batches']} köteg)"
+        if "requests" in entry:
+            lookups = entry.get("cache_hits", 0) + entry.get("cache_misses", 0)
+            line += f", {entry.get('requests', 0)} hívás, {entry.get('bytes', 0) / 1024:.0f} KB"
+            if lookups: line += f", cache {entry['cache_hits'] / lookups * 100:.0f}%"
+        lines.append(line)
+    if data.get("counters"):
+        lines.append("Számlálók: " + ", ".join(f"{k}: {v}" for k, v in sorted(data["counters"].items())))
+    return "\n".join(lines)
+
+def save(supabase, run_date, status, tips_count, data=None):
+    """ Egy sor a generator_runs táblába; a tábla hiánya nem állítja meg a generátort. """
+    data = data or summary()
+    try:
+        supabase.table("generator_runs").insert({
+            "run_date": run_date, "status": status, "duration_seconds": data["total_seconds"], "tips_count": tips_count,
+            "api_requests": data["api_requests"], "api_bytes": data["api_bytes"], "cache_hit_rate": data["cache_hit_rate"], "summary": data,
+        }).execute()
+    except Exception as e:
+        print(f"Futási statisztika mentési hiba (sql/generator_runs.sql telepítve?): {e}")
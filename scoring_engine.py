@@ -0,0 +1,123 @@
+# scoring_engine.py (V1.5 - Vektorizált foci pontozó motor, hangolható küszöbökkel)
+# A BTTS / Over 2.5 / Hazai szabályok egyetlen NumPy/pandas táblán, maszkokkal kiértékelve.
+# Ugyanezt a motort használja a tipp_generator (éles) és a backtester (pillanatképek).
+
+import os
+import numpy as np
+import pandas as pd
+import models
+import goal_model
+
+MIN_CONFIDENCE = 65
+# A legjobb elérhető ár várható értéke a marzsmentes konszenzushoz képest legalább ennyi legyen
+# (ha csak egy iroda árazza a piacot, nincs konszenzus - odds_engine.MIN_BOOKMAKERS -, és a szűrő nem szól bele)
+MIN_EDGE = float(os.environ.get("SCORING_MIN_EDGE", "-0.05"))
+# A gólmodell szerinti valószínűség alsó határa a tipp piacára (0 = nincs szűrés, csak tájékoztató)
+MIN_MODEL_PROB = float(os.environ.get("SCORING_MIN_MODEL_PROB", "0"))
+
+# Az odds és edge oszlopok a models.Odds tömbök sorrendjében (btts, over 2.5, hazai)
+FEATURE_COLUMNS = [
+    "h_scored", "h_conceded", "v_scored", "v_conceded", "h_home_win_rate",
+    "form_diff", "key_injuries", *models.MARKET_NAMES, *models.EDGE_NAMES,
+]
+ID_COLUMNS = ["fixture_id", "csapat_H", "csapat_V", "kezdes", "liga_nev"]
+
+# A szabályok küszöbei (a backtester --sweep módja ezeket hangolja a threshold_sweep-pel)
+THRESHOLDS = {
+    "btts_odd_min": 1.55, "btts_odd_max": 2.15, "btts_h_scored": 1.3, "btts_v_scored": 1.2, "btts_conceded": 1.0,
+    "over_odd_min": 1.50, "over_odd_max": 2.10, "over_avg_goals": 2.85, "over_conceded": 1.45,
+    "home_odd_min": 1.45, "home_odd_max": 2.20, "home_form_diff": 5, "home_win_rate": 0.45,
+}
+
+def calc_form_points(form_str):
+    if not form_str: return 0
+    pts = 0
+    for char in form_str[-5:]:
+        if char == 'W': pts += 3
+        elif char == 'D': pts += 1
+    return pts
+
+def count_key_injuries(injuries):
+    return sum(1 for p in (injuries or []) if p.get('player', {}).get('type') in ['Attacker', 'Midfielder'] and 'Missing' in (p.get('player', {}).get('reason') or ''))
+
+def extract_features(fixture, stats_h, stats_v, key_injuries, odds):
+    """
+    Egy meccs jellemzősora (ID_COLUMNS + FEATURE_COLUMNS sorrendű tuple) a pontozáshoz.
+    fixture: models.Fixture, stats_h / stats_v: models.TeamStats, odds: models.Odds; None, ha valamelyik hiányzik.
+    """
+    if stats_h is None or stats_v is None or odds is None: return None
+    h_played = stats_h.played_home or 1
+    v_played = stats_v.played_away or 1
+    return (
+        fixture.id, fixture.home_name, fixture.away_name, fixture.date, fixture.league_name,
+        stats_h.scored_home / h_played,
+        stats_h.conceded_home / h_played,
+        stats_v.scored_away / v_played,
+        stats_v.conceded_away / v_played,
+        stats_h.wins_home / h_played,
+        calc_form_points(stats_h.form) - calc_form_points(stats_v.form),
+        key_injuries,
+        *odds.values,
+        *(odds.edge(market) for market in range(models.MARKET_COUNT)),
+    )
+
+def build_frame(rows):
+    return pd.DataFrame.from_records([r for r in rows if r], columns=ID_COLUMNS + FEATURE_COLUMNS)
+
+def rule_masks(f, t=THRESHOLDS):
+    """
+    A három szabály maszkja (edge és modell szűrő nélkül). f: {oszlop: tömb}, t: küszöbök; ha a jellemzők (1 × meccs),
+    a küszöbök (kombináció × 1) alakúak, az eredmény a teljes (kombináció × meccs) rács egy broadcast lépésben.
+    """
+    btts = (f["btts_odd"] >= t["btts_odd_min"]) & (f["btts_odd"] <= t["btts_odd_max"]) \
+        & (f["h_scored"] >= t["btts_h_scored"]) & (f["v_scored"] >= t["btts_v_scored"]) \
+        & (f["h_conceded"] >= t["btts_conceded"]) & (f["v_conceded"] >= t["btts_conceded"])
+    match_avg_goals = (f["h_scored"] + f["h_conceded"] + f["v_scored"] + f["v_conceded"]) / 2
+    over = (f["over25_odd"] >= t["over_odd_min"]) & (f["over25_odd"] <= t["over_odd_max"]) \
+        & (match_avg_goals > t["over_avg_goals"]) & ((f["h_conceded"] > t["over_conceded"]) | (f["v_conceded"] > t["over_conceded"]))
+    home = (f["home_odd"] >= t["home_odd_min"]) & (f["home_odd"] <= t["home_odd_max"]) \
+        & (f["form_diff"] >= t["home_form_diff"]) & (f["h_home_win_rate"] >= t["home_win_rate"])
+    return {"btts": btts, "over": over, "home": home}
+
+def score_frame(frame):
+    """ Az összes szabály vektorizált kiértékelése; meccsenként a legerősebb tipp, konfidencia szerint rendezve. """
+    if frame.empty:
+        return frame.assign(tipp=pd.Series(dtype=object), odds=pd.Series(dtype=float), confidence=pd.Series(dtype=int), edge=pd.Series(dtype=float),
+                            model_prob=pd.Series(dtype=float), **{c: pd.Series(dtype=float) for c in goal_model.PROBABILITY_COLUMNS})
+    f = {c: frame[c].to_numpy(dtype=float) for c in FEATURE_COLUMNS}
+    base = np.where(f["key_injuries"] >= 2, 55, 70)
+    edge_ok = {name: np.isnan(f[name]) | (f[name] >= MIN_EDGE) for name in models.EDGE_NAMES}
+    probs = goal_model.from_features(f["h_scored"], f["h_conceded"], f["v_scored"], f["v_conceded"])
+
+    rules = rule_masks(f)
+    btts = rules["btts"] & edge_ok["btts_edge"] & (probs["p_btts"] >= MIN_MODEL_PROB)
+    over = rules["over"] & edge_ok["over25_edge"] & (probs["p_over25"] >= MIN_MODEL_PROB)
+    home = rules["home"] & edge_ok["home_edge"] & (probs["p_home"] >= MIN_MODEL_PROB)
+
+    # Prioritás = konfidencia sorrend: Hazai (85) > BTTS (alap+5) > Over 2.5 (alap+4)
+    conditions = [home, btts, over]
+    tipp = np.select(conditions, ["Home", "BTTS", "Over 2.5"], default="")
+    odds = np.select(conditions, [f["home_odd"], f["btts_odd"], f["over25_odd"]], default=np.nan)
+    confidence = np.select(conditions, [np.full_like(base, 85), base + 5, base + 4], default=0)
+    edge = np.select(conditions, [f["home_edge"], f["btts_edge"], f["over25_edge"]], default=np.nan)
+    model_prob = np.select(conditions, [probs["p_home"], probs["p_btts"], probs["p_over25"]], default=np.nan)
+
+    keep = confidence >= MIN_CONFIDENCE
+    scored = frame.loc[keep, ID_COLUMNS].copy()
+    scored["tipp"], scored["odds"], scored["confidence"], scored["edge"] = tipp[keep], odds[keep], confidence[keep], edge[keep]
+    scored["model_prob"] = model_prob[keep]
+    for column in goal_model.PROBABILITY_COLUMNS: scored[column] = probs[column][keep]
+    # Azonos konfidenciánál a nagyobb edge-ű tipp kerül előre
+    return scored.sort_values(["confidence", "edge"], ascending=False, na_position="last", kind="stable")
+
+def score_rows(rows):
+    """ Jellemzősorokból a generátor tipp formátuma (ugyanaz, mint az analyze_fixture_smart_stats kimenete). """
+    return frame_to_tips(score_frame(build_frame(rows)))
+
+def frame_to_tips(scored):
+    """ A score_frame kimenete tipp szótárakként (az oszlopos pillanatképek közvetlenül a score_frame-et hívják). """
+    return [{
+        "fixture_id": int(r.fixture_id), "csapat_H": r.csapat_H, "csapat_V": r.csapat_V, "kezdes": r.kezdes,
+        "liga_nev": r.liga_nev, "tipp": r.tipp, "odds": float(r.odds), "confidence": int(r.confidence),
+        "edge": None if np.isnan(r.edge) else round(float(r.edge), 4), "model_prob": round(float(r.model_prob), 4)
+    } for r in scored.itertuples(index=False)]
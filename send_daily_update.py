@@ -1,4 +1,4 @@
-# send_daily_update.py (V2.0 - Fix: Szöveges ID-k és Mezőnevek kezelése)
+# send_daily_update.py (V2.2 - Kategóriánkénti bankroll szimuláció)
 
 import os
 import asyncio
@@ -7,6 +7,7 @@ from datetime import datetime
 import pytz
 from supabase import create_client, Client
 import telegram
+import bankroll_sim
 
 # --- Konfiguráció ---
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
@@ -67,6 +68,7 @@ async def send_stats():
         "vip": {"count": 0, "wins": 0, "profit": 0.0},
         "free": {"count": 0, "wins": 0, "profit": 0.0}
     }
+    played = {"bot": [], "vip": [], "free": []}  # kategóriánként (odds, nyert-e) a bankroll szimulációhoz
     
     for m in matches:
         res_str = m.get('eredmeny')
@@ -94,6 +96,7 @@ async def send_stats():
             stats[cat]["wins"] += 1
         stats["total"]["profit"] += p
         stats[cat]["profit"] += p
+        played[cat].append((odds, is_win))
 
     # Üzenet összeállítása
     msg = f"Statisztika - {now.strftime('%Y. %B')}\n\n"
@@ -106,6 +109,11 @@ async def send_stats():
     msg += f"📝 VIP: {stats['vip']['count']} db, {stats['vip']['wins']} nyert, Profit: {stats['vip']['profit']:+.2f}\n"
     msg += f"🆓 Free: {stats['free']['count']} db, {stats['free']['wins']} nyert, Profit: {stats['free']['profit']:+.2f}"
 
+    # Kategóriánként külön (egyedi tipp vs. kötéses szelvény); modell valószínűség nincs tárolva, így Kelly sor sincs
+    for cat, label in (("bot", "Bot"), ("vip", "VIP"), ("free", "Free")):
+        sim = bankroll_sim.simulate([o for o, _ in played[cat]], [w for _, w in played[cat]])
+        if sim: msg += "\n\n🎲 " + bankroll_sim.format_report(sim, label)
+
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
     await bot.send_message(chat_id=LIVE_CHANNEL_ID, text=msg)
 
@@ -0,0 +1,214 @@
+# snapshot_store.py (V1.4 - A napok dátum sorrendben jönnek)
+# A gemini_data_exporter napi pillanatképe két fájlba kerül:
+#   - snapshot_<nap>.npy:     meccsenként egy fix szélességű rekord (azonosítók + a scoring_engine jellemzői és oddsai),
+#                             np.load(mmap_mode='r')-rel másolás nélkül olvasható, oszloponként (rekord['h_scored']) elérhető;
+#   - snapshot_<nap>.json.gz: a nyers api-sports csomagok tömörítve, csak utólagos ellenőrzéshez / újraszámoláshoz.
+# A régi snapshot_data_<nap>.json fájlok a `python snapshot_store.py --convert` paranccsal alakíthatók át.
+# Ha a scoring_engine jellemző oszlopai változnak, a régi .npy fájlok a `--rebuild` paranccsal a nyers JSON-ból újraépülnek.
+
+import os
+import sys
+import glob
+import gzip
+import json
+import numpy as np
+import models
+import odds_engine
+import scoring_engine
+
+SNAPSHOT_DIR = "backtest_snapshots"
+LEGACY_PATTERN = "snapshot_data_*.json"
+
+# Azonosítók + a pontozás bemenete; a nevek fix szélességűek (a túl hosszú név levágódik, a pontozást nem érinti)
+RECORD_DTYPE = np.dtype(
+    [("fixture_id", "i8"), ("league_id", "i8"), ("home_id", "i8"), ("away_id", "i8"), ("valid", "?"),
+     ("kezdes", "U32"), ("csapat_H", "U64"), ("csapat_V", "U64"), ("liga_nev", "U64")]
+    + [(column, "f8") for column in scoring_engine.FEATURE_COLUMNS]
+)
+
+class SnapshotFormatError(ValueError):
+    """ A .npy rekord szerkezete nem az aktuális RECORD_DTYPE (pl. azóta változtak a jellemző oszlopok). """
+
+def npy_path(date_str, snapshot_dir=SNAPSHOT_DIR):
+    return os.path.join(snapshot_dir, f"snapshot_{date_str}.npy")
+
+def raw_path(date_str, snapshot_dir=SNAPSHOT_DIR):
+    return os.path.join(snapshot_dir, f"snapshot_{date_str}.json.gz")
+
+def snapshot_bookmakers(match_package):
+    """ A pillanatképben rögzített pre-match oddsok (az összes iroda). """
+    odds_data = match_package.get("odds_data") or []
+    return odds_data[0].get('bookmakers') if odds_data else None
+
+def build_records(match_packages):
+    """
+    Nyers csomagok -> RECORD_DTYPE tömb. Az oddsok konszenzusa a nap összes meccsén egy körben számolódik;
+    a statisztika vagy odds nélküli meccs is bekerül (valid=False, NaN jellemzők), hogy a meccs-duplikáció szűrés
+    ugyanúgy működjön, mint a nyers fájloknál.
+    """
+    packages = [p for p in match_packages if (p.get("fixture_data") or {}).get('fixture', {}).get('id')]
+    odds_list = odds_engine.build_odds([snapshot_bookmakers(p) for p in packages], "football")
+    records = np.zeros(len(packages), dtype=RECORD_DTYPE)
+    for i, (package, odds) in enumerate(zip(packages, odds_list)):
+        raw = package["fixture_data"]
+        fixture = models.Fixture.from_api(raw)
+        stats_h = models.TeamStats.from_api(package.get("home_team_stats"))
+        stats_v = models.TeamStats.from_api(package.get("away_team_stats"))
+        # A pillanatkép nem tárolja a sérülteket
+        row = scoring_engine.extract_features(fixture, stats_h, stats_v, 0, odds)
+        record = records[i]
+        record["fixture_id"], record["league_id"], record["home_id"], record["away_id"] = fixture.id, fixture.league_id, fixture.home_id, fixture.away_id
+        record["kezdes"], record["csapat_H"], record["csapat_V"], record["liga_nev"] = fixture.date or "", fixture.home_name, fixture.away_name, fixture.league_name
+        record["valid"] = row is not None
+        features = row[len(scoring_engine.ID_COLUMNS):] if row else [np.nan] * len(scoring_engine.FEATURE_COLUMNS)
+        for column, value in zip(scoring_engine.FEATURE_COLUMNS, features): record[column] = value
+    return records
+
+def write_day(date_str, match_packages, snapshot_dir=SNAPSHOT_DIR):
+    """ Egy nap pillanatképe: oszlopos .npy + tömörített nyers JSON. A rekordok számát adja vissza. """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    records = build_records(match_packages)
+    tmp_path = npy_path(date_str, snapshot_dir) + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, records)
+    with gzip.open(raw_path(date_str, snapshot_dir), 'wt', encoding='utf-8') as f:
+        json.dump(match_packages, f, ensure_ascii=False)
+    # A .npy az utolsó, így egy megszakadt írás nem hagy "kész" napot nyers adat nélkül
+    os.replace(tmp_path, npy_path(date_str, snapshot_dir))
+    return len(records)
+
+def exists(date_str, snapshot_dir=SNAPSHOT_DIR):
+    return os.path.exists(npy_path(date_str, snapshot_dir))
+
+def day_files(snapshot_dir=SNAPSHOT_DIR):
+    """ A napi .npy fájlok dátum (fájlnév) szerint rendezve. """
+    return sorted(glob.glob(os.path.join(snapshot_dir, "snapshot_*.npy")))
+
+def is_current(path):
+    """ A fájl rekord szerkezete egyezik-e az aktuális RECORD_DTYPE-pal (csak a fejléc olvasódik). """
+    return np.load(path, mmap_mode='r').dtype == RECORD_DTYPE
+
+def load_day(path):
+    """ Egy nap rekordjai memory-mapelve (csak olvasható; a ténylegesen használt oszlopok töltődnek be). """
+    records = np.load(path, mmap_mode='r')
+    if records.dtype != RECORD_DTYPE:
+        raise SnapshotFormatError(f"'{os.path.basename(path)}' rekord szerkezete eltér az aktuálistól (változtak a jellemző oszlopok?). "
+                                  f"Újraépítés a nyers adatokból: python snapshot_store.py --rebuild")
+    return records
+
+def load_all(snapshot_dir=SNAPSHOT_DIR):
+    """ Az összes nap rekordjai egy tömbben, fájl (dátum) sorrendben. (rekordok, fájlok száma) """
+    files = day_files(snapshot_dir)
+    if not files: return np.zeros(0, dtype=RECORD_DTYPE), 0
+    return np.concatenate([load_day(path) for path in files]), len(files)
+
+class SeenIds:
+    """ Már látott meccs id-k bittérképe (id-nként 1 bit, az id-k nagyságrendjéig nő), a fájlok közötti duplikáció szűréshez. """
+    def __init__(self):
+        self.bits = np.zeros(0, dtype=np.uint8)
+        self.count = 0
+
+    def add_new(self, ids):
+        """ Felveszi az id-ket; maszk azokra, amelyek most jelentek meg először (tömbön belül is csak az első). """
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(ids): return np.zeros(0, dtype=bool)
+        needed = (int(ids.max()) >> 3) + 1
+        if needed > len(self.bits):
+            self.bits = np.concatenate([self.bits, np.zeros(max(needed, 2 * len(self.bits)) - len(self.bits), dtype=np.uint8)])
+        byte, bit = ids >> 3, (1 << (ids & 7)).astype(np.uint8)
+        fresh = np.zeros(len(ids), dtype=bool)
+        fresh[np.unique(ids, return_index=True)[1]] = True
+        fresh &= (self.bits[byte] & bit) == 0
+        np.bitwise_or.at(self.bits, byte[fresh], bit[fresh])
+        self.count += int(fresh.sum())
+        return fresh
+
+def iter_days(paths=None, seen=None):
+    """
+    Generátor: (nap, rekordok) kötegek kezdési nap szerint, fájlonként olvasva (paths: dátum szerint rendezett .npy
+    fájlok, alapból day_files()); minden nap pontosan egyszer és dátum sorrendben jön. Több fájlban szereplő meccsből
+    csak az első (fájl sorrendben) marad - a látott id-ket a seen (SeenIds) tartja. Egy első, csak az id / kezdés
+    oszlopokat olvasó kör megállapítja, melyik fájl az utolsó, amelyben egy napnak új meccse van; a nap ennek a fájlnak
+    a beolvasása után zárul, és akkor jön, ha minden korábbi nap is lezárult. A memóriában a még nyitott napok és a
+    korábbi nyitott nap mögött várakozó lezárt napok vannak (egy késői fájlban felbukkanó régi meccs ezeket tartja vissza).
+    """
+    paths = day_files() if paths is None else list(paths)
+    seen = seen if seen is not None else SeenIds()
+    last_file, probe = {}, SeenIds()
+    for i, path in enumerate(paths):
+        records = load_day(path)
+        fresh = probe.add_new(records["fixture_id"])
+        for date_str in np.unique(records["kezdes"][fresh].astype("U10")): last_file[str(date_str)] = i
+
+    order, next_index = sorted(last_file), 0
+    pending, closed = {}, {}
+    for i, path in enumerate(paths):
+        records = load_day(path)
+        records = records[seen.add_new(records["fixture_id"])]
+        dates = records["kezdes"].astype("U10")
+        for date_str in np.unique(dates):
+            pending.setdefault(str(date_str), []).append(records[dates == date_str])
+        for date_str in [d for d in pending if last_file[d] == i]:
+            closed[date_str] = np.concatenate(pending.pop(date_str))
+        # Egy nap akkor mehet, ha minden korábbi nap lezárult (a seen miatt üres nap nincs a pending-ben: átugorjuk)
+        while next_index < len(order) and (order[next_index] in closed or last_file[order[next_index]] <= i):
+            date_str = order[next_index]
+            next_index += 1
+            if date_str in closed: yield date_str, closed.pop(date_str)
+
+def read_raw(date_str, snapshot_dir=SNAPSHOT_DIR):
+    """ Ellenőrzéshez: a nap nyers api-sports csomagjai. """
+    with gzip.open(raw_path(date_str, snapshot_dir), 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_legacy_file(path):
+    """ Régi snapshot_data_*.json (UTF-8, latin-1 tartalékkal); None, ha olvashatatlan vagy nem lista. """
+    for encoding in ('utf-8', 'latin-1'):
+        try:
+            with open(path, 'r', encoding=encoding) as f:
+                data = json.load(f)
+            return data if isinstance(data, list) else None
+        except UnicodeDecodeError:
+            continue
+        except (OSError, ValueError) as e:
+            print(f"  - HIBA: '{os.path.basename(path)}' nem olvasható, kihagyva. {e}")
+            return None
+    return None
+
+def convert_legacy(snapshot_dir=SNAPSHOT_DIR, remove=False):
+    """ A régi JSON pillanatképek átalakítása (a már átalakított napok kimaradnak). remove: a JSON törlése utána. """
+    converted = 0
+    for path in sorted(glob.glob(os.path.join(snapshot_dir, LEGACY_PATTERN))):
+        date_str = os.path.basename(path)[len("snapshot_data_"):-len(".json")]
+        if not exists(date_str, snapshot_dir):
+            data = load_legacy_file(path)
+            if data is None: continue
+            count = write_day(date_str, data, snapshot_dir)
+            converted += 1
+            print(f"  - Átalakítva: {os.path.basename(path)} -> {os.path.basename(npy_path(date_str, snapshot_dir))} ({count} meccs)")
+        if remove: os.remove(path)
+    print(f"Kész: {converted} pillanatkép átalakítva.")
+    return converted
+
+def rebuild_outdated(snapshot_dir=SNAPSHOT_DIR):
+    """ Az eltérő rekord szerkezetű .npy fájlok újraépítése a mellettük lévő nyers .json.gz-ből. """
+    rebuilt = 0
+    for path in day_files(snapshot_dir):
+        if is_current(path): continue
+        date_str = os.path.basename(path)[len("snapshot_"):-len(".npy")]
+        if not os.path.exists(raw_path(date_str, snapshot_dir)):
+            print(f"  - HIBA: '{os.path.basename(path)}' nyers adat nélkül nem építhető újra, kihagyva.")
+            continue
+        count = write_day(date_str, read_raw(date_str, snapshot_dir), snapshot_dir)
+        rebuilt += 1
+        print(f"  - Újraépítve: {os.path.basename(path)} ({count} meccs)")
+    print(f"Kész: {rebuilt} pillanatkép újraépítve.")
+    return rebuilt
+
+if __name__ == "__main__":
+    if "--convert" in sys.argv:
+        convert_legacy(remove="--remove-json" in sys.argv)
+    elif "--rebuild" in sys.argv:
+        rebuild_outdated()
+    else:
+        print("Használat: python snapshot_store.py --convert [--remove-json] | --rebuild")
@@ -0,0 +1,19 @@
+-- generator_runs (V1.0) – a tipp_generator futásainak időmérése és számlálói (run_metrics.py írja).
+-- Szakaszonként (meccslista, tervezés, odds, előtöltés, elemzés, mentés): falióra idő, API hívások,
+-- letöltött bájtok, cache találati arány. A bot admin panelje ("⏱ Generátor Futások") innen olvas.
+-- Telepítés: Supabase SQL Editor → futtatás.
+
+create table if not exists public.generator_runs (
+    id bigserial primary key,
+    created_at timestamptz not null default now(),
+    run_date date not null,
+    status text not null,
+    duration_seconds numeric(10, 2) not null,
+    tips_count integer not null default 0,
+    api_requests integer not null default 0,
+    api_bytes bigint not null default 0,
+    cache_hit_rate numeric(5, 2),
+    summary jsonb not null default '{}'::jsonb
+);
+
+create index if not exists idx_generator_runs_created_at on public.generator_runs (created_at desc);
@@ -0,0 +1,17 @@
+-- match_xg (V1.0) – a tipp_generator gólmodelljének várható gólszámai (xG) meccsenként.
+-- A foci elemzés minden pontozott meccsre ír (hazai / vendég rúgott-kapott átlagokból, goal_model.expected_goals),
+-- a claude_ai_generator a 90perc.hu meccslistájához csapatnevek alapján innen tölti a prompt gólmodell sorát.
+-- Telepítés: Supabase SQL Editor → futtatás.
+
+create table if not exists public.match_xg (
+    fixture_id bigint primary key,
+    kezdes timestamptz not null,
+    csapat_h text not null,
+    csapat_v text not null,
+    liga_nev text,
+    xg_home numeric(5, 2) not null,
+    xg_away numeric(5, 2) not null,
+    updated_at timestamptz not null default now()
+);
+
+create index if not exists idx_match_xg_kezdes on public.match_xg (kezdes);
@@ -0,0 +1,56 @@
+-- save_generated_tips (V1.0) – a tipp_generator egy futásának tippjei, szelvényei és napi státuszai
+-- EGY tranzakcióban. Ha bármelyik insert elhasal, semmi sem marad az adatbázisban (nincs árva meccsek sor).
+--
+-- Bemenet (p_groups): [{"date": "2026-10-18", "tips": [{"fixture_id": ..., "csapat_H": ..., ...}, ...]}, ...]
+-- Kimenet: [{"date": "2026-10-18", "ids": [meccsek.id, ...]}, ...]
+--
+-- A típusokat a jsonb_populate_record a táblák sémájából veszi, így a tipp_id_k tömb / jsonb oszlopként is működik.
+-- Telepítés: Supabase SQL Editor → futtatás.
+
+create or replace function public.save_generated_tips(p_groups jsonb)
+returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    grp jsonb;
+    tip jsonb;
+    new_id bigint;
+    group_ids jsonb;
+    saved jsonb := '[]'::jsonb;
+begin
+    for grp in select value from jsonb_array_elements(p_groups) loop
+        group_ids := '[]'::jsonb;
+
+        for tip in select value from jsonb_array_elements(grp -> 'tips') loop
+            insert into public.meccsek (fixture_id, "csapat_H", "csapat_V", kezdes, liga_nev, tipp, odds, eredmeny, confidence_score)
+            select r.fixture_id, r."csapat_H", r."csapat_V", r.kezdes, r.liga_nev, r.tipp, r.odds, r.eredmeny, r.confidence_score
+            from jsonb_populate_record(null::public.meccsek, tip) r
+            returning id into new_id;
+
+            insert into public.napi_tuti (tipp_neve, eredo_odds, tipp_id_k, confidence_percent)
+            select r.tipp_neve, r.eredo_odds, r.tipp_id_k, r.confidence_percent
+            from jsonb_populate_record(null::public.napi_tuti, jsonb_build_object(
+                'tipp_neve', 'Napi Tuti - ' || (grp ->> 'date'),
+                'eredo_odds', tip -> 'odds',
+                'tipp_id_k', jsonb_build_array(new_id),
+                'confidence_percent', tip -> 'confidence_score')) r;
+
+            group_ids := group_ids || to_jsonb(new_id);
+        end loop;
+
+        insert into public.daily_status (date, status, reason)
+        select r.date, r.status, r.reason
+        from jsonb_populate_record(null::public.daily_status, jsonb_build_object(
+            'date', grp ->> 'date',
+            'status', 'Jóváhagyásra vár',
+            'reason', jsonb_array_length(grp -> 'tips') || ' tipp.')) r
+        on conflict (date) do update set status = excluded.status, reason = excluded.reason;
+
+        saved := saved || jsonb_build_object('date', grp ->> 'date', 'ids', group_ids);
+    end loop;
+
+    return saved;
+end;
+$$;
@@ -0,0 +1,80 @@
+# stream_pipeline.py (V1.0 - Szakaszos feldolgozó lánc korlátos sorokkal)
+# A tipp_generator sportonkénti lánca (meccslista -> szűrés -> dúsítás -> pontozás -> kiválasztás) kötegenként
+# (naponként) halad: minden szakasz külön szálon fut, köztük korlátos sor van. Így a korai napok elemzése átfedi a
+# későbbiek letöltését, a gyorsabb szakasz pedig megvárja a lassabbat (backpressure) - a memóriában egyszerre csak
+# néhány köteg van, akárhány meccs vagy sport kerül a láncba.
+
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUE_SIZE = int(os.environ.get("PIPELINE_QUEUE_SIZE", "2"))
+FETCH_AHEAD = int(os.environ.get("PIPELINE_FETCH_AHEAD", "2"))
+_DONE = object()
+_POLL = 0.1
+
+def ordered_map(fn, items, ahead=FETCH_AHEAD):
+    """ fn(item) párhuzamosan, legfeljebb `ahead` futó hívással; az eredmények a bemenet sorrendjében jönnek. """
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max(1, ahead)) as pool:
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= max(1, ahead): yield pending.popleft().result()
+        while pending: yield pending.popleft().result()
+
+def run(source, stages, maxsize=QUEUE_SIZE):
+    """
+    source: kötegek iterálhatója; stages: [(név, fn)], ahol fn(köteg) -> új köteg, vagy None (a köteg kiesik).
+    Generátor az utolsó szakasz kimeneteivel, sorrendben. Bármely szakasz hibája leállítja az egész láncot,
+    és a hívónál dobódik újra; ha a hívó idő előtt abbahagyja az iterálást, a szálak is leállnak.
+    """
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=max(1, maxsize)) for _ in range(len(stages) + 1)]
+    errors = []
+
+    def put(q, item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=_POLL)
+                return True
+            except queue.Full: continue
+        return False
+
+    def get(q):
+        while not stop.is_set():
+            try: return q.get(timeout=_POLL)
+            except queue.Empty: continue
+        return _DONE
+
+    def fail(e):
+        errors.append(e)
+        stop.set()
+
+    def feed():
+        try:
+            for batch in source:
+                if not put(queues[0], batch): return
+        except Exception as e: fail(e)
+        finally: put(queues[0], _DONE)
+
+    def work(fn, inbox, outbox):
+        try:
+            while (batch := get(inbox)) is not _DONE:
+                result = fn(batch)
+                if result is not None and not put(outbox, result): return
+        except Exception as e: fail(e)
+        finally: put(outbox, _DONE)
+
+    threads = [threading.Thread(target=feed, name="pipeline-source", daemon=True)]
+    threads += [threading.Thread(target=work, args=(fn, queues[i], queues[i + 1]), name=f"pipeline-{name}", daemon=True)
+                for i, (name, fn) in enumerate(stages)]
+    for thread in threads: thread.start()
+    try:
+        while (batch := get(queues[-1])) is not _DONE:
+            yield batch
+    finally:
+        stop.set()
+        for thread in threads: thread.join()
+    if errors: raise errors[0]
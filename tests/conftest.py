@@ -0,0 +1,5 @@
+# A tesztek a gyökérben lévő modulokat importálják (a repó lapos szkript szerkezetű)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,18 @@
+import numpy as np
+import bankroll_sim
+
+ODDS = [1.9, 2.1, 1.8, 2.0, 1.95, 2.2, 1.85, 2.05, 1.9, 2.0, 1.75, 2.3]
+WON = [True, False, True, True, False, True, False, True, True, False, True, False]
+
+def test_no_probabilities_means_no_kelly():
+    sim = bankroll_sim.simulate(ODDS, WON, paths=200)
+    assert set(sim["strategies"]) == {"flat", "percent"}
+    assert "kihagyva" in bankroll_sim.format_report(sim, "Bot")
+
+def test_kelly_uses_given_probabilities():
+    sim = bankroll_sim.simulate(ODDS, WON, probs=[0.6] * len(ODDS), paths=200)
+    assert "kelly" in sim["strategies"]
+
+def test_missing_probability_stakes_nothing():
+    stakes = bankroll_sim.kelly_fractions(np.array([2.0, 2.0]), np.array([0.6, float("nan")]))
+    assert stakes[0] > 0 and stakes[1] == 0
@@ -0,0 +1,20 @@
+import claude_ai_generator as gen
+
+XG_ROWS = [{"csapat_h": "1. FC Köln", "csapat_v": "Bayern München", "xg_home": 1.1, "xg_away": 2.3},
+           {"csapat_h": "Arsenal", "csapat_v": "Chelsea", "xg_home": 1.6, "xg_away": 1.2}]
+
+def test_xg_is_attached_by_team_names():
+    matches = [{"sport": "soccer", "match": "Koln vs Bayern Munchen", "commence": "08.17 15:30", "odds": []},
+               {"sport": "soccer", "match": "Arsenal FC vs Chelsea", "commence": "08.17 18:30", "odds": []},
+               {"sport": "soccer", "match": "Lazio vs Roma", "commence": "08.17 20:45", "odds": []}]
+    assert gen.attach_goal_model_xg(matches, XG_ROWS) == 2
+    assert matches[0]["xg"] == {"home": 1.1, "away": 2.3}
+    assert "xg" not in matches[2]
+
+def test_prompts_contain_goal_model_line(monkeypatch):
+    monkeypatch.setattr(gen, "fetch_match_xg", lambda: XG_ROWS)
+    matches = [{"sport": "soccer", "match": "Arsenal vs Chelsea", "commence": "08.17 18:30",
+                "odds": [{"market": "h2h", "name": "Arsenal", "odds": 1.9, "bookmaker": "x"}]}]
+    gen.attach_goal_model_xg(matches)
+    for prompt in (gen.build_prompt(matches, []), gen.build_raw_prompt(matches, [])):
+        assert "Gólmodell (Poisson): xG 1.60-1.20" in prompt
@@ -0,0 +1,36 @@
+import pytest
+import fixture_fetch
+
+DATE = "2025-08-02"  # szombat
+
+@pytest.fixture
+def metrics(tmp_path, monkeypatch):
+    monkeypatch.setattr(fixture_fetch, "METRICS_PATH", str(tmp_path / "fixture_fetch.json"))
+    monkeypatch.setattr(fixture_fetch, "FORCED_STRATEGY", "league")
+    monkeypatch.setattr(fixture_fetch, "known_season", lambda sport, league_id: "2025")
+    data = {"football": {"totals": {}, "per_league": {"weekend": {"39": 4.0, "40": 0.1}}, "bytes_per_fixture": None, "seasons": {}, "last_date_query": None}}
+    monkeypatch.setattr(fixture_fetch, "_metrics", data)
+    return data
+
+def fixture(league_id):
+    return {"league": {"id": league_id, "season": 2025}}
+
+def make_request_fn(by_league, by_date):
+    calls = []
+    def request_fn(params, item_filter=None, filter_key=None):
+        calls.append(params)
+        if "league" in params: return {"response": by_league.get(int(params["league"]), [])}
+        return {"response": [f for f in by_date if item_filter(f)], "results": len(by_date)}
+    return request_fn, calls
+
+def test_empty_league_with_expected_matches_falls_back_to_date(metrics):
+    request_fn, calls = make_request_fn({}, [fixture(39), fixture(39), fixture(77)])
+    kept = fixture_fetch.fetch_fixtures("football", DATE, [39, 40], request_fn)
+    assert kept == [fixture(39), fixture(39)]
+    assert calls[-1] == {"date": DATE}
+
+def test_empty_league_without_expected_matches_is_trusted(metrics):
+    request_fn, calls = make_request_fn({39: [fixture(39)]}, [])
+    kept = fixture_fetch.fetch_fixtures("football", DATE, [39, 40], request_fn)
+    assert kept == [fixture(39)]
+    assert all("league" in params for params in calls)
@@ -0,0 +1,54 @@
+import gzip
+import json
+import httpx
+import pytest
+import requests
+import http_cassette
+
+TOKEN = "123456:AAH-secret_token"
+ODDS_KEY = "odds-secret-key"
+
+@pytest.fixture
+def cassette(tmp_path, monkeypatch):
+    path = tmp_path / "cassette.jsonl.gz"
+    monkeypatch.setattr(http_cassette, "CASSETTE_PATH", str(path))
+    monkeypatch.setattr(http_cassette, "_writer", None)
+    monkeypatch.setattr(http_cassette, "_by_exact", http_cassette.defaultdict(http_cassette.deque))
+    monkeypatch.setattr(http_cassette, "_by_url", http_cassette.defaultdict(http_cassette.deque))
+    yield path
+    if http_cassette._writer: http_cassette._writer.close()
+
+def test_recorded_keys_contain_no_secrets(cassette):
+    http_cassette._record("POST", f"https://api.telegram.org/bot{TOKEN}/sendMessage", b"{}", 200, {}, b"ok", 0.1)
+    http_cassette._record("GET", f"https://api.the-odds-api.com/v4/sports/x/odds?regions=eu&apiKey={ODDS_KEY}", None, 200, {}, b"[]", 0.1)
+    http_cassette._writer.close()
+    with gzip.open(cassette, "rt", encoding="utf-8") as f:
+        raw = f.read()
+    assert TOKEN not in raw and ODDS_KEY not in raw
+    keys = [json.loads(line)["key"] for line in raw.splitlines()]
+    assert keys[0].startswith("POST https://api.telegram.org/botREDACTED/sendMessage")
+    assert "apiKey=REDACTED" in keys[1]
+
+def test_redacted_recording_still_replays(cassette):
+    url = f"https://api.the-odds-api.com/v4/sports/x/odds?apiKey={ODDS_KEY}&regions=eu"
+    http_cassette._record("GET", url, None, 200, {}, b"[1]", 0.1)
+    http_cassette._writer.close()
+    http_cassette._load()
+    assert http_cassette._replay_payload("GET", url.replace(ODDS_KEY, "other-key"), None)[2] == b"[1]"
+
+def test_miss_is_a_requests_connection_error(cassette):
+    with pytest.raises(requests.exceptions.RequestException):
+        http_cassette._replay_payload("GET", "https://v3.football.api-sports.io/fixtures?date=2025-08-01", None)
+
+def test_miss_is_an_httpx_connect_error(cassette):
+    request = httpx.Request("GET", "https://v3.football.api-sports.io/fixtures?date=2025-08-01")
+    with pytest.raises(httpx.ConnectError):
+        http_cassette._httpx_replay(request)
+
+def test_replayed_requests_response_streams(cassette):
+    url = "https://v3.football.api-sports.io/fixtures?date=2025-08-01"
+    http_cassette._record("GET", url, None, 200, {}, b'{"response": []}', 0.1)
+    http_cassette._writer.close()
+    http_cassette._load()
+    response = http_cassette._requests_replay(requests.Request("GET", url).prepare())
+    assert b"".join(response.iter_content(chunk_size=4)) == b'{"response": []}'
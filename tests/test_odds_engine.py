@@ -0,0 +1,33 @@
+import math
+import models
+import odds_engine
+import scoring_engine
+
+def bookmaker(name, home, draw, away, btts_yes=1.80, btts_no=1.95):
+    return {"name": name, "bets": [
+        {"name": "Match Winner", "values": [{"value": "Home", "odd": str(home)}, {"value": "Draw", "odd": str(draw)}, {"value": "Away", "odd": str(away)}]},
+        {"name": "Both Teams to Score", "values": [{"value": "Yes", "odd": str(btts_yes)}, {"value": "No", "odd": str(btts_no)}]},
+    ]}
+
+def home_tip_row(bookmakers):
+    fixture = models.Fixture(1, "2025-08-01T18:00:00+00:00", "NS", 39, "Premier League", "2025", 10, "Hazai", 20, "Vendég")
+    # Erős hazai forma és győzelmi arány: a Hazai szabály teljesül
+    stats_h = models.TeamStats(10, 10, 15, 10, 8, 12, 7, "WWWWW")
+    stats_v = models.TeamStats(10, 10, 10, 8, 10, 15, 2, "LLLLL")
+    odds = odds_engine.build_odds([bookmakers], "football")[0]
+    return scoring_engine.extract_features(fixture, stats_h, stats_v, 0, odds), odds
+
+def test_single_bookmaker_has_no_consensus():
+    _, odds = home_tip_row([bookmaker("Egyedül", 1.80, 3.60, 4.50)])
+    assert math.isnan(odds.prob[models.HOME_WIN])
+    assert math.isnan(odds.edge(models.HOME_WIN))
+
+def test_single_bookmaker_fixture_keeps_baseline_tip():
+    row, _ = home_tip_row([bookmaker("Egyedül", 1.80, 3.60, 4.50)])
+    tips = scoring_engine.score_rows([row])
+    assert [(t["tipp"], t["odds"], t["edge"]) for t in tips] == [("Home", 1.80, None)]
+
+def test_two_bookmakers_give_consensus_edge():
+    _, odds = home_tip_row([bookmaker("A", 1.80, 3.60, 4.50), bookmaker("B", 1.90, 3.40, 4.20)])
+    assert not math.isnan(odds.prob[models.HOME_WIN])
+    assert odds.best[models.HOME_WIN] == 1.90
@@ -0,0 +1,41 @@
+import pytest
+import numpy as np
+import snapshot_store
+
+def write_file(directory, file_date, fixtures):
+    """ fixtures: [(meccs id, kezdési nap)] """
+    records = np.zeros(len(fixtures), dtype=snapshot_store.RECORD_DTYPE)
+    records["fixture_id"] = [fixture_id for fixture_id, _ in fixtures]
+    records["kezdes"] = [f"{day}T18:00:00+00:00" for _, day in fixtures]
+    records["valid"] = True
+    np.save(snapshot_store.npy_path(file_date, directory), records)
+
+def test_late_fixture_joins_its_day(tmp_path):
+    write_file(tmp_path, "2025-08-01", [(1, "2025-08-01"), (2, "2025-08-02")])
+    write_file(tmp_path, "2025-08-02", [(2, "2025-08-02"), (3, "2025-08-02")])
+    write_file(tmp_path, "2025-08-03", [(4, "2025-08-03")])
+    # Két nappal a lezárás után érkező, új meccs a 08-01-i napra
+    write_file(tmp_path, "2025-08-04", [(5, "2025-08-04"), (9, "2025-08-01")])
+
+    seen = snapshot_store.SeenIds()
+    days = list(snapshot_store.iter_days(snapshot_store.day_files(tmp_path), seen))
+    dates = [date_str for date_str, _ in days]
+    assert dates == ["2025-08-01", "2025-08-02", "2025-08-03", "2025-08-04"]
+    batches = dict(days)
+    assert batches["2025-08-01"]["fixture_id"].tolist() == [1, 9]
+    assert batches["2025-08-02"]["fixture_id"].tolist() == [2, 3]
+    assert seen.count == 6
+
+def test_seen_ids_keeps_first_occurrence_only():
+    seen = snapshot_store.SeenIds()
+    assert seen.add_new([5, 5, 9, 1_000_000]).tolist() == [True, False, True, True]
+    assert seen.add_new([9, 10]).tolist() == [False, True]
+    assert seen.count == 4
+
+def test_outdated_record_layout_is_rejected(tmp_path):
+    old_dtype = np.dtype([(name, snapshot_store.RECORD_DTYPE.fields[name][0]) for name in snapshot_store.RECORD_DTYPE.names[:-1]])
+    path = snapshot_store.npy_path("2025-08-01", tmp_path)
+    np.save(path, np.zeros(2, dtype=old_dtype))
+    assert not snapshot_store.is_current(path)
+    with pytest.raises(snapshot_store.SnapshotFormatError, match="--rebuild"):
+        snapshot_store.load_day(path)
@@ -0,0 +1,17 @@
+import pytest
+import threshold_sweep
+
+@pytest.mark.parametrize("label, h, a, expected", [
+    ("Over 2.5", 0, 1, "Veszített"),
+    ("Over 2.5", 0, 2, "Veszített"),
+    ("Over 2.5", 1, 2, "Nyert"),
+    ("BTTS", 0, 1, "Veszített"),
+    ("BTTS", 1, 1, "Nyert"),
+    ("Home", 0, 1, "Veszített"),
+    ("Home", 2, 1, "Nyert"),
+])
+def test_grade_uses_the_tip_market(label, h, a, expected):
+    assert threshold_sweep.grade(label, h, a) == expected
+
+def test_grade_unknown_label():
+    assert threshold_sweep.grade("Hazai győzelem (ML)", 2, 1) is None
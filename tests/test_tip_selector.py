@@ -0,0 +1,37 @@
+import os
+import random
+
+# A modul betöltéskor Supabase klienst hoz létre; hálózat nélkül egy formailag érvényes kulcs elég
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_KEY", "eyJhbGciOiJIUzI1NiJ9.e30.x")
+
+from tipp_generator import TipSelector, select_best_single_tips
+
+def make_tips(seed, count=200):
+    rng = random.Random(seed)
+    return [{"fixture_id": rng.randint(1, 25), "kezdes": "2025-08-0%dT18:00:00" % rng.randint(1, 2),
+             "tipp": rng.choice(["Home", "BTTS", "Over 2.5"]), "confidence": rng.choice([70, 75, 80]),
+             "edge": rng.choice([None, 0.01, 0.03, 0.05])} for _ in range(count)]
+
+def test_equal_confidence_tie_broken_by_edge():
+    low = {"fixture_id": 1, "kezdes": "2025-08-01T18:00:00", "tipp": "BTTS", "confidence": 80, "edge": 0.01}
+    high = dict(low, tipp="Over 2.5", edge=0.04)
+    selector = TipSelector(max_tips=5)
+    selector.add([low, high])
+    assert selector.result() == select_best_single_tips([high, low]) == [high]
+
+def test_streaming_matches_full_list():
+    for seed in range(20):
+        tips = make_tips(seed)
+        selector = TipSelector(max_tips=3)
+        for start in range(0, len(tips), 7):
+            selector.add(tips[start:start + 7])
+        assert selector.result() == select_best_single_tips(tips, max_tips=3)
+
+def test_per_day_matches_full_list_by_day():
+    tips = make_tips(99)
+    selector = TipSelector(max_tips=3, per_day=True)
+    selector.add(tips)
+    expected = [tip for day in ("2025-08-01", "2025-08-02")
+                for tip in select_best_single_tips([t for t in tips if t["kezdes"].startswith(day)], max_tips=3)]
+    assert selector.result() == expected
@@ -0,0 +1,94 @@
+# threshold_sweep.py (V1.1 - Tippek kiértékelése a piacok saját kimenetével)
+# A scoring_engine szabályainak küszöbeit (odds sávok, gólátlag, forma, győzelmi arány, edge) hangolja: a jellemzők
+# egyszer számolódnak, a küszöb kombinációk pedig (kombináció × meccs) rácson, NumPy broadcasttal értékelődnek ki.
+# Piaconként önállóan (minden szabálynak megfelelő meccs 1 egység téttel), kombinációnként: tippszám, találati arány,
+# ROI és legnagyobb visszaesés (drawdown) az időrendi profitgörbén. A backtester --sweep módja hívja.
+
+import itertools
+import numpy as np
+import pandas as pd
+import goal_model
+import scoring_engine
+
+# Piaconként: odds / edge oszlop, modell valószínűség, a hangolt küszöbök rácsa
+MARKETS = {
+    "btts": {"odds": "btts_odd", "edge": "btts_edge", "prob": "p_btts", "grid": {
+        "btts_odd_min": (1.45, 1.55, 1.65), "btts_odd_max": (1.95, 2.15, 2.35),
+        "btts_h_scored": np.round(np.arange(1.0, 1.65, 0.1), 2), "btts_v_scored": np.round(np.arange(1.0, 1.45, 0.1), 2),
+        "btts_conceded": (0.8, 1.0, 1.2)}},
+    "over": {"odds": "over25_odd", "edge": "over25_edge", "prob": "p_over25", "grid": {
+        "over_odd_min": (1.40, 1.50, 1.60), "over_odd_max": (1.90, 2.10, 2.30),
+        "over_avg_goals": np.round(np.arange(2.5, 3.25, 0.05), 2), "over_conceded": np.round(np.arange(1.2, 1.75, 0.05), 2)}},
+    "home": {"odds": "home_odd", "edge": "home_edge", "prob": "p_home", "grid": {
+        "home_odd_min": (1.35, 1.45, 1.55, 1.65), "home_odd_max": (1.90, 2.05, 2.20, 2.40),
+        "home_form_diff": tuple(range(0, 10)), "home_win_rate": np.round(np.arange(0.35, 0.66, 0.05), 2)}},
+}
+# Minimális edge; -inf = nincs edge szűrő
+EDGE_GRID = (-np.inf, -0.05, -0.02, 0.0, 0.02)
+# Egy lépésben legfeljebb ennyi (kombináció × meccs) cella, hogy a memória korlátos maradjon
+CHUNK_CELLS = 4_000_000
+
+def outcomes(home_goals, away_goals):
+    """ Piaconként nyert-e a tipp a végeredmény alapján. """
+    h, a = np.asarray(home_goals), np.asarray(away_goals)
+    return {"btts": (h > 0) & (a > 0), "over": (h + a) > 2, "home": h > a}
+
+# A scoring_engine tipp címkéi -> piac (outcomes kulcsai)
+TIP_MARKETS = {"Home": "home", "BTTS": "btts", "Over 2.5": "over"}
+
+def grade(tip_label, home_goals, away_goals):
+    """ Egy scoring_engine tipp kiértékelése a végeredményből: "Nyert" / "Veszített", ismeretlen címkénél None. """
+    market = TIP_MARKETS.get(tip_label)
+    if market is None: return None
+    return "Nyert" if bool(outcomes(home_goals, away_goals)[market]) else "Veszített"
+
+def build_grid(market, edge_grid=EDGE_GRID):
+    """ A piac összes küszöb kombinációja: {küszöb név: (kombináció,) tömb}, plusz "min_edge". """
+    grid = dict(MARKETS[market]["grid"], min_edge=edge_grid)
+    combos = np.array(list(itertools.product(*grid.values())), dtype=float)
+    return {name: combos[:, i] for i, name in enumerate(grid)}
+
+def evaluate_grid(market, features, won, grid):
+    """
+    features: {oszlop: (meccs,) tömb} kezdési idő szerint rendezve; won: (meccs,) bool; grid: build_grid alakú.
+    Kombinációnként tippszám, nyertes, profit, legnagyobb visszaesés (egység téttel), DataFrame-ként.
+    """
+    spec = MARKETS[market]
+    odds, edge = features[spec["odds"]], features[spec["edge"]]
+    gain = np.where(won, odds - 1.0, -1.0)
+    probs = goal_model.from_features(features["h_scored"], features["h_conceded"], features["v_scored"], features["v_conceded"])
+    base_ok = ~np.isnan(odds) & (probs[spec["prob"]] >= scoring_engine.MIN_MODEL_PROB)
+    row = {name: values[None, :] for name, values in features.items()}
+
+    total, n = len(grid["min_edge"]), len(won)
+    step = max(1, CHUNK_CELLS // max(1, n))
+    bets, wins, profit, drawdown = (np.zeros(total) for _ in range(4))
+    for start in range(0, total, step):
+        end = min(total, start + step)
+        thresholds = dict(scoring_engine.THRESHOLDS, **{name: values[start:end, None] for name, values in grid.items() if name != "min_edge"})
+        min_edge = grid["min_edge"][start:end, None]
+        mask = scoring_engine.rule_masks(row, thresholds)[market] & base_ok & (np.isnan(edge) | (edge >= min_edge))
+        curve = np.cumsum(np.where(mask, gain, 0.0), axis=1)
+        peak = np.maximum(np.maximum.accumulate(curve, axis=1), 0.0)
+        bets[start:end], wins[start:end] = mask.sum(axis=1), (mask & won).sum(axis=1)
+        profit[start:end] = curve[:, -1] if n else 0.0
+        drawdown[start:end] = (peak - curve).max(axis=1) if n else 0.0
+
+    result = pd.DataFrame(grid)
+    result["bets"], result["wins"], result["profit"], result["max_drawdown"] = bets.astype(int), wins.astype(int), profit.round(2), drawdown.round(2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result["hit_rate"] = np.where(bets > 0, wins / bets * 100, np.nan).round(2)
+        result["roi"] = np.where(bets > 0, profit / bets * 100, np.nan).round(2)
+    return result
+
+def current_grid(market):
+    """ Az éles (jelenlegi) küszöbök egyetlen kombinációként, összehasonlításhoz. """
+    grid = {name: np.array([float(scoring_engine.THRESHOLDS[name])]) for name in MARKETS[market]["grid"]}
+    grid["min_edge"] = np.array([scoring_engine.MIN_EDGE])
+    return grid
+
+def sweep(features, home_goals, away_goals, markets=tuple(MARKETS)):
+    """ {piac: (összes kombináció eredménye, jelenlegi küszöbök eredménye)}. """
+    won = outcomes(home_goals, away_goals)
+    return {market: (evaluate_grid(market, features, won[market], build_grid(market)),
+                     evaluate_grid(market, features, won[market], current_grid(market))) for market in markets}
@@ -1,4 +1,4 @@
-# tipp_generator.py (V23.3 - FIX: Team Names in Output)
+# tipp_generator.py (V25.8 - Egyértelmű tipp sorrend (konfidencia, edge, meccs))
 
 import os
 import requests
@@ -8,6 +8,25 @@ import time
 import pytz
 import sys
 import json 
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import api_cache
+import api_client
+import api_quota
+import scoring_engine
+import goal_model
+import models
+import odds_engine
+import run_checkpoint
+import run_metrics
+import stream_pipeline
+import fixture_fetch
+import league_meta
+import http_cassette
+
+# Offline méréshez: HTTP_CASSETTE + HTTP_CASSETTE_MODE=record|replay (lásd http_cassette.py)
+http_cassette.install_from_env()
 
 # --- Konfiguráció ---
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
@@ -24,6 +43,11 @@ HOSTS = {
     "basketball": "v1.basketball.api-sports.io"
 }
 
+# Az előtöltés párhuzamossága (a percenkénti kvótát az api_client limitere tartja)
+PREFETCH_WORKERS = int(os.environ.get("PREFETCH_WORKERS", "8"))
+# Többnapos mód: ennyi napot (ma + következők) dolgoz fel egy futás; üresen a régi viselkedés (foci: ma, hoki/kosár: ma + holnap)
+HORIZON_DAYS = os.environ.get("GENERATOR_HORIZON_DAYS")
+
 TELEGRAM_TOKEN = os.environ.get("TELEGRAM_TOKEN")
 ADMIN_CHAT_ID = 1326707238 
 
@@ -34,8 +58,10 @@ except:
 
 BUDAPEST_TZ = pytz.timezone('Europe/Budapest')
 
-TEAM_STATS_CACHE = {} 
-INJURIES_CACHE = {}
+TEAM_STATS_CACHE = {}      # "csapat_liga" -> models.TeamStats (None: hiányos statisztika)
+INJURIES_CACHE = {}        # meccs_id -> kulcsjátékos sérültek száma
+ODDS_CACHE = {}            # (sport, meccs_id) -> models.Odds (None: nincs odds)
+ODDS_LOADED_GROUPS = set()  # (sport, liga, szezon, nap) csoportok, amikre a tömeges letöltés lefutott
 
 # --- LIGÁK LISTÁJA ---
 RELEVANT_LEAGUES_FOOTBALL = {
@@ -64,237 +90,583 @@ def is_valid_future_match(game_date_str, status_short):
     except Exception:
         return False
 
-def get_api_data(sport, endpoint, params, retries=3, delay=5):
+def get_api_response(sport, endpoint, params, retries=3, delay=5, item_filter=None, filter_key=None):
+    """ A teljes JSON választ adja vissza (response + paging), hiba esetén None-t. item_filter: streamelt szűrés. """
     host = HOSTS.get(sport)
-    if not host: return []
-    url = f"https://{host}/{endpoint}"
+    if not host: return None
     headers = {"x-apisports-key": API_KEY, "x-apisports-host": host}
-    for i in range(retries):
-        try:
-            response = requests.get(url, headers=headers, params=params, timeout=25)
-            if response.status_code == 403: return []
-            response.raise_for_status()
-            data = response.json()
-            if "errors" in data and data["errors"]: return []
-            time.sleep(0.3)
-            return data.get('response', [])
-        except requests.exceptions.RequestException:
-            if i < retries - 1: time.sleep(delay)
-            else: return []
+    return api_client.get_json(host, endpoint, params, headers=headers, retries=retries, backoff=delay, item_filter=item_filter, filter_key=filter_key)
+
+def get_api_data(sport, endpoint, params, retries=3, delay=5):
+    if not HOSTS.get(sport): return []
+    cacheable = api_cache.is_cacheable(endpoint)
+    if cacheable:
+        cached = api_cache.get(sport, endpoint, params)
+        if cached is not None: return cached
+    data = get_api_response(sport, endpoint, params, retries, delay)
+    if not data: return []
+    payload = data.get('response', [])
+    if cacheable: api_cache.put(sport, endpoint, params, payload)
+    return payload
+
+def get_api_data_all_pages(sport, endpoint, params, max_pages=30):
+    """
+    Lapozós végpontok (pl. odds) oldalainak lekérése egy listába. Visszatér: (elemek, teljes-e); (None, False), ha már
+    az első oldal hibás. Nem teljes, ha egy későbbi oldal hibás, vagy több oldal van, mint max_pages.
+    """
+    first = get_api_response(sport, endpoint, params)
+    if not first: return None, False
+    items = list(first.get('response', []))
+    total_pages = (first.get('paging') or {}).get('total') or 1
+    for page in range(2, min(total_pages, max_pages) + 1):
+        data = get_api_response(sport, endpoint, {**params, "page": str(page)})
+        if not data: return items, False
+        items.extend(data.get('response', []))
+    return items, total_pages <= max_pages
+
+# =========================================================================
+# 💰 ODDS BETÖLTÉS (TÖMEGES)
+# =========================================================================
+
+def _odds_group_key(sport, game):
+    """ Foci: liga + szezon + nap; hoki/kosár: liga + szezon (ott nincs dátum szűrő). """
+    if sport == "football":
+        return (game['league']['id'], str(game['league']['season']), game['fixture']['date'][:10])
+    return (game['league']['id'], str(game['league']['season']), None)
+
+def load_odds_for_games(sport, games, max_workers=PREFETCH_WORKERS):
+    """ Ligánként és naponként egy (lapozott) odds lekérés, majd meccs ID szerint indexelve az ODDS_CACHE-be. """
+    groups = {}
+    for game in games:
+        try: groups.setdefault(_odds_group_key(sport, game), None)
+        except (KeyError, TypeError): continue
+    if not groups: return
+    print(f"💰 {sport} oddsok tömeges betöltése: {len(groups)} liga/nap csoport...")
+    started = time.monotonic()
+
+    def fetch_group(group):
+        league_id, season, date_str = group
+        params = {"league": str(league_id), "season": season}
+        if date_str: params["date"] = date_str
+        return get_api_data_all_pages(sport, "odds", params)
+
+    id_field = "fixture" if sport == "football" else "game"
+    game_ids, bookmaker_lists = [], []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {group: pool.submit(fetch_group, group) for group in groups}
+        for group, future in futures.items():
+            items, complete = future.result()
+            if items is None: continue  # hiba esetén meccsenkénti lekérés marad a tartalék
+            for item in items:
+                game_id = (item.get(id_field) or {}).get('id')
+                if game_id is not None:
+                    game_ids.append(game_id)
+                    bookmaker_lists.append(item.get('bookmakers'))
+            # Csak teljes lapozás után mondhatjuk, hogy a csoport hiányzó meccseinek nincs oddsa;
+            # hiányos lapozásnál a le nem töltött oldalak meccsei meccsenkénti lekéréssel mennek
+            if complete: ODDS_LOADED_GROUPS.add((sport,) + group)
+            else: print(f"   ⚠️ {sport} odds csoport {group} lapozása hiányos, a kimaradt meccsek egyenként kérődnek le.")
+    # Az összes iroda árazása egyetlen mátrix műveletben
+    for game_id, odds in zip(game_ids, odds_engine.build_odds(bookmaker_lists, sport)):
+        ODDS_CACHE[(sport, game_id)] = odds
+    print(f"   ✔️ {len(game_ids)} meccs oddsai betöltve {time.monotonic() - started:.1f} mp alatt.")
+
+def get_odds(sport, game_id, game):
+    """ models.Odds a memóriából (vagy None); egyedi lekérés csak akkor, ha a meccs csoportjára nem futott le a tömeges betöltés. """
+    if (sport, game_id) in ODDS_CACHE: return ODDS_CACHE[(sport, game_id)]
+    if (sport,) + _odds_group_key(sport, game) in ODDS_LOADED_GROUPS: return None
+    param = "fixture" if sport == "football" else "game"
+    odds_data = get_api_data(sport, "odds", {param: str(game_id)})
+    odds = odds_engine.build_odds([odds_data[0].get('bookmakers') if odds_data else None], sport)[0]
+    ODDS_CACHE[(sport, game_id)] = odds
+    return odds
 
 # =========================================================================
 # ⚽ FOCI LOGIKA
 # =========================================================================
 
-def prefetch_data_for_fixtures(fixtures):
-    if not fixtures: return
-    print(f"⚽ {len(fixtures)} releváns foci meccsre adatok előtöltése...")
+def current_stats_season(league_id=None):
+    """ A liga aktuális szezonja a league_meta indexből; ha nem ismert, az őszi rajtú ligákra becsült év. """
+    season = league_meta.current_season("football", league_id) if league_id else None
+    if season: return season
     now = datetime.now(BUDAPEST_TZ)
-    season = str(now.year - 1) if now.month <= 7 else str(now.year)
-    target_date = fixtures[0]['fixture']['date'][:10] if fixtures else None
+    return str(now.year - 1) if now.month <= 7 else str(now.year)
+
+def refresh_league_meta():
+    """ Hetente egy `leagues?current=true` hívás (lásd league_meta.py). """
+    league_meta.refresh("football", lambda params: get_api_response("football", "leagues", params))
+
+def has_coverage(fixture):
+    """ Statisztika és odds lefedettség nélküli ligában nem tudunk tippet adni, ott egy hívást sem költünk. """
+    return league_meta.supports("football", fixture['league']['id'], "stats", "odds")
+
+def team_stats_params(league_id, team_id, target_date):
+    params = {"league": str(league_id), "season": current_stats_season(league_id), "team": str(team_id)}
+    if target_date: params["date"] = target_date
+    return params
+
+class QuotaReservation:
+    """
+    A többnapos lánc közös kvóta foglalása: az ablak keretét az első terv rögzíti, minden nap terve ebből von le,
+    és a betervezett hívás kulcsok (közös csapatstatisztika) az egész ablakra közösek. A láncban a következő nap
+    terve még az előző nap hívásai előtt fut, így a remaining_today() önmagában kétszer adná ki ugyanazt a keretet.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.budget = None
+        self.planned = set()
+
+def plan_football_fixtures(fixtures, stats_date=None, reservation=None):
+    """
+    Becsli a foci előtöltés + odds hívásszámát (a memória- és lemez cache figyelembevételével), és ha nem fér
+    bele a napi keretbe, a RELEVANT_LEAGUES_FOOTBALL sorrendje szerint legkevésbé fontos ligák meccseit hagyja el.
+    reservation: QuotaReservation a többnapos láncban (a napok egymás után, a közös keretből terveznek).
+    """
+    if not fixtures: return fixtures
+    reservation = reservation or QuotaReservation()
+    with reservation.lock:
+        return _plan_football_fixtures(fixtures, stats_date, reservation)
+
+def _plan_football_fixtures(fixtures, stats_date, reservation):
+    host = HOSTS["football"]
+    if reservation.budget is None: reservation.budget = api_quota.remaining_today(host) - api_quota.QUOTA_RESERVE
+    budget = reservation.budget
+    priority = {league_id: i for i, league_id in enumerate(RELEVANT_LEAGUES_FOOTBALL)}
+    target_date = stats_date or fixtures[0]['fixture']['date'][:10]
+
+    def cost(fixture, planned):
+        keys = set()
+        fixture_id, league_id = fixture['fixture']['id'], fixture['league']['id']
+        if fixture_id not in INJURIES_CACHE and league_meta.supports("football", league_id, "injuries") and not api_cache.contains("football", "injuries", {"fixture": str(fixture_id)}):
+            keys.add(("injuries", fixture_id))
+        for side in ("home", "away"):
+            team_id = fixture['teams'][side]['id']
+            if f"{team_id}_{league_id}" in TEAM_STATS_CACHE: continue
+            if not api_cache.contains("football", "teams/statistics", team_stats_params(league_id, team_id, target_date)):
+                keys.add(("stats", team_id, league_id))
+        keys.add(("odds",) + _odds_group_key("football", fixture))
+        new_keys = keys - planned
+        return len(new_keys), new_keys
+
+    kept, estimate, skipped = api_quota.plan_within_budget(fixtures, cost, lambda f: priority.get(f['league']['id'], len(priority)), budget, reservation.planned)
+    reservation.budget -= estimate
+    print(f"📊 Kvóta terv: ~{estimate} hívás, keret: {budget} (napi maradék {api_quota.remaining_today(host)}, az ablakra még szabad: {reservation.budget}).")
+    if skipped:
+        dropped = sorted({RELEVANT_LEAGUES_FOOTBALL.get(f['league']['id'], f['league']['name']) for f in skipped})
+        print(f"⚠️ Kvóta miatt kihagyva {len(skipped)} meccs: {', '.join(dropped)}")
+    return kept
+
+def prefetch_data_for_fixtures(fixtures, max_workers=PREFETCH_WORKERS, stats_date=None):
+    """
+    Sérülések és csapatstatisztikák előtöltése egyetlen párhuzamos körben (a limiter tartja a kvótát).
+    stats_date: a statisztikák dátuma; többnapos módban az ablak első napja, így egy csapat statja minden napra közös.
+    """
+    if not fixtures: return
+    print(f"⚽ {len(fixtures)} releváns foci meccsre adatok előtöltése ({max_workers} szálon)...")
+    target_date = stats_date or fixtures[0]['fixture']['date'][:10]
+
+    # 1. Feladatlista duplikációk nélkül (egy csapat több meccsnél is szerepelhet)
+    injury_jobs, stats_jobs = [], {}
     for fixture in fixtures:
         fixture_id, league_id = fixture['fixture']['id'], fixture['league']['id']
         home_id, away_id = fixture['teams']['home']['id'], fixture['teams']['away']['id']
-        if fixture_id not in INJURIES_CACHE: INJURIES_CACHE[fixture_id] = get_api_data("football", "injuries", {"fixture": str(fixture_id)})
+        if fixture_id not in INJURIES_CACHE and fixture_id not in injury_jobs:
+            # Sérült lefedettség nélküli ligában nincs mit lekérni
+            if league_meta.supports("football", league_id, "injuries"): injury_jobs.append(fixture_id)
+            else: INJURIES_CACHE[fixture_id] = 0
         for team_id in [home_id, away_id]:
             stats_key = f"{team_id}_{league_id}"
-            if stats_key not in TEAM_STATS_CACHE:
-                params = {"league": str(league_id), "season": season, "team": str(team_id)}
-                if target_date: params["date"] = target_date
-                stats = get_api_data("football", "teams/statistics", params)
-                if stats: TEAM_STATS_CACHE[stats_key] = stats
+            if stats_key not in TEAM_STATS_CACHE and stats_key not in stats_jobs:
+                stats_jobs[stats_key] = team_stats_params(league_id, team_id, target_date)
+    if not injury_jobs and not stats_jobs: return
+
+    # 2. Párhuzamos letöltés, a cache-eket csak a fő szál írja
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        injury_futures = {fid: pool.submit(get_api_data, "football", "injuries", {"fixture": str(fid)}) for fid in injury_jobs}
+        stats_futures = {key: pool.submit(get_api_data, "football", "teams/statistics", params) for key, params in stats_jobs.items()}
+        for fid, future in injury_futures.items():
+            INJURIES_CACHE[fid] = scoring_engine.count_key_injuries(future.result())
+        for key, future in stats_futures.items():
+            stats = future.result()
+            if stats: TEAM_STATS_CACHE[key] = models.TeamStats.from_api(stats)
+    print(f"   ✔️ {len(injury_jobs) + len(stats_jobs)} hívás kész {time.monotonic() - started:.1f} mp alatt.")
+
+def build_fixture_features(raw_fixture):
+    """ Szűrés (érvényesség, derbi, kupa) + jellemzők kinyerése a cache-ekből a batch pontozáshoz. """
+    fixture = models.Fixture.from_api(raw_fixture)
+    if not is_valid_future_match(fixture.date, fixture.status): return None
+    if tuple(sorted((fixture.home_id, fixture.away_id))) in DERBY_LIST or "Cup" in fixture.league_name or "Kupa" in fixture.league_name: return None
+    stats_h = TEAM_STATS_CACHE.get(f"{fixture.home_id}_{fixture.league_id}")
+    stats_v = TEAM_STATS_CACHE.get(f"{fixture.away_id}_{fixture.league_id}")
+    if stats_h is None or stats_v is None: return None
+    odds = get_odds("football", fixture.id, raw_fixture)
+    return scoring_engine.extract_features(fixture, stats_h, stats_v, INJURIES_CACHE.get(fixture.id, 0), odds)
+
+def score_football_fixtures(fixtures):
+    """ Az összes előtöltött meccs egyetlen vektorizált pontozási körben. """
+    return scoring_engine.score_rows([build_fixture_features(f) for f in fixtures])
 
 def analyze_fixture_smart_stats(fixture):
-    if not is_valid_future_match(fixture['fixture']['date'], fixture['fixture']['status']['short']): return []
-
-    teams, league, fixture_id = fixture['teams'], fixture['league'], fixture['fixture']['id']
-    home_id, away_id = teams['home']['id'], teams['away']['id']
-    if tuple(sorted((home_id, away_id))) in DERBY_LIST or "Cup" in league['name'] or "Kupa" in league['name']: return []
-    stats_h = TEAM_STATS_CACHE.get(f"{home_id}_{league['id']}")
-    stats_v = TEAM_STATS_CACHE.get(f"{away_id}_{league['id']}")
-    if not stats_h or not stats_v or not stats_h.get('goals') or not stats_v.get('goals'): return []
-    h_played = stats_h['fixtures']['played']['home'] or 1
-    h_scored = (stats_h['goals']['for']['total']['home'] or 0) / h_played
-    h_conceded = (stats_h['goals']['against']['total']['home'] or 0) / h_played
-    v_played = stats_v['fixtures']['played']['away'] or 1
-    v_scored = (stats_v['goals']['for']['total']['away'] or 0) / v_played
-    v_conceded = (stats_v['goals']['against']['total']['away'] or 0) / v_played
-    def calc_form_points(form_str):
-        if not form_str: return 0 
-        pts = 0
-        for char in form_str[-5:]:
-            if char == 'W': pts += 3
-            elif char == 'D': pts += 1
-        return pts
-    h_form_pts = calc_form_points(stats_h.get('form'))
-    v_form_pts = calc_form_points(stats_v.get('form'))
-    form_diff = h_form_pts - v_form_pts 
-    injuries = INJURIES_CACHE.get(fixture_id, [])
-    key_injuries = sum(1 for p in injuries if p.get('player', {}).get('type') in ['Attacker', 'Midfielder'] and 'Missing' in (p.get('player', {}).get('reason') or ''))
-    odds_data = get_api_data("football", "odds", {"fixture": str(fixture_id)})
-    if not odds_data or not odds_data[0].get('bookmakers'): return []
-    bets = odds_data[0]['bookmakers'][0].get('bets', [])
-    odds = {f"{b.get('name')}_{v.get('value')}": float(v.get('odd')) for b in bets for v in b.get('values', [])}
-    found_tips = []
-    base_confidence = 70
-    if key_injuries >= 2: base_confidence -= 15 
-    btts_odd = odds.get("Both Teams to Score_Yes")
-    if btts_odd and 1.55 <= btts_odd <= 2.15:
-        if h_scored >= 1.3 and v_scored >= 1.2:
-            if h_conceded >= 1.0 and v_conceded >= 1.0:
-                found_tips.append({"tipp": "BTTS", "odds": btts_odd, "confidence": base_confidence + 5})
-    over_odd = odds.get("Goals Over/Under_Over 2.5")
-    if over_odd and 1.50 <= over_odd <= 2.10:
-        match_avg_goals = (h_scored + h_conceded + v_scored + v_conceded) / 2
-        if match_avg_goals > 2.85:
-            if h_conceded > 1.45 or v_conceded > 1.45:
-                found_tips.append({"tipp": "Over 2.5", "odds": over_odd, "confidence": base_confidence + 4})
-    home_odd = odds.get("Match Winner_Home")
-    if home_odd and 1.45 <= home_odd <= 2.20:
-        if form_diff >= 5:
-            if stats_h['fixtures']['wins']['home'] / h_played >= 0.45:
-                found_tips.append({"tipp": "Home", "odds": home_odd, "confidence": 85}) 
-    if not found_tips: return []
-    best_tip = sorted(found_tips, key=lambda x: x['confidence'], reverse=True)[0]
-    if best_tip['confidence'] < 65: return []
-    return [{"fixture_id": fixture_id, "csapat_H": teams['home']['name'], "csapat_V": teams['away']['name'], "kezdes": fixture['fixture']['date'], "liga_nev": league['name'], "tipp": best_tip['tipp'], "odds": best_tip['odds'], "confidence": best_tip['confidence']}]
+    return score_football_fixtures([fixture])
+
+def football_odds_fingerprint(fixture):
+    """ A foci szabályok által olvasott három odds (BTTS, Over 2.5, Hazai) az ellenőrzőponthoz. """
+    odds = get_odds("football", fixture['fixture']['id'], fixture)
+    return run_checkpoint.fingerprint(list(odds.values) + list(odds.best) if odds else [None] * (2 * models.MARKET_COUNT))
 
 # =========================================================================
 # 🏒 HOKI & 🏀 KOSÁR LOGIKA
 # =========================================================================
 
-def analyze_hockey(game):
-    if not is_valid_future_match(game['date'], game['status']['short']): return []
-    game_id, teams = game['id'], game['teams']
-    league_name, start_date = game['league']['name'], game['date']
-    odds_data = get_api_data("hockey", "odds", {"game": str(game_id)})
-    if not odds_data: return []
-    bookmakers = odds_data[0].get('bookmakers', [])
-    if not bookmakers: return []
-    bets = bookmakers[0].get('bets', [])
-    home_win_odd = None
-    for bet in bets:
-        if bet['name'] in ["Home/Away", "Money Line", "Match Winner"]:
-            for val in bet['values']:
-                if val['value'] == "Home": home_win_odd = float(val['odd']); break
+def get_home_win_odd(sport, game):
+    odds = get_odds(sport, game['id'], game)
+    return odds.get(models.HOME_WIN) if odds else None
+
+def get_home_win_edge(sport, game):
+    """ A hazai győzelem legjobb árának edge-e a konszenzushoz képest; None, ha nincs konszenzus. """
+    odds = get_odds(sport, game['id'], game)
+    edge = odds.edge(models.HOME_WIN) if odds else math.nan
+    return None if math.isnan(edge) else round(edge, 4)
+
+def edge_allows(edge):
+    return edge is None or edge >= scoring_engine.MIN_EDGE
+
+def game_odds_fingerprint(sport, game):
+    odds = get_odds(sport, game['id'], game)
+    return run_checkpoint.fingerprint([get_home_win_odd(sport, game), odds.best[models.HOME_WIN] if odds else None])
+
+def analyze_hockey(raw_game):
+    game = models.Fixture.from_game(raw_game)
+    if not is_valid_future_match(game.date, game.status): return []
+    home_win_odd, edge = get_home_win_odd("hockey", raw_game), get_home_win_edge("hockey", raw_game)
     tips = []
-    if home_win_odd and 1.45 <= home_win_odd <= 1.85:
-        tips.append({"fixture_id": game_id, "csapat_H": teams['home']['name'], "csapat_V": teams['away']['name'], "kezdes": start_date, "liga_nev": league_name, "tipp": "Hazai győzelem (ML)", "odds": home_win_odd, "confidence": 75})
+    if home_win_odd and 1.45 <= home_win_odd <= 1.85 and edge_allows(edge):
+        tips.append({"fixture_id": game.id, "csapat_H": game.home_name, "csapat_V": game.away_name, "kezdes": game.date, "liga_nev": game.league_name, "tipp": "Hazai győzelem (ML)", "odds": home_win_odd, "confidence": 75, "edge": edge})
     return tips
 
-def analyze_basketball(game):
-    if not is_valid_future_match(game['date'], game['status']['short']): return []
-    game_id, teams = game['id'], game['teams']
-    league_name, start_date = game['league']['name'], game['date']
-    odds_data = get_api_data("basketball", "odds", {"game": str(game_id)})
-    if not odds_data: return []
-    bookmakers = odds_data[0].get('bookmakers', [])
-    if not bookmakers: return []
-    bets = bookmakers[0].get('bets', [])
-    home_win_odd = None
-    for bet in bets:
-        if bet['name'] in ["Home/Away", "Money Line", "Match Winner"]:
-            for val in bet['values']:
-                if val['value'] == "Home": home_win_odd = float(val['odd']); break
+def analyze_basketball(raw_game):
+    game = models.Fixture.from_game(raw_game)
+    if not is_valid_future_match(game.date, game.status): return []
+    home_win_odd, edge = get_home_win_odd("basketball", raw_game), get_home_win_edge("basketball", raw_game)
     tips = []
-    if home_win_odd and 1.40 <= home_win_odd <= 1.75:
-        tips.append({"fixture_id": game_id, "csapat_H": teams['home']['name'], "csapat_V": teams['away']['name'], "kezdes": start_date, "liga_nev": league_name, "tipp": "Hazai győzelem (NBA)", "odds": home_win_odd, "confidence": 78})
+    if home_win_odd and 1.40 <= home_win_odd <= 1.75 and edge_allows(edge):
+        tips.append({"fixture_id": game.id, "csapat_H": game.home_name, "csapat_V": game.away_name, "kezdes": game.date, "liga_nev": game.league_name, "tipp": "Hazai győzelem (NBA)", "odds": home_win_odd, "confidence": 78, "edge": edge})
     return tips
 
 # ... FŐVEZÉRLŐ & MENTÉS ...
 
+def tip_rank(tip):
+    """ Tipp sorrend: konfidencia, azonosnál a konszenzushoz képest nagyobb edge, végül a meccs azonosító (teljes rendezés). """
+    return (tip['confidence'], tip['edge'] if tip.get('edge') is not None else -math.inf, tip['fixture_id'])
+
 def select_best_single_tips(all_potential_tips, max_tips=5):
     unique_fixtures = {}
     for tip in all_potential_tips:
         fid = tip['fixture_id']
-        if fid not in unique_fixtures or unique_fixtures[fid]['confidence'] < tip['confidence']:
+        if fid not in unique_fixtures or tip_rank(unique_fixtures[fid]) < tip_rank(tip):
             unique_fixtures[fid] = tip
-    return sorted(unique_fixtures.values(), key=lambda x: x['confidence'], reverse=True)[:max_tips]
+    return sorted(unique_fixtures.values(), key=tip_rank, reverse=True)[:max_tips]
 
-def save_tips_split_by_date(single_tips, today_str):
-    if not single_tips: return
+class TipSelector:
+    """
+    Folyamatos kiválasztás a láncok végén: meccsenként a legjobb tipp, és keretenként (napi módban naponként)
+    csak a legjobb max_tips marad meg, így a jelöltek száma nem nő a meccsek számával. Több sport szála is írhatja.
+    """
+    def __init__(self, max_tips=5, per_day=False):
+        self.max_tips, self.per_day = max_tips, per_day
+        self.buckets = {}
+        self.seen = 0
+        self._lock = threading.Lock()
+
+    def add(self, tips):
+        with self._lock:
+            for tip in tips:
+                self.seen += 1
+                bucket = self.buckets.setdefault(tip['kezdes'][:10] if self.per_day else None, {})
+                current = bucket.get(tip['fixture_id'])
+                if current is None or tip_rank(current) < tip_rank(tip): bucket[tip['fixture_id']] = tip
+                # A tip_rank teljes rendezés, így a kiesett meccs már nem kerülhet a legjobbak közé, csak egy későbbi,
+                # jobb tippjével kerül vissza: a végeredmény ugyanaz, mint a teljes listán
+                if len(bucket) > 2 * self.max_tips: self._trim(bucket)
 
+    def _trim(self, bucket):
+        best = select_best_single_tips(bucket.values(), max_tips=self.max_tips)
+        bucket.clear()
+        bucket.update((tip['fixture_id'], tip) for tip in best)
+
+    def result(self):
+        with self._lock:
+            return [tip for key in sorted(self.buckets) for tip in select_best_single_tips(self.buckets[key].values(), max_tips=self.max_tips)]
+
+def group_tips_by_date(single_tips):
     grouped_tips = {}
     for tip in single_tips:
         date_key = tip['kezdes'][:10]
         if date_key not in grouped_tips:
             grouped_tips[date_key] = []
         grouped_tips[date_key].append(tip)
-    
+    return grouped_tips
+
+def tip_to_row(t):
+    return {"fixture_id": t['fixture_id'], "csapat_H": t['csapat_H'], "csapat_V": t['csapat_V'], "kezdes": t['kezdes'], "liga_nev": t['liga_nev'], "tipp": t['tipp'], "odds": t['odds'], "eredmeny": "Tipp leadva", "confidence_score": t['confidence']}
+
+def save_tips_split_by_date(single_tips, today_str):
+    """
+    Minden nap tippje, szelvénye és daily_status sora egyetlen RPC hívásban, egy tranzakcióban (sql/save_generated_tips.sql).
+    A jóváhagyási kérés csak sikeres commit után megy ki. Visszatér: {nap: [meccsek.id, ...]} vagy None.
+    """
+    if not single_tips: return None
+    grouped_tips = group_tips_by_date(single_tips)
+    payload = [{"date": date_key, "tips": [tip_to_row(t) for t in tips_in_group]} for date_key, tips_in_group in grouped_tips.items()]
+    for group in payload: print(f"📦 Mentés erre a napra: {group['date']} ({len(group['tips'])} db tipp)")
+
+    with run_metrics.stage("save"):
+        try:
+            result = supabase.rpc("save_generated_tips", {"p_groups": payload}).execute().data or []
+            saved_ids = {row['date']: row['ids'] for row in result}
+        except Exception as e:
+            if not rpc_missing(e):
+                # A függvényen belüli hiba (constraint, típus...) visszagörgette a tranzakciót: nincs részleges mentés
+                print(f"!!! HIBA a mentésnél (semmi sem került mentésre): {e}")
+                return None
+            # A függvény még nincs telepítve: régi, naponkénti mentés, de jóváhagyás csak ha minden nap sikerült
+            print("⚠️ A save_generated_tips RPC nem elérhető, naponkénti mentés (sql/save_generated_tips.sql telepítése javasolt).")
+            saved_ids = save_tips_legacy(grouped_tips)
+            if saved_ids is None: return None
+
+    # A gombok a teljes mentett tartományt viszik (legalább holnapig, mint eddig; --days=N módban a horizont végéig)
+    tomorrow_str = (datetime.strptime(today_str, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    send_approval_request(today_str, len(single_tips), run_metrics.format_summary(), last_date=max([tomorrow_str, *grouped_tips]))
+    return saved_ids
+
+def rpc_missing(error):
+    """ Csak a nem telepített függvény (PostgREST PGRST202) ad okot a régi mentésre; a függvényen belüli hibák nem. """
+    return "PGRST202" in str(error) or "Could not find the function" in str(error)
+
+def save_tips_legacy(grouped_tips):
+    saved_ids = {}
     for date_key, tips_in_group in grouped_tips.items():
-        print(f"📦 Mentés erre a napra: {date_key} ({len(tips_in_group)} db tipp)")
         try:
-            tips_to_insert = [{"fixture_id": t['fixture_id'], "csapat_H": t['csapat_H'], "csapat_V": t['csapat_V'], "kezdes": t['kezdes'], "liga_nev": t['liga_nev'], "tipp": t['tipp'], "odds": t['odds'], "eredmeny": "Tipp leadva", "confidence_score": t['confidence']} for t in tips_in_group]
-            saved_tips = supabase.table("meccsek").insert(tips_to_insert, returning='representation').execute().data
+            saved_tips = supabase.table("meccsek").insert([tip_to_row(t) for t in tips_in_group], returning='representation').execute().data
             
             slips_to_insert = [{"tipp_neve": f"Napi Tuti - {date_key}", "eredo_odds": tip["odds"], "tipp_id_k": [tip["id"]], "confidence_percent": tip["confidence_score"]} for tip in saved_tips]
             
             if slips_to_insert:
                 supabase.table("napi_tuti").insert(slips_to_insert).execute()
                 record_daily_status(date_key, "Jóváhagyásra vár", f"{len(slips_to_insert)} tipp.")
+            saved_ids[date_key] = [tip["id"] for tip in saved_tips]
                 
         except Exception as e:
             print(f"!!! HIBA a mentésnél ({date_key}): {e}")
+            return None
+    return saved_ids
 
-    send_approval_request(today_str, len(single_tips))
+def save_match_xg(rows):
+    """ A pontozott meccsek gólmodell xG-je a match_xg táblába (a claude_ai_generator promptja olvassa); a tábla hiánya nem állítja meg a generátort. """
+    rows = [r for r in rows if r]
+    if not rows: return
+    columns = {name: i for i, name in enumerate(scoring_engine.ID_COLUMNS + scoring_engine.FEATURE_COLUMNS)}
+    xg_home, xg_away = goal_model.expected_goals(*([r[columns[c]] for r in rows] for c in ("h_scored", "h_conceded", "v_scored", "v_conceded")))
+    try:
+        supabase.table("match_xg").upsert([
+            {"fixture_id": r[columns["fixture_id"]], "kezdes": r[columns["kezdes"]], "csapat_h": r[columns["csapat_H"]], "csapat_v": r[columns["csapat_V"]],
+             "liga_nev": r[columns["liga_nev"]], "xg_home": round(float(h), 2), "xg_away": round(float(a), 2), "updated_at": datetime.now(timezone.utc).isoformat()}
+            for r, h, a in zip(rows, xg_home, xg_away)], on_conflict="fixture_id").execute()
+    except Exception as e:
+        print(f"xG mentési hiba (sql/match_xg.sql telepítve?): {e}")
 
 def record_daily_status(date_str, status, reason=""):
     try: supabase.table("daily_status").upsert({"date": date_str, "status": status, "reason": reason}, on_conflict="date").execute()
     except: pass
 
-def send_approval_request(date_str, count):
+def send_approval_request(date_str, count, run_summary=None, last_date=None):
+    """ Admin jóváhagyási kérés; a gombok callback adata: "<művelet>:<első nap>:<utolsó nap>". """
     if not TELEGRAM_TOKEN: return
     url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-    keyboard = {"inline_keyboard": [[{"text": f"✅ Tippek Jóváhagyása", "callback_data": f"approve_tips:{date_str}"}], [{"text": "❌ Elutasítás (Törlés)", "callback_data": f"reject_tips:{date_str}"}]]}
+    date_range = f"{date_str}:{last_date or date_str}"
+    keyboard = {"inline_keyboard": [[{"text": f"✅ Tippek Jóváhagyása", "callback_data": f"approve_tips:{date_range}"}], [{"text": "❌ Elutasítás (Törlés)", "callback_data": f"reject_tips:{date_range}"}]]}
     msg = (f"🤖 *Új Multi-Sport Tippek Generálva*\n\nÖsszesen: *{count} db* tipp.\n(A rendszer automatikusan szétválogatta őket a megfelelő napokra!)")
+    # Kódblokkban, hogy a szakasznevek ne törjék a Markdown formázást
+    if run_summary: msg += f"\n\n⏱ *Futási statisztika:*\n```\n{run_summary}\n```"
     try: requests.post(url, json={"chat_id": ADMIN_CHAT_ID, "text": msg, "parse_mode": "Markdown", "reply_markup": keyboard}).raise_for_status()
     except: pass
 
+def game_id_of(game):
+    """ Foci: fixture.id, hoki/kosár: id. """
+    return game['fixture']['id'] if 'fixture' in game else game.get('id')
+
+def fetch_football_fixtures(date_str):
+    """ Egy nap releváns foci meccsei: ligánkénti vagy streamelt napi lekérés, a mért költség szerint. """
+    budget = api_quota.remaining_today(HOSTS["football"]) - api_quota.QUOTA_RESERVE
+    request_fn = lambda params, **kwargs: get_api_response("football", "fixtures", params, **kwargs)
+    return fixture_fetch.fetch_fixtures("football", date_str, RELEVANT_LEAGUES_FOOTBALL, request_fn, budget=budget) or []
+
+def iter_game_days(sport, endpoint, dates, fetch_day=None):
+    """ Naponkénti meccslisták (kötegek) sorrendben, pár nappal előre letöltve; a napok határán mindkét listában szereplő meccs csak egyszer. """
+    fetch_day = fetch_day or (lambda d: get_api_data(sport, endpoint, {"date": d}) or [])
+    seen = set()
+    for day in stream_pipeline.ordered_map(fetch_day, dates):
+        games = [g for g in day if game_id_of(g) not in seen]
+        seen.update(game_id_of(g) for g in games)
+        yield games
+
+def timed_stage(name, sport, fn):
+    """ A lánc egy szakasza kötegenkénti időméréssel (run_metrics összesíti). """
+    def run(batch):
+        with run_metrics.stage(name, sport):
+            return fn(batch)
+    return name, run
+
+def timed_source(sport, batches):
+    """ A forrás (meccslista letöltés) ideje kötegenként, a lánc saját szálán mérve. """
+    iterator = iter(batches)
+    while True:
+        with run_metrics.stage("fixtures", sport):
+            batch = next(iterator, None)
+        if batch is None: return
+        yield batch
+
+def run_football_pipeline(dates, checkpoint, selector, is_test_mode=False):
+    """
+    Napi kötegek: meccslista -> kvóta terv -> odds + ellenőrzőpont -> előtöltés -> pontozás -> selector.
+    dates: a feldolgozandó napok; a statisztika és az odds cache az egész ablakra közös.
+    checkpoint: a foci ellenőrzőpont szótára (meccs_id -> ujjlenyomat + tippek), helyben frissül (csak az elemző szál írja).
+    is_test_mode: teszt futásban semmi sem kerül az adatbázisba (a match_xg sem).
+    """
+    print(f"\n--- 1. FOCI ELEMZÉS ({len(dates)} nap) ---")
+    reservation = QuotaReservation()
+
+    def plan(fixtures):
+        relevant = [f for f in fixtures if f['league']['id'] in RELEVANT_LEAGUES_FOOTBALL]
+        covered = [f for f in relevant if has_coverage(f)]
+        if len(covered) < len(relevant):
+            dropped = sorted({RELEVANT_LEAGUES_FOOTBALL[f['league']['id']] for f in relevant if not has_coverage(f)})
+            print(f"🚫 Statisztika / odds lefedettség nélkül kihagyva {len(relevant) - len(covered)} meccs: {', '.join(dropped)}")
+        return plan_football_fixtures(covered, stats_date=dates[0], reservation=reservation) or None
+
+    def odds(fixtures):
+        load_odds_for_games("football", fixtures)
+        valid = [f for f in fixtures if is_valid_future_match(f['fixture']['date'], f['fixture']['status']['short'])]
+        to_analyze, reused_tips = run_checkpoint.split_fresh(checkpoint, valid, lambda f: f['fixture']['id'], football_odds_fingerprint)
+        if reused_tips or len(to_analyze) < len(valid):
+            print(f"♻️ {len(valid) - len(to_analyze)} változatlan meccs az előző futásból, {len(to_analyze)} elemzendő.")
+        run_metrics.count("football_analyzed", len(to_analyze)); run_metrics.count("football_reused", len(valid) - len(to_analyze))
+        return to_analyze, reused_tips
+
+    def prefetch(batch):
+        prefetch_data_for_fixtures(batch[0], stats_date=dates[0])
+        return batch
+
+    def analysis(batch):
+        to_analyze, reused_tips = batch
+        rows = [build_fixture_features(f) for f in to_analyze]
+        new_tips = scoring_engine.score_rows(rows)
+        if not is_test_mode: save_match_xg(rows)
+        # Csak a ténylegesen pontozott meccs kerül az ellenőrzőpontba (hiányzó statisztikánál legközelebb újrapróbáljuk)
+        for fixture, row in zip(to_analyze, rows):
+            if not row: continue
+            fixture_id = fixture['fixture']['id']
+            checkpoint[str(fixture_id)] = {"fingerprint": football_odds_fingerprint(fixture), "tips": [t for t in new_tips if t['fixture_id'] == fixture_id]}
+        return new_tips + reused_tips
+
+    refresh_league_meta()
+    stages = [timed_stage(name, "football", fn) for name, fn in (("plan", plan), ("odds", odds), ("prefetch", prefetch), ("analysis", analysis))]
+    found = 0
+    with run_metrics.stage("pipeline", "football", HOSTS["football"]):
+        days = timed_source("football", iter_game_days("football", "fixtures", dates, fetch_day=fetch_football_fixtures))
+        for tips in stream_pipeline.run(days, stages):
+            selector.add(tips); found += len(tips)
+    print(f"⚽ Foci kész: {found} jelölt.")
+    return found
+
+def run_game_pipeline(sport, dates, relevant_leagues, analyze_fn, checkpoint, selector):
+    """ Hoki / kosár napi kötegekben: meccslista -> tömeges odds + ellenőrzőpont -> elemzés (csak új / mozdult oddsú meccs) -> selector. """
+    def odds(all_games):
+        relevant = [g for g in all_games if g['league']['id'] in relevant_leagues]
+        if not relevant: return None
+        load_odds_for_games(sport, relevant)
+        valid = [g for g in relevant if is_valid_future_match(g['date'], g['status']['short'])]
+        to_analyze, reused_tips = run_checkpoint.split_fresh(checkpoint, valid, lambda g: g['id'], lambda g: game_odds_fingerprint(sport, g))
+        run_metrics.count(f"{sport}_analyzed", len(to_analyze)); run_metrics.count(f"{sport}_reused", len(valid) - len(to_analyze))
+        return to_analyze, reused_tips
+
+    def analysis(batch):
+        to_analyze, tips = batch[0], list(batch[1])
+        for game in to_analyze:
+            new_tips = analyze_fn(game)
+            if new_tips: tips.extend(new_tips)
+            fingerprint = game_odds_fingerprint(sport, game)
+            if fingerprint != [None] * len(fingerprint): checkpoint[str(game['id'])] = {"fingerprint": fingerprint, "tips": new_tips}
+        return tips
+
+    stages = [timed_stage("odds", sport, odds), timed_stage("analysis", sport, analysis)]
+    found = 0
+    with run_metrics.stage("pipeline", sport, HOSTS[sport]):
+        for tips in stream_pipeline.run(timed_source(sport, iter_game_days(sport, "games", dates)), stages):
+            selector.add(tips); found += len(tips)
+    return found
+
+def run_hockey_pipeline(dates, checkpoint, selector):
+    print(f"\n--- 2. HOKI ELEMZÉS ({len(dates)} nap) ---")
+    found = run_game_pipeline("hockey", dates, RELEVANT_LEAGUES_HOCKEY, analyze_hockey, checkpoint, selector)
+    print(f"🏒 Hoki kész: {found} jelölt.")
+    return found
+
+def run_basketball_pipeline(dates, checkpoint, selector):
+    print(f"\n--- 3. KOSÁR (NBA) ELEMZÉS ({len(dates)} nap) ---")
+    found = run_game_pipeline("basketball", dates, RELEVANT_LEAGUES_BASKETBALL, analyze_basketball, checkpoint, selector)
+    print(f"🏀 Kosár kész: {found} jelölt.")
+    return found
+
+def get_horizon_days():
+    """ --days=N parancssori kapcsoló vagy GENERATOR_HORIZON_DAYS; None = régi viselkedés. """
+    raw = next((arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--days=")), HORIZON_DAYS)
+    try: return max(1, int(raw)) if raw else None
+    except ValueError: return None
+
 def main(run_as_test=False):
     is_test_mode = '--test' in sys.argv or run_as_test
     start_time = datetime.now(BUDAPEST_TZ)
     target_date_str = start_time.strftime("%Y-%m-%d")
-    tomorrow_date_str = (start_time + timedelta(days=1)).strftime("%Y-%m-%d")
-    
-    print(f"🚀 Multi-Sport Tipp Generátor (V23.3 - Team Names Fix) indítása...")
-    all_found_tips = []
-
-    # 1. FOCI
-    print("\n--- 1. FOCI ELEMZÉS ---")
-    football_data = get_api_data("football", "fixtures", {"date": target_date_str})
-    if football_data:
-        relevant_fb = [f for f in football_data if f['league']['id'] in RELEVANT_LEAGUES_FOOTBALL]
-        if relevant_fb:
-            prefetch_data_for_fixtures(relevant_fb)
-            for fix in relevant_fb:
-                new_tips = analyze_fixture_smart_stats(fix)
-                if new_tips: all_found_tips.extend(new_tips)
-    
-    # 2. HOKI
-    print("\n--- 2. HOKI ELEMZÉS (MA + HOLNAP) ---")
-    hockey_today = get_api_data("hockey", "games", {"date": target_date_str}) or []
-    hockey_tomorrow = get_api_data("hockey", "games", {"date": tomorrow_date_str}) or []
-    hockey_all = hockey_today + hockey_tomorrow
-    if hockey_all:
-        relevant_hk = [g for g in hockey_all if g['league']['id'] in RELEVANT_LEAGUES_HOCKEY]
-        for game in relevant_hk:
-            new_tips = analyze_hockey(game)
-            if new_tips: all_found_tips.extend(new_tips)
-    
-    # 3. KOSÁR
-    print("\n--- 3. KOSÁR (NBA) ELEMZÉS (MA + HOLNAP) ---")
-    basket_today = get_api_data("basketball", "games", {"date": target_date_str}) or []
-    basket_tomorrow = get_api_data("basketball", "games", {"date": tomorrow_date_str}) or []
-    basket_all = basket_today + basket_tomorrow
-    if basket_all:
-        relevant_bk = [g for g in basket_all if g['league']['id'] in RELEVANT_LEAGUES_BASKETBALL]
-        for game in relevant_bk:
-            new_tips = analyze_basketball(game)
-            if new_tips: all_found_tips.extend(new_tips)
+    horizon_days = get_horizon_days()
+    window = [(start_time + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(horizon_days or 2)]
+    football_dates = window if horizon_days else [target_date_str]
     
+    print(f"🚀 Multi-Sport Tipp Generátor (V25.8 - Egyértelmű tipp sorrend) indítása...")
+    # Az oddsok futásonként frissek legyenek (a bot folyamatában a modul életben marad)
+    ODDS_CACHE.clear(); ODDS_LOADED_GROUPS.clear()
+    api_client.begin_run()
+    run_metrics.begin_run()
+
+    # Inkrementális mód: az előző futás ellenőrzőpontjából csak az új / mozdult oddsú meccseket elemezzük újra
+    incremental = '--full' not in sys.argv and os.environ.get("GENERATOR_INCREMENTAL", "1") != "0"
+    checkpoint = run_checkpoint.load(target_date_str) if incremental else {}
+    for sport in HOSTS: checkpoint.setdefault(sport, {})
+
+    # A három sport független hostokon fut, így párhuzamosan mehetnek; az összidő ~ a leglassabb sport.
+    # Többnapos módban napi keret: minden napra külön a legjobb 5 tipp.
+    selector = TipSelector(max_tips=5, per_day=bool(horizon_days))
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        pipelines = [
+            pool.submit(run_football_pipeline, football_dates, checkpoint["football"], selector, is_test_mode),
+            pool.submit(run_hockey_pipeline, window, checkpoint["hockey"], selector),
+            pool.submit(run_basketball_pipeline, window, checkpoint["basketball"], selector),
+        ]
+        for future in pipelines:
+            try: future.result()
+            except Exception as e: print(f"!!! HIBA egy sport feldolgozásakor: {e}")
+    run_checkpoint.save(target_date_str, checkpoint)
+
+    print(f"\n📡 API forgalom:\n{api_client.format_stats()}")
+    print("📒 Mai api-sports felhasználás: " + ", ".join(f"{sp}/{ep} ({st}): {n}" for sp, ep, st, n in api_quota.usage_report()[:8]))
+
     # KIVÁLASZTÁS
-    best_tips = select_best_single_tips(all_found_tips, max_tips=5)
+    with run_metrics.stage("select"):
+        best_tips = selector.result()
+    run_metrics.count("tips_found", selector.seen)
     
+    run_status = "Teszt"
     if best_tips:
         if is_test_mode:
             print("\n[TESZT EREDMÉNYEK]:")
@@ -303,10 +675,17 @@ def main(run_as_test=False):
                 print(f"   ⚽ {t['csapat_H']} vs {t['csapat_V']}")
                 print(f"   💡 {t['tipp']} @ {t['odds']} | Conf: {t['confidence']}")
         else:
-            save_tips_split_by_date(best_tips, target_date_str)
+            saved = save_tips_split_by_date(best_tips, target_date_str)
+            run_status = "Jóváhagyásra vár" if saved is not None else "Mentési hiba"
     else:
         print("❌ Sajnos ma semmilyen sportból nem találtam tuti tippet.")
-        if not is_test_mode: record_daily_status(target_date_str, "Nincs megfelelő tipp")
+        if not is_test_mode:
+            record_daily_status(target_date_str, "Nincs megfelelő tipp")
+            run_status = "Nincs megfelelő tipp"
+
+    run_summary = run_metrics.summary()
+    print(f"\n⏱ Futási statisztika:\n{run_metrics.format_summary(run_summary)}")
+    if not is_test_mode: run_metrics.save(supabase, target_date_str, run_status, len(best_tips), run_summary)
 
 if __name__ == "__main__":
     main()